@@ -0,0 +1,47 @@
+"""
+Сравнение обрезки больших Pydantic моделей: ленивый обход полей и model_dump().
+
+Запуск:
+    python benchmarks/bench_pydantic_models.py
+"""
+
+import time
+import tracemalloc
+from typing import Any, Callable, Tuple
+
+from fixtures import pydantic_state
+
+from langfuse_runnable_config.internal.serializers import serialize_for_tracing
+
+
+def _measure(func: Callable[[], Any], repeat: int = 5) -> Tuple[float, int]:
+    """Возвращает лучшее время в мс и пиковую память в КБ."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return best * 1000, peak // 1024
+
+
+def main() -> None:
+    """Печатает время и пиковую память для обоих способов."""
+    cases = [
+        ("1k chunks x 1 KB, dim 1536", pydantic_state(1_000, 1_000, 1_536)),
+        ("10k chunks x 5 KB, dim 384", pydantic_state(10_000, 5_000, 384)),
+    ]
+    print(f"{'case':<30} {'path':<12} {'time, ms':>10} {'peak, KB':>10}")
+    for name, state in cases:
+        lazy = _measure(lambda: serialize_for_tracing(state))
+        dump = _measure(lambda: serialize_for_tracing(state.model_dump()))
+        print(f"{name:<30} {'lazy':<12} {lazy[0]:>10.2f} {lazy[1]:>10}")
+        print(f"{name:<30} {'model_dump':<12} {dump[0]:>10.2f} {dump[1]:>10}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,258 @@
+"""
+Локальный сервер, принимающий запросы Langfuse SDK вместо настоящего Langfuse.
+
+Понимает ингест v2 (POST /api/public/ingestion) и OTLP-экспорт v3+
+(POST /api/public/otel/v1/traces), на остальные запросы отвечает "{}".
+Считает количество запросов, принятые байты и время обработки по путям.
+Статистика доступна по GET /__stats, сброс — POST /__reset.
+
+Запуск отдельным процессом:
+    python benchmarks/fake_langfuse_server.py --port 3000 --delay-ms 20
+
+Или в том же процессе:
+    server = FakeLangfuseServer()
+    url = server.start()
+    ...
+    print(server.stats())
+    server.stop()
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+INGESTION_PATH = "/api/public/ingestion"
+OTEL_TRACES_PATH = "/api/public/otel/v1/traces"
+
+_REASONS = {200: "OK", 207: "Multi-Status", 400: "Bad Request"}
+
+
+class _PathStats:
+    """Статистика запросов к одному пути."""
+
+    def __init__(self) -> None:
+        self.requests = 0
+        self.bytes = 0
+        self.events = 0
+        self.latencies_ms: List[float] = []
+
+    def as_dict(self) -> Dict[str, Any]:
+        latencies = sorted(self.latencies_ms)
+        return {
+            "requests": self.requests,
+            "bytes": self.bytes,
+            "events": self.events,
+            "latency_p50_ms": _percentile(latencies, 50),
+            "latency_p99_ms": _percentile(latencies, 99),
+        }
+
+
+def _percentile(sorted_values: List[float], percent: float) -> float:
+    """Возвращает перцентиль отсортированного списка (0.0 для пустого)."""
+    if not sorted_values:
+        return 0.0
+    if len(sorted_values) == 1:
+        return sorted_values[0]
+    return statistics.quantiles(sorted_values, n=100, method="inclusive")[int(percent) - 1]
+
+
+class FakeLangfuseServer:
+    """
+    Asyncio HTTP/1.1 сервер с keep-alive, имитирующий API приема данных Langfuse.
+
+    Сервер работает в отдельном потоке со своим event loop, поэтому его можно
+    запускать рядом с синхронным кодом, который нагружает SDK.
+    """
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, delay_ms: float = 0.0) -> None:
+        """
+        Создает сервер; прослушивание начинается после start().
+
+        Args:
+            host: Адрес для прослушивания
+            port: Порт (0 — выбрать свободный)
+            delay_ms: Искусственная задержка ответа, имитирующая сетевой RTT
+        """
+        self._host = host
+        self._port = port
+        self._delay = delay_ms / 1000
+        self._stats: Dict[str, _PathStats] = {}
+        self._lock = threading.Lock()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        """Базовый URL сервера для настроек Langfuse."""
+        return f"http://{self._host}:{self._port}"
+
+    def start(self) -> str:
+        """Запускает сервер в фоновом потоке и возвращает его URL."""
+        started = threading.Event()
+
+        def run() -> None:
+            self._loop = asyncio.new_event_loop()
+            self._server = self._loop.run_until_complete(
+                asyncio.start_server(self._handle, self._host, self._port)
+            )
+            self._port = self._server.sockets[0].getsockname()[1]
+            started.set()
+            self._loop.run_forever()
+            self._server.close()
+            connections = asyncio.all_tasks(self._loop)
+            for task in connections:
+                task.cancel()
+            self._loop.run_until_complete(
+                asyncio.gather(*connections, self._server.wait_closed(), return_exceptions=True)
+            )
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name="fake-langfuse-server", daemon=True)
+        self._thread.start()
+        started.wait()
+        return self.url
+
+    def stop(self) -> None:
+        """Останавливает сервер."""
+        if self._loop is not None and self._thread is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+            self._thread = None
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Возвращает статистику по путям."""
+        with self._lock:
+            return {path: stats.as_dict() for path, stats in self._stats.items()}
+
+    def total_bytes(self) -> int:
+        """Возвращает суммарный объем принятых тел запросов ингеста."""
+        with self._lock:
+            return sum(
+                stats.bytes
+                for path, stats in self._stats.items()
+                if path in (INGESTION_PATH, OTEL_TRACES_PATH)
+            )
+
+    def reset(self) -> None:
+        """Сбрасывает статистику."""
+        with self._lock:
+            self._stats.clear()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await self._read_request(reader)
+                if request is None:
+                    break
+                method, path, headers, body = request
+                start = time.perf_counter()
+                if self._delay:
+                    await asyncio.sleep(self._delay)
+                status, payload, events = self._dispatch(method, path, body)
+                self._record(path, len(body), events, (time.perf_counter() - start) * 1000)
+                keep_alive = headers.get("connection", "").lower() != "close"
+                writer.write(self._response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (asyncio.IncompleteReadError, asyncio.CancelledError, ConnectionError):
+            # Клиент закрыл соединение или сервер останавливается
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _read_request(
+        reader: asyncio.StreamReader,
+    ) -> Optional[Tuple[str, str, Dict[str, str], bytes]]:
+        """Читает один запрос; None, если клиент закрыл соединение."""
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except asyncio.IncompleteReadError:
+            return None
+        lines = head.decode("latin-1").split("\r\n")
+        method, target, _ = lines[0].split(" ", 2)
+        headers = {}
+        for line in lines[1:]:
+            if ":" in line:
+                name, value = line.split(":", 1)
+                headers[name.strip().lower()] = value.strip()
+
+        if headers.get("transfer-encoding", "").lower() == "chunked":
+            chunks = []
+            while True:
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                chunk = await reader.readexactly(size + 2)
+                if size == 0:
+                    break
+                chunks.append(chunk[:-2])
+            body = b"".join(chunks)
+        else:
+            body = await reader.readexactly(int(headers.get("content-length", "0")))
+        return method, target.split("?", 1)[0], headers, body
+
+    def _dispatch(self, method: str, path: str, body: bytes) -> Tuple[int, bytes, int]:
+        """Возвращает статус, тело ответа и количество принятых событий."""
+        if path == "/__stats":
+            return 200, json.dumps(self.stats()).encode(), 0
+        if path == "/__reset" and method == "POST":
+            self.reset()
+            return 200, b"{}", 0
+        if path == INGESTION_PATH and method == "POST":
+            try:
+                batch = json.loads(body).get("batch", [])
+            except ValueError:
+                return 400, b'{"error": "invalid json"}', 0
+            successes = [{"id": event.get("id"), "status": 201} for event in batch]
+            return 207, json.dumps({"successes": successes, "errors": []}).encode(), len(batch)
+        if path == OTEL_TRACES_PATH:
+            return 200, b"", 1
+        return 200, b"{}", 0
+
+    def _record(self, path: str, size: int, events: int, latency_ms: float) -> None:
+        if path.startswith("/__"):
+            return
+        with self._lock:
+            stats = self._stats.setdefault(path, _PathStats())
+            stats.requests += 1
+            stats.bytes += size
+            stats.events += events
+            stats.latencies_ms.append(latency_ms)
+
+    @staticmethod
+    def _response(status: int, payload: bytes, keep_alive: bool) -> bytes:
+        headers = [
+            f"HTTP/1.1 {status} {_REASONS.get(status, 'OK')}",
+            "Content-Type: application/json",
+            f"Content-Length: {len(payload)}",
+            f"Connection: {'keep-alive' if keep_alive else 'close'}",
+        ]
+        return ("\r\n".join(headers) + "\r\n\r\n").encode("latin-1") + payload
+
+
+def main() -> None:
+    """Запускает сервер до нажатия Ctrl+C и печатает статистику."""
+    parser = argparse.ArgumentParser(description="Локальный сервер приема данных Langfuse")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=3000)
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Задержка ответа в мс")
+    args = parser.parse_args()
+
+    server = FakeLangfuseServer(args.host, args.port, args.delay_ms)
+    print(f"Fake Langfuse listening on {server.start()}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.stop()
+        print(json.dumps(server.stats(), indent=2))
+
+
+if __name__ == "__main__":
+    main()
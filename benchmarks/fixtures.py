@@ -0,0 +1,131 @@
+"""
+Реалистичные данные для бенчмарков обрезки.
+
+Все генераторы детерминированы (фиксированный seed), поэтому результаты
+разных запусков сравнимы между собой.
+"""
+
+import random
+from typing import Any, Dict, List
+
+from langchain_core.documents import Document
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage, SystemMessage
+from pydantic import BaseModel
+
+_SEED = 42
+_WORDS = (
+    "langfuse trace span retriever document embedding vector chain agent tool "
+    "observation latency token prompt completion context window chunk index query"
+).split()
+
+
+def _text(rng: random.Random, size: int) -> str:
+    """Генерирует текст примерно указанной длины из словаря."""
+    words: List[str] = []
+    length = 0
+    while length < size:
+        word = rng.choice(_WORDS)
+        words.append(word)
+        length += len(word) + 1
+    return " ".join(words)[:size]
+
+
+def rag_documents(n_docs: int = 200, doc_size: int = 4_000) -> List[Document]:
+    """Результат ретривера: документы с текстом и метаданными."""
+    rng = random.Random(_SEED)
+    return [
+        Document(
+            page_content=_text(rng, doc_size),
+            metadata={
+                "source": f"s3://bucket/docs/{i}.pdf",
+                "page": rng.randint(1, 300),
+                "score": rng.random(),
+                "title": _text(rng, 60),
+            },
+        )
+        for i in range(n_docs)
+    ]
+
+
+def rag_documents_with_duplicates(
+    n_docs: int = 200, duplicate_ratio: float = 0.5
+) -> List[Document]:
+    """Результат нескольких запросов ретривера, часть фрагментов в котором повторяется."""
+    rng = random.Random(_SEED)
+    unique = rag_documents(int(n_docs * (1 - duplicate_ratio)))
+    repeated = [
+        Document(page_content=doc.page_content, metadata={**doc.metadata, "score": rng.random()})
+        for doc in rng.sample(unique, n_docs - len(unique))
+    ]
+    return unique + repeated
+
+
+def embedding_batch(n_vectors: int = 64, dim: int = 1_536) -> List[List[float]]:
+    """Пакет эмбеддингов, как на выходе embed_documents()."""
+    rng = random.Random(_SEED)
+    return [[rng.uniform(-1.0, 1.0) for _ in range(dim)] for _ in range(n_vectors)]
+
+
+def nested_agent_state(depth: int = 30, breadth: int = 4) -> Dict[str, Any]:
+    """Глубоко вложенное состояние агента с промежуточными шагами."""
+    rng = random.Random(_SEED)
+    state: Dict[str, Any] = {"final": _text(rng, 2_000)}
+    for level in range(depth):
+        state = {
+            "level": level,
+            "scratchpad": _text(rng, 1_000),
+            "steps": [
+                {"tool": rng.choice(_WORDS), "input": _text(rng, 300), "output": _text(rng, 800)}
+                for _ in range(breadth)
+            ],
+            "child": state,
+        }
+    return state
+
+
+def chat_history(n_messages: int = 200, message_size: int = 1_500) -> List[BaseMessage]:
+    """История диалога с системным промптом и чередующимися репликами."""
+    rng = random.Random(_SEED)
+    messages: List[BaseMessage] = [SystemMessage(content=_text(rng, 4_000))]
+    for i in range(n_messages):
+        cls = HumanMessage if i % 2 == 0 else AIMessage
+        messages.append(cls(content=_text(rng, message_size)))
+    return messages
+
+
+def small_step_payload() -> Dict[str, Any]:
+    """Небольшие вход и состояние типичного шага цепочки, не требующие обрезки."""
+    rng = random.Random(_SEED)
+    return {
+        "question": _text(rng, 120),
+        "user_id": "u-42",
+        "k": 5,
+        "filters": {"lang": "ru", "year": 2024},
+        "history": [{"role": "user", "content": _text(rng, 200)}],
+    }
+
+
+class Chunk(BaseModel):
+    """Фрагмент документа с эмбеддингом."""
+
+    text: str
+    embedding: List[float]
+
+
+class RetrievalState(BaseModel):
+    """Состояние RAG-цепочки с большим списком фрагментов."""
+
+    query: str
+    chunks: List[Chunk]
+
+
+def pydantic_state(n_chunks: int = 1_000, text_size: int = 1_000, dim: int = 384) -> RetrievalState:
+    """Большая Pydantic-модель состояния RAG-цепочки."""
+    rng = random.Random(_SEED)
+    return RetrievalState(
+        query=_text(rng, 100),
+        chunks=[
+            Chunk(text=_text(rng, text_size), embedding=[rng.random() for _ in range(dim)])
+            for _ in range(n_chunks)
+        ],
+    )
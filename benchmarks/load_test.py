@@ -0,0 +1,167 @@
+"""
+Нагрузочный тест сквозного пути трейсинга без настоящего Langfuse.
+
+create_config() -> обработчик -> батчинг SDK -> HTTP-ингест в локальный
+FakeLangfuseServer. Запускает concurrency параллельных цепочек LangChain
+(ретривер -> форматирование промпта -> чат-модель -> парсер) без callback'ов,
+с LangfuseRunnableConfig и с LangfuseTruncatingRunnableConfig и печатает:
+
+- p50/p99 задержки запуска цепочки и добавленную задержку на шаг цепочки
+  относительно запуска без трейсинга;
+- объем принятых сервером данных на один трейс.
+
+Требуется установленный langfuse (v2 или v3+).
+
+Запуск:
+    python benchmarks/load_test.py
+    python benchmarks/load_test.py --concurrency 64 --runs 20 --delay-ms 30
+"""
+
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+import fixtures
+from fake_langfuse_server import FakeLangfuseServer
+from langchain_core.language_models.fake_chat_models import FakeListChatModel
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable, RunnableConfig, RunnableLambda
+
+from langfuse_runnable_config import (
+    LangfuseRunnableConfig,
+    LangfuseSettings,
+    LangfuseTruncatingRunnableConfig,
+    LangfuseTruncatingSettings,
+)
+from langfuse_runnable_config.internal.handlers.lifecycle import flush_handler
+
+# Количество шагов цепочки, между которыми вызываются callback'и
+CHAIN_STEPS = 4
+
+_PUBLIC_KEY = "pk-lf-load-test"
+_SECRET_KEY = "sk-lf-load-test"
+
+
+def build_chain(n_docs: int, doc_size: int) -> Runnable:
+    """Собирает RAG-цепочку с крупными документами и фиктивной чат-моделью."""
+    docs = fixtures.rag_documents(n_docs, doc_size)
+    answer = fixtures.chat_history(1, 2_000)[-1].content
+
+    def retrieve(question: str) -> Dict[str, Any]:
+        return {"question": question, "docs": docs}
+
+    def format_prompt(state: Dict[str, Any]) -> str:
+        context = "\n\n".join(doc.page_content for doc in state["docs"][:5])
+        return f"Context:\n{context}\n\nQuestion: {state['question']}"
+
+    return (
+        RunnableLambda(retrieve, name="retrieve")
+        | RunnableLambda(format_prompt, name="format_prompt")
+        | FakeListChatModel(responses=[str(answer)])
+        | StrOutputParser()
+    )
+
+
+def _percentiles(latencies_ms: List[float]) -> Dict[str, float]:
+    quantiles = statistics.quantiles(sorted(latencies_ms), n=100, method="inclusive")
+    return {"p50": quantiles[49], "p99": quantiles[98]}
+
+
+async def _drive(
+    chain: Runnable, config: Optional[RunnableConfig], concurrency: int, runs: int
+) -> List[float]:
+    """Запускает concurrency задач по runs запусков цепочки и возвращает задержки в мс."""
+    latencies: List[float] = []
+
+    async def worker(worker_id: int) -> None:
+        for i in range(runs):
+            start = time.perf_counter()
+            await chain.ainvoke(f"question {worker_id}-{i}", config=config)
+            latencies.append((time.perf_counter() - start) * 1000)
+
+    await asyncio.gather(*(worker(w) for w in range(concurrency)))
+    return latencies
+
+
+def _run_mode(
+    name: str,
+    chain: Runnable,
+    create_config: Optional[Callable[[], RunnableConfig]],
+    server: FakeLangfuseServer,
+    concurrency: int,
+    runs: int,
+) -> Dict[str, Any]:
+    """Прогоняет нагрузку в одном режиме и собирает результаты."""
+    server.reset()
+    config = create_config() if create_config is not None else None
+    latencies = asyncio.run(_drive(chain, config, concurrency, runs))
+    for handler in (config or {}).get("callbacks") or []:
+        flush_handler(handler)
+    traces = concurrency * runs
+    return {
+        "mode": name,
+        **_percentiles(latencies),
+        "bytes_per_trace": server.total_bytes() / traces,
+        "requests": sum(stats["requests"] for stats in server.stats().values()),
+    }
+
+
+def main() -> int:
+    """Запускает нагрузку во всех режимах и печатает таблицу."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--concurrency", type=int, default=16, help="Параллельных цепочек")
+    parser.add_argument("--runs", type=int, default=10, help="Запусков на одну цепочку")
+    parser.add_argument("--docs", type=int, default=50, help="Документов от ретривера")
+    parser.add_argument("--doc-size", type=int, default=4_000, help="Символов в документе")
+    parser.add_argument("--delay-ms", type=float, default=0.0, help="Задержка ответа сервера")
+    args = parser.parse_args()
+
+    try:
+        import langfuse  # noqa: F401
+    except ImportError:
+        print("Для нагрузочного теста нужен langfuse: pip install langfuse")
+        return 1
+
+    server = FakeLangfuseServer(delay_ms=args.delay_ms)
+    url = server.start()
+    chain = build_chain(args.docs, args.doc_size)
+    credentials = dict(url=url, public_key=_PUBLIC_KEY, secret_key=_SECRET_KEY)
+    modes: List[Any] = [
+        ("baseline", None),
+        ("simple", lambda: LangfuseRunnableConfig.create_config(
+            settings=LangfuseSettings(**credentials)
+        )),
+        ("truncating", lambda: LangfuseTruncatingRunnableConfig.create_config(
+            settings=LangfuseTruncatingSettings(**credentials)
+        )),
+    ]
+
+    try:
+        results = [
+            _run_mode(name, chain, create_config, server, args.concurrency, args.runs)
+            for name, create_config in modes
+        ]
+    finally:
+        server.stop()
+
+    baseline = results[0]
+    print(
+        f"{'mode':<12} {'p50, ms':>9} {'p99, ms':>9} {'+p50/step':>10} {'+p99/step':>10} "
+        f"{'KB/trace':>9} {'requests':>9}"
+    )
+    for result in results:
+        added_p50 = (result["p50"] - baseline["p50"]) / CHAIN_STEPS
+        added_p99 = (result["p99"] - baseline["p99"]) / CHAIN_STEPS
+        print(
+            f"{result['mode']:<12} {result['p50']:>9.2f} {result['p99']:>9.2f} "
+            f"{added_p50:>10.3f} {added_p99:>10.3f} "
+            f"{result['bytes_per_trace'] / 1024:>9.1f} {result['requests']:>9}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,198 @@
+"""
+Набор микробенчмарков обрезки и создания обработчиков.
+
+Работает без сети: пакет langfuse подменяется заглушкой (stub_langfuse.py).
+Для каждого сценария печатает лучшее и медианное время вызова, объем памяти,
+оставшейся выделенной после вызова, и пиковую память (tracemalloc).
+
+Запуск:
+    python benchmarks/run.py
+    python benchmarks/run.py --filter serialize --repeat 10
+    python benchmarks/run.py --save baseline.json
+    python benchmarks/run.py --compare baseline.json --threshold 1.3
+"""
+
+import argparse
+import gc
+import json
+import statistics
+import sys
+import time
+import tracemalloc
+import uuid
+from typing import Any, Callable, Dict, List, NamedTuple, Tuple
+
+from stub_langfuse import install_stub_langfuse
+
+install_stub_langfuse()
+
+import fixtures  # noqa: E402
+
+from langfuse_runnable_config import LangfuseTruncatingRunnableConfig  # noqa: E402
+from langfuse_runnable_config.internal.cache import get_handler_cache  # noqa: E402
+from langfuse_runnable_config.internal.constants import DEFAULT_MAX_VECTOR_ELEMENTS  # noqa: E402
+from langfuse_runnable_config.internal.handlers import create_truncating_handler  # noqa: E402
+from langfuse_runnable_config.internal.serializers import serialize_for_tracing  # noqa: E402
+from langfuse_runnable_config.internal.serializers.truncator import _is_vector  # noqa: E402
+from langfuse_runnable_config.settings import LangfuseTruncatingSettings  # noqa: E402
+
+
+class Result(NamedTuple):
+    """Результат одного сценария."""
+
+    best_ms: float
+    median_ms: float
+    alloc_kb: int
+    peak_kb: int
+
+
+def _build_cases() -> List[Tuple[str, Callable[[], Any]]]:
+    """Создает данные и возвращает сценарии (имя, функция без аргументов)."""
+    docs = fixtures.rag_documents()
+    duplicated_docs = fixtures.rag_documents_with_duplicates()
+    embeddings = fixtures.embedding_batch()
+    state = fixtures.nested_agent_state()
+    history = fixtures.chat_history()
+    model = fixtures.pydantic_state()
+    small = fixtures.small_step_payload()
+    settings = LangfuseTruncatingSettings(
+        url="https://langfuse.invalid", public_key="pk-bench", secret_key="sk-bench"
+    )
+    handler = create_truncating_handler(1_000, 10, langfuse_version=3)
+    run_id = uuid.uuid4()
+
+    def on_retriever_end() -> Any:
+        return handler.on_retriever_end(docs, run_id=run_id)
+
+    def on_chat_model_start() -> Any:
+        return handler.on_chat_model_start({}, [history], run_id=run_id)
+
+    def create_config_cached() -> Any:
+        return LangfuseTruncatingRunnableConfig.create_config(settings=settings)
+
+    def create_config_uncached() -> Any:
+        get_handler_cache().clear()
+        return LangfuseTruncatingRunnableConfig.create_config(settings=settings)
+
+    return [
+        ("serialize/rag_documents", lambda: serialize_for_tracing(docs)),
+        (
+            "serialize/rag_documents_dedup",
+            lambda: serialize_for_tracing(
+                duplicated_docs,
+                max_vector_elements=len(duplicated_docs),
+                document_metadata_keys=["source", "page"],
+                dedupe_documents=True,
+            ),
+        ),
+        (
+            "serialize/rag_documents_no_dedup",
+            lambda: serialize_for_tracing(
+                duplicated_docs, max_vector_elements=len(duplicated_docs)
+            ),
+        ),
+        ("serialize/embedding_batch", lambda: serialize_for_tracing(embeddings)),
+        ("serialize/nested_agent_state", lambda: serialize_for_tracing(state)),
+        ("serialize/chat_history", lambda: serialize_for_tracing(history)),
+        ("serialize/pydantic_state", lambda: serialize_for_tracing(model)),
+        ("serialize/small_step_payload", lambda: serialize_for_tracing(small)),
+        ("is_vector/embedding_batch", lambda: [_is_vector(v, DEFAULT_MAX_VECTOR_ELEMENTS) for v in embeddings]),
+        ("handler/on_retriever_end", on_retriever_end),
+        ("handler/on_chat_model_start", on_chat_model_start),
+        ("handler/create_truncating_handler", lambda: create_truncating_handler(1_000, 10)),
+        ("factory/create_config_cached", create_config_cached),
+        ("factory/create_config_uncached", create_config_uncached),
+    ]
+
+
+def _autorange(func: Callable[[], Any], min_time: float = 0.05) -> int:
+    """Подбирает число вызовов в одном замере, чтобы замер длился не меньше min_time."""
+    number = 1
+    while True:
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        if time.perf_counter() - start >= min_time or number >= 10_000:
+            return number
+        number *= 2
+
+
+def measure(func: Callable[[], Any], repeat: int) -> Result:
+    """Замеряет время и память одного сценария."""
+    number = _autorange(func)
+    timings = []
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            for _ in range(number):
+                func()
+            timings.append((time.perf_counter() - start) / number * 1000)
+    finally:
+        if gc_enabled:
+            gc.enable()
+
+    tracemalloc.start()
+    try:
+        before, _ = tracemalloc.get_traced_memory()
+        result = func()
+        after, peak = tracemalloc.get_traced_memory()
+        del result
+    finally:
+        tracemalloc.stop()
+    return Result(min(timings), statistics.median(timings), (after - before) // 1024, peak // 1024)
+
+
+def _compare(results: Dict[str, Result], baseline_path: str, threshold: float) -> int:
+    """Сравнивает медианы с сохраненной базой и возвращает код выхода."""
+    with open(baseline_path, encoding="utf-8") as f:
+        baseline = json.load(f)
+
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        ratio = result.median_ms / base["median_ms"] if base["median_ms"] else 1.0
+        if ratio > threshold:
+            regressions.append(f"{name}: {base['median_ms']:.3f} -> {result.median_ms:.3f} ms")
+    for line in regressions:
+        print(f"REGRESSION {line}")
+    return 1 if regressions else 0
+
+
+def main() -> int:
+    """Запускает сценарии и печатает таблицу результатов."""
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--filter", default="", help="Подстрока имени сценария")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество замеров")
+    parser.add_argument("--save", help="Сохранить результаты в JSON")
+    parser.add_argument("--compare", help="Сравнить с результатами из JSON")
+    parser.add_argument(
+        "--threshold", type=float, default=1.5, help="Допустимое замедление медианы"
+    )
+    args = parser.parse_args()
+
+    results: Dict[str, Result] = {}
+    print(f"{'case':<36} {'best, ms':>10} {'median, ms':>11} {'alloc, KB':>10} {'peak, KB':>10}")
+    for name, func in _build_cases():
+        if args.filter not in name:
+            continue
+        result = measure(func, args.repeat)
+        results[name] = result
+        print(
+            f"{name:<36} {result.best_ms:>10.3f} {result.median_ms:>11.3f} "
+            f"{result.alloc_kb:>10} {result.peak_kb:>10}"
+        )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump({name: r._asdict() for name, r in results.items()}, f, indent=2)
+    if args.compare:
+        return _compare(results, args.compare, args.threshold)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+"""
+Заглушка пакета langfuse для запуска бенчмарков без сети и без установленного SDK.
+
+Обработчики принимают все события LangChain и ничего не отправляют, поэтому
+измеряется только работа библиотеки: обрезка, сериализация и создание объектов.
+"""
+
+import os
+import sys
+import types
+from typing import Any
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+
+class StubLangfuse:
+    """Клиент langfuse.Langfuse, не выполняющий запросов."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.init_kwargs = kwargs
+
+    def flush(self) -> None:
+        pass
+
+    def shutdown(self) -> None:
+        pass
+
+
+class StubCallbackHandler(BaseCallbackHandler):
+    """CallbackHandler, принимающий события без отправки."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.init_kwargs = kwargs
+
+    def flush(self) -> None:
+        pass
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        pass
+
+
+class StubV2CallbackHandler(StubCallbackHandler):
+    """Заглушка langfuse.callback.CallbackHandler."""
+
+
+class StubV3CallbackHandler(StubCallbackHandler):
+    """Заглушка langfuse.langchain.CallbackHandler."""
+
+
+def install_stub_langfuse(major_version: int = 3) -> types.ModuleType:
+    """
+    Подменяет langfuse в sys.modules заглушкой указанной мажорной версии.
+
+    Args:
+        major_version: Версия API (2 — langfuse.callback, 3 — langfuse.langchain)
+
+    Returns:
+        Модуль-заглушка langfuse
+    """
+    langfuse = types.ModuleType("langfuse")
+    langfuse.__version__ = f"{major_version}.0.0"  # type: ignore[attr-defined]
+    langfuse.__path__ = []  # type: ignore[attr-defined]
+    langfuse.Langfuse = StubLangfuse  # type: ignore[attr-defined]
+    callback = types.ModuleType("langfuse.callback")
+    callback.CallbackHandler = StubV2CallbackHandler  # type: ignore[attr-defined]
+    langchain = types.ModuleType("langfuse.langchain")
+    langchain.CallbackHandler = StubV3CallbackHandler  # type: ignore[attr-defined]
+    langfuse.callback = callback  # type: ignore[attr-defined]
+    langfuse.langchain = langchain  # type: ignore[attr-defined]
+
+    sys.modules["langfuse"] = langfuse
+    sys.modules["langfuse.callback"] = callback
+    sys.modules["langfuse.langchain"] = langchain
+    os.environ["LANGFUSE_MAJOR_VERSION"] = str(major_version)
+    return langfuse
@@ -4,7 +4,28 @@ Langfuse Config - Утилита для интеграции Langfuse с LangCha
 Главный API для получения RunnableConfig с автоматической настройкой Langfuse callbacks.
 """
 
-from langfuse_runnable_config.factories import LangfuseRunnableConfig, LangfuseTruncatingRunnableConfig
+from langfuse_runnable_config.factories import (
+    LangfuseRunnableConfig,
+    LangfuseTruncatingRunnableConfig,
+    warmup,
+)
+from langfuse_runnable_config.internal.cache import (
+    get_handler_cache,
+    get_settings_cache,
+    reload_settings,
+)
+from langfuse_runnable_config.internal.metrics import (
+    MetricsSink,
+    get_metrics_sink,
+    set_metrics_sink,
+)
+from langfuse_runnable_config.internal.runtime import (
+    aflush,
+    ashutdown,
+    flush_all,
+    install_shutdown_hooks,
+)
+from langfuse_runnable_config.internal.serializers import register_tokenizer
 from langfuse_runnable_config.settings import (
     LangfuseSettings,
     LangfuseTruncatingSettings,
@@ -17,4 +38,16 @@ __all__ = [
     "LangfuseTruncatingRunnableConfig",
     "LangfuseSettings",
     "LangfuseTruncatingSettings",
+    "MetricsSink",
+    "aflush",
+    "ashutdown",
+    "flush_all",
+    "get_handler_cache",
+    "get_metrics_sink",
+    "get_settings_cache",
+    "install_shutdown_hooks",
+    "register_tokenizer",
+    "reload_settings",
+    "set_metrics_sink",
+    "warmup",
 ]
@@ -2,8 +2,11 @@
 
 from langfuse_runnable_config.factories.simple import LangfuseRunnableConfig
 from langfuse_runnable_config.factories.truncating import LangfuseTruncatingRunnableConfig
+from langfuse_runnable_config.factories.warmup import WarmupReport, warmup
 
 __all__ = [
     "LangfuseRunnableConfig",
     "LangfuseTruncatingRunnableConfig",
+    "WarmupReport",
+    "warmup",
 ]
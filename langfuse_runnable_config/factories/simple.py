@@ -1,13 +1,24 @@
 """Главная фабрика для создания RunnableConfig с Langfuse."""
 
+import functools
 import logging
-from typing import Any, Optional, cast, overload
+from typing import Any, Hashable, Optional, Tuple, cast, overload
 
 from langchain_core.runnables.config import RunnableConfig
 
 from langfuse_runnable_config.settings import LangfuseSettings
+from langfuse_runnable_config.internal.cache import (
+    get_handler_cache,
+    get_settings_cache,
+    make_cache_key,
+)
+from langfuse_runnable_config.internal.runtime import get_handler_registry, run_off_loop
+from langfuse_runnable_config.internal.sampling import get_noop_handler, is_sampled
 from langfuse_runnable_config.internal.strategies.simple import get_strategy
-from langfuse_runnable_config.internal.version import detect_langfuse_version
+from langfuse_runnable_config.internal.version import (
+    detect_langfuse_version,
+    peek_langfuse_version,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +32,13 @@ class LangfuseRunnableConfig:
 
     Для автоматической обрезки больших данных используйте
     LangfuseTruncatingRunnableConfig.
+
+    Обработчики кэшируются в пределах процесса по эффективным настройкам,
+    поэтому повторные вызовы возвращают уже готовый обработчик. Настройки из
+    окружения читаются один раз; для повторного чтения вызовите reload_settings().
+
+    В asyncio-приложениях используйте acreate_config() и acreate_callback():
+    первое создание обработчика выполняется вне event loop.
     """
 
     @staticmethod
@@ -35,7 +53,7 @@ class LangfuseRunnableConfig:
         if settings is not None:
             return settings
         if url is None:
-            return LangfuseSettings()  # type: ignore
+            return get_settings_cache().get(LangfuseSettings)
         return LangfuseSettings(
             url=cast(str, url),
             public_key=cast(str, public_key),
@@ -43,15 +61,67 @@ class LangfuseRunnableConfig:
             debug=debug,
         )
 
+    @staticmethod
+    def _get_callback(settings_obj: LangfuseSettings) -> Any:
+        """Возвращает обработчик из кэша процесса или создает новый."""
+        return LangfuseRunnableConfig.resolve_callback(settings_obj)[0]
+
+    @staticmethod
+    def resolve_callback(settings: LangfuseSettings) -> Tuple[Any, int]:
+        """
+        Возвращает обработчик из кэша процесса (создавая его) и версию Langfuse.
+
+        В отличие от create_callback() не применяет выборку и run_name и
+        возвращает сам кэшируемый обработчик; используется warmup().
+
+        Args:
+            settings: Настройки Langfuse
+
+        Returns:
+            (обработчик, мажорная версия Langfuse, для которой он создан:
+            major_version из настроек или версия установленного пакета)
+        """
+        version = settings.major_version or detect_langfuse_version()
+        strategy = get_strategy(version)
+        handler = get_handler_cache().get_or_create(
+            make_cache_key("simple", version, settings),
+            lambda: get_handler_registry().track(strategy.create_callback(settings)),
+        )
+        return handler, version
+
+    @staticmethod
+    def _is_ready(settings: Optional[LangfuseSettings], url: Optional[str]) -> bool:
+        """Проверяет, что обработчик можно получить без импорта, чтения окружения и сети."""
+        if settings is None:
+            if url is not None:
+                # Настройки из параметров дочитываются из окружения и .env
+                return False
+            settings = get_settings_cache().peek(LangfuseSettings)
+            if settings is None:
+                return False
+        version = settings.major_version or peek_langfuse_version()
+        if version is None:
+            return False
+        return get_handler_cache().contains(make_cache_key("simple", version, settings))
+
     @overload
     @staticmethod
-    def create_callback() -> Any:
+    def create_callback(
+        *,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> Any:
         """Создает чистый callback из переменных окружения."""
         ...
 
     @overload
     @staticmethod
-    def create_callback(*, settings: LangfuseSettings) -> Any:
+    def create_callback(
+        *,
+        settings: LangfuseSettings,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> Any:
         """Создает чистый callback из объекта LangfuseSettings."""
         ...
 
@@ -63,19 +133,30 @@ class LangfuseRunnableConfig:
         public_key: str,
         secret_key: str,
         debug: bool = False,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
     ) -> Any:
         """Создает чистый callback из параметров."""
         ...
 
     @overload
     @staticmethod
-    def create_config() -> RunnableConfig:
+    def create_config(
+        *,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> RunnableConfig:
         """Создает конфигурацию из переменных окружения."""
         ...
 
     @overload
     @staticmethod
-    def create_config(*, settings: LangfuseSettings) -> RunnableConfig:
+    def create_config(
+        *,
+        settings: LangfuseSettings,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> RunnableConfig:
         """Создает конфигурацию из объекта LangfuseSettings."""
         ...
 
@@ -87,6 +168,8 @@ class LangfuseRunnableConfig:
         public_key: str,
         secret_key: str,
         debug: bool = False,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
     ) -> RunnableConfig:
         """Создает конфигурацию из параметров."""
         ...
@@ -99,6 +182,8 @@ class LangfuseRunnableConfig:
         public_key: Optional[str] = None,
         secret_key: Optional[str] = None,
         debug: bool = False,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
     ) -> Any:
         """
         Создает чистый Langfuse callback без обрезки данных.
@@ -113,6 +198,9 @@ class LangfuseRunnableConfig:
             public_key: Публичный ключ Langfuse
             secret_key: Секретный ключ Langfuse
             debug: Включить отладочный режим
+            run_name: Имя запуска для выбора доли выборки из sample_rates; только
+                влияет на выборку и не задает имя запуска в конфигурации
+            sampling_key: Ключ детерминированной выборки (id трейса или сессии)
 
         Returns:
             CallbackHandler для Langfuse без обрезки данных
@@ -121,9 +209,9 @@ class LangfuseRunnableConfig:
             settings_obj = LangfuseRunnableConfig._prepare_settings(
                 settings, url, public_key, secret_key, debug
             )
-            version = detect_langfuse_version()
-            strategy = get_strategy(version)
-            return strategy.create_callback(settings_obj)
+            if not is_sampled(settings_obj, run_name, sampling_key):
+                return get_noop_handler()
+            return LangfuseRunnableConfig._get_callback(settings_obj)
 
         except ImportError as e:
             logger.warning(
@@ -145,6 +233,8 @@ class LangfuseRunnableConfig:
         public_key: Optional[str] = None,
         secret_key: Optional[str] = None,
         debug: bool = False,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
     ) -> RunnableConfig:
         """
         Создает RunnableConfig с Langfuse callback'ом без обрезки данных.
@@ -159,6 +249,9 @@ class LangfuseRunnableConfig:
             public_key: Публичный ключ Langfuse
             secret_key: Секретный ключ Langfuse
             debug: Включить отладочный режим
+            run_name: Имя запуска для выбора доли выборки из sample_rates; только
+                влияет на выборку и не задает имя запуска в конфигурации
+            sampling_key: Ключ детерминированной выборки (id трейса или сессии)
 
         Returns:
             RunnableConfig с настроенным Langfuse callback'ом
@@ -167,9 +260,10 @@ class LangfuseRunnableConfig:
             settings_obj = LangfuseRunnableConfig._prepare_settings(
                 settings, url, public_key, secret_key, debug
             )
-            version = detect_langfuse_version()
-            strategy = get_strategy(version)
-            return strategy.create_config(settings_obj)
+            if not is_sampled(settings_obj, run_name, sampling_key):
+                return RunnableConfig(callbacks=[])
+            handler = LangfuseRunnableConfig._get_callback(settings_obj)
+            return RunnableConfig(callbacks=[handler])
 
         except ImportError as e:
             logger.warning(
@@ -182,3 +276,75 @@ class LangfuseRunnableConfig:
                 f"⚠️ Langfuse не настроен — трейсинг будет отключен. Ошибка: {e}"
             )
             return RunnableConfig(callbacks=[])
+
+    @staticmethod
+    async def acreate_callback(
+        *,
+        settings: Optional[LangfuseSettings] = None,
+        url: Optional[str] = None,
+        public_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        debug: bool = False,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> Any:
+        """
+        Асинхронный вариант create_callback(), не блокирующий event loop.
+
+        Если настройки, версия Langfuse и обработчик уже в кэшах процесса,
+        обработчик возвращается сразу. Иначе чтение настроек, определение
+        версии и создание обработчика и клиента выполняются в executor'е.
+        Параметры совпадают с create_callback().
+
+        Returns:
+            CallbackHandler для Langfuse
+        """
+        create = functools.partial(
+            LangfuseRunnableConfig.create_callback,
+            settings=settings,
+            url=url,
+            public_key=public_key,
+            secret_key=secret_key,
+            debug=debug,
+            run_name=run_name,
+            sampling_key=sampling_key,
+        )
+        if LangfuseRunnableConfig._is_ready(settings, url):
+            return create()
+        return await run_off_loop(create)
+
+    @staticmethod
+    async def acreate_config(
+        *,
+        settings: Optional[LangfuseSettings] = None,
+        url: Optional[str] = None,
+        public_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        debug: bool = False,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> RunnableConfig:
+        """
+        Асинхронный вариант create_config(), не блокирующий event loop.
+
+        Если настройки, версия Langfuse и обработчик уже в кэшах процесса,
+        конфигурация создается сразу. Иначе чтение настроек, определение
+        версии и создание обработчика и клиента выполняются в executor'е.
+        Параметры совпадают с create_config().
+
+        Returns:
+            RunnableConfig с настроенным Langfuse callback'ом
+        """
+        create = functools.partial(
+            LangfuseRunnableConfig.create_config,
+            settings=settings,
+            url=url,
+            public_key=public_key,
+            secret_key=secret_key,
+            debug=debug,
+            run_name=run_name,
+            sampling_key=sampling_key,
+        )
+        if LangfuseRunnableConfig._is_ready(settings, url):
+            return create()
+        return await run_off_loop(create)
@@ -1,19 +1,33 @@
 """Фабрика для создания RunnableConfig с Langfuse и автоматической обрезкой данных."""
 
+import functools
 import logging
-from typing import Any, Optional, cast, overload
+from typing import Any, Hashable, Optional, Tuple, cast, overload
 
 from langchain_core.runnables.config import RunnableConfig
 
 from langfuse_runnable_config.settings import LangfuseTruncatingSettings
+from langfuse_runnable_config.internal.cache import (
+    get_handler_cache,
+    get_settings_cache,
+    make_cache_key,
+)
 from langfuse_runnable_config.internal.constants import (
+    DEFAULT_MAX_DEPTH,
     DEFAULT_MAX_LENGTH,
+    DEFAULT_MAX_NODES,
+    DEFAULT_MAX_TOTAL_LENGTH,
     DEFAULT_MAX_VECTOR_ELEMENTS,
 )
+from langfuse_runnable_config.internal.runtime import get_handler_registry, run_off_loop
+from langfuse_runnable_config.internal.sampling import get_noop_handler, is_sampled
 from langfuse_runnable_config.internal.strategies.truncating import (
     get_truncating_strategy,
 )
-from langfuse_runnable_config.internal.version import detect_langfuse_version
+from langfuse_runnable_config.internal.version import (
+    detect_langfuse_version,
+    peek_langfuse_version,
+)
 
 logger = logging.getLogger(__name__)
 
@@ -24,6 +38,13 @@ class LangfuseTruncatingRunnableConfig:
 
     Автоматически определяет версию установленного Langfuse и создает
     соответствующий обработчик с обрезкой больших данных.
+
+    Обработчики кэшируются в пределах процесса по эффективным настройкам,
+    поэтому повторные вызовы возвращают уже готовый обработчик. Настройки из
+    окружения читаются один раз; для повторного чтения вызовите reload_settings().
+
+    В asyncio-приложениях используйте acreate_config() и acreate_callback():
+    первое создание обработчика выполняется вне event loop.
     """
 
     @staticmethod
@@ -35,12 +56,15 @@ class LangfuseTruncatingRunnableConfig:
         debug: bool,
         truncate_max_length: int,
         truncate_max_vector_elements: int,
+        truncate_max_depth: int,
+        truncate_max_nodes: int,
+        truncate_max_total_length: int,
     ) -> LangfuseTruncatingSettings:
         """Подготавливает объект настроек из параметров."""
         if settings is not None:
             return settings
         if url is None:
-            return LangfuseTruncatingSettings()  # type: ignore
+            return get_settings_cache().get(LangfuseTruncatingSettings)
         return LangfuseTruncatingSettings(
             url=cast(str, url),
             public_key=cast(str, public_key),
@@ -48,17 +72,72 @@ class LangfuseTruncatingRunnableConfig:
             debug=debug,
             truncate_max_length=truncate_max_length,
             truncate_max_vector_elements=truncate_max_vector_elements,
+            truncate_max_depth=truncate_max_depth,
+            truncate_max_nodes=truncate_max_nodes,
+            truncate_max_total_length=truncate_max_total_length,
+        )
+
+    @staticmethod
+    def _get_callback(settings_obj: LangfuseTruncatingSettings) -> Any:
+        """Возвращает обработчик из кэша процесса или создает новый."""
+        return LangfuseTruncatingRunnableConfig.resolve_callback(settings_obj)[0]
+
+    @staticmethod
+    def resolve_callback(settings: LangfuseTruncatingSettings) -> Tuple[Any, int]:
+        """
+        Возвращает обработчик из кэша процесса (создавая его) и версию Langfuse.
+
+        В отличие от create_callback() не применяет выборку и run_name и
+        возвращает сам кэшируемый обработчик; используется warmup().
+
+        Args:
+            settings: Настройки Langfuse
+
+        Returns:
+            (обработчик, мажорная версия Langfuse, для которой он создан:
+            major_version из настроек или версия установленного пакета)
+        """
+        version = settings.major_version or detect_langfuse_version()
+        strategy = get_truncating_strategy(version)
+        handler = get_handler_cache().get_or_create(
+            make_cache_key("truncating", version, settings),
+            lambda: get_handler_registry().track(strategy.create_callback(settings)),
         )
+        return handler, version
+
+    @staticmethod
+    def _is_ready(settings: Optional[LangfuseTruncatingSettings], url: Optional[str]) -> bool:
+        """Проверяет, что обработчик можно получить без импорта, чтения окружения и сети."""
+        if settings is None:
+            if url is not None:
+                # Настройки из параметров дочитываются из окружения и .env
+                return False
+            settings = get_settings_cache().peek(LangfuseTruncatingSettings)
+            if settings is None:
+                return False
+        version = settings.major_version or peek_langfuse_version()
+        if version is None:
+            return False
+        return get_handler_cache().contains(make_cache_key("truncating", version, settings))
 
     @overload
     @staticmethod
-    def create_callback() -> Any:
+    def create_callback(
+        *,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> Any:
         """Создает чистый callback из переменных окружения."""
         ...
 
     @overload
     @staticmethod
-    def create_callback(*, settings: LangfuseTruncatingSettings) -> Any:
+    def create_callback(
+        *,
+        settings: LangfuseTruncatingSettings,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> Any:
         """Создает чистый callback из объекта LangfuseTruncatingSettings."""
         ...
 
@@ -72,19 +151,33 @@ class LangfuseTruncatingRunnableConfig:
         debug: bool = False,
         truncate_max_length: int = DEFAULT_MAX_LENGTH,
         truncate_max_vector_elements: int = DEFAULT_MAX_VECTOR_ELEMENTS,
+        truncate_max_depth: int = DEFAULT_MAX_DEPTH,
+        truncate_max_nodes: int = DEFAULT_MAX_NODES,
+        truncate_max_total_length: int = DEFAULT_MAX_TOTAL_LENGTH,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
     ) -> Any:
         """Создает чистый callback из параметров."""
         ...
 
     @overload
     @staticmethod
-    def create_config() -> RunnableConfig:
+    def create_config(
+        *,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> RunnableConfig:
         """Создает конфигурацию из переменных окружения."""
         ...
 
     @overload
     @staticmethod
-    def create_config(*, settings: LangfuseTruncatingSettings) -> RunnableConfig:
+    def create_config(
+        *,
+        settings: LangfuseTruncatingSettings,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> RunnableConfig:
         """Создает конфигурацию из объекта LangfuseTruncatingSettings."""
         ...
 
@@ -98,6 +191,11 @@ class LangfuseTruncatingRunnableConfig:
         debug: bool = False,
         truncate_max_length: int = DEFAULT_MAX_LENGTH,
         truncate_max_vector_elements: int = DEFAULT_MAX_VECTOR_ELEMENTS,
+        truncate_max_depth: int = DEFAULT_MAX_DEPTH,
+        truncate_max_nodes: int = DEFAULT_MAX_NODES,
+        truncate_max_total_length: int = DEFAULT_MAX_TOTAL_LENGTH,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
     ) -> RunnableConfig:
         """Создает конфигурацию из параметров."""
         ...
@@ -112,6 +210,11 @@ class LangfuseTruncatingRunnableConfig:
         debug: bool = False,
         truncate_max_length: int = DEFAULT_MAX_LENGTH,
         truncate_max_vector_elements: int = DEFAULT_MAX_VECTOR_ELEMENTS,
+        truncate_max_depth: int = DEFAULT_MAX_DEPTH,
+        truncate_max_nodes: int = DEFAULT_MAX_NODES,
+        truncate_max_total_length: int = DEFAULT_MAX_TOTAL_LENGTH,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
     ) -> Any:
         """
         Создает чистый Langfuse callback с автоматической обрезкой данных.
@@ -127,6 +230,12 @@ class LangfuseTruncatingRunnableConfig:
             debug: Включить отладочный режим
             truncate_max_length: Максимальная длина строки перед обрезкой
             truncate_max_vector_elements: Максимальное количество элементов вектора
+            truncate_max_depth: Максимальная глубина вложенности данных
+            truncate_max_nodes: Максимальное количество узлов данных в одном событии
+            truncate_max_total_length: Максимальная суммарная длина строк в одном событии
+            run_name: Имя запуска для выбора доли выборки из sample_rates; только
+                влияет на выборку и не задает имя запуска в конфигурации
+            sampling_key: Ключ детерминированной выборки (id трейса или сессии)
 
         Returns:
             CallbackHandler для Langfuse с автоматической обрезкой
@@ -140,10 +249,13 @@ class LangfuseTruncatingRunnableConfig:
                 debug,
                 truncate_max_length,
                 truncate_max_vector_elements,
+                truncate_max_depth,
+                truncate_max_nodes,
+                truncate_max_total_length,
             )
-            version = detect_langfuse_version()
-            strategy = get_truncating_strategy(version)
-            return strategy.create_callback(settings_obj)
+            if not is_sampled(settings_obj, run_name, sampling_key):
+                return get_noop_handler()
+            return LangfuseTruncatingRunnableConfig._get_callback(settings_obj)
 
         except ImportError as e:
             logger.warning(
@@ -167,6 +279,11 @@ class LangfuseTruncatingRunnableConfig:
         debug: bool = False,
         truncate_max_length: int = DEFAULT_MAX_LENGTH,
         truncate_max_vector_elements: int = DEFAULT_MAX_VECTOR_ELEMENTS,
+        truncate_max_depth: int = DEFAULT_MAX_DEPTH,
+        truncate_max_nodes: int = DEFAULT_MAX_NODES,
+        truncate_max_total_length: int = DEFAULT_MAX_TOTAL_LENGTH,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
     ) -> RunnableConfig:
         """
         Создает RunnableConfig с Langfuse callback'ом и автоматической обрезкой данных.
@@ -182,6 +299,12 @@ class LangfuseTruncatingRunnableConfig:
             debug: Включить отладочный режим
             truncate_max_length: Максимальная длина строки перед обрезкой
             truncate_max_vector_elements: Максимальное количество элементов вектора
+            truncate_max_depth: Максимальная глубина вложенности данных
+            truncate_max_nodes: Максимальное количество узлов данных в одном событии
+            truncate_max_total_length: Максимальная суммарная длина строк в одном событии
+            run_name: Имя запуска для выбора доли выборки из sample_rates; только
+                влияет на выборку и не задает имя запуска в конфигурации
+            sampling_key: Ключ детерминированной выборки (id трейса или сессии)
 
         Returns:
             RunnableConfig с настроенным Langfuse callback'ом с обрезкой
@@ -195,10 +318,14 @@ class LangfuseTruncatingRunnableConfig:
                 debug,
                 truncate_max_length,
                 truncate_max_vector_elements,
+                truncate_max_depth,
+                truncate_max_nodes,
+                truncate_max_total_length,
             )
-            version = detect_langfuse_version()
-            strategy = get_truncating_strategy(version)
-            return strategy.create_config(settings_obj)
+            if not is_sampled(settings_obj, run_name, sampling_key):
+                return RunnableConfig(callbacks=[])
+            handler = LangfuseTruncatingRunnableConfig._get_callback(settings_obj)
+            return RunnableConfig(callbacks=[handler])
 
         except ImportError as e:
             logger.warning(
@@ -211,3 +338,95 @@ class LangfuseTruncatingRunnableConfig:
                 f"⚠️ Langfuse не настроен — трейсинг будет отключен. Ошибка: {e}"
             )
             return RunnableConfig(callbacks=[])
+
+    @staticmethod
+    async def acreate_callback(
+        *,
+        settings: Optional[LangfuseTruncatingSettings] = None,
+        url: Optional[str] = None,
+        public_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        debug: bool = False,
+        truncate_max_length: int = DEFAULT_MAX_LENGTH,
+        truncate_max_vector_elements: int = DEFAULT_MAX_VECTOR_ELEMENTS,
+        truncate_max_depth: int = DEFAULT_MAX_DEPTH,
+        truncate_max_nodes: int = DEFAULT_MAX_NODES,
+        truncate_max_total_length: int = DEFAULT_MAX_TOTAL_LENGTH,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> Any:
+        """
+        Асинхронный вариант create_callback(), не блокирующий event loop.
+
+        Если настройки, версия Langfuse и обработчик уже в кэшах процесса,
+        обработчик возвращается сразу. Иначе чтение настроек, определение
+        версии и создание обработчика и клиента выполняются в executor'е.
+        Параметры совпадают с create_callback().
+
+        Returns:
+            CallbackHandler для Langfuse с автоматической обрезкой
+        """
+        create = functools.partial(
+            LangfuseTruncatingRunnableConfig.create_callback,
+            settings=settings,
+            url=url,
+            public_key=public_key,
+            secret_key=secret_key,
+            debug=debug,
+            truncate_max_length=truncate_max_length,
+            truncate_max_vector_elements=truncate_max_vector_elements,
+            truncate_max_depth=truncate_max_depth,
+            truncate_max_nodes=truncate_max_nodes,
+            truncate_max_total_length=truncate_max_total_length,
+            run_name=run_name,
+            sampling_key=sampling_key,
+        )
+        if LangfuseTruncatingRunnableConfig._is_ready(settings, url):
+            return create()
+        return await run_off_loop(create)
+
+    @staticmethod
+    async def acreate_config(
+        *,
+        settings: Optional[LangfuseTruncatingSettings] = None,
+        url: Optional[str] = None,
+        public_key: Optional[str] = None,
+        secret_key: Optional[str] = None,
+        debug: bool = False,
+        truncate_max_length: int = DEFAULT_MAX_LENGTH,
+        truncate_max_vector_elements: int = DEFAULT_MAX_VECTOR_ELEMENTS,
+        truncate_max_depth: int = DEFAULT_MAX_DEPTH,
+        truncate_max_nodes: int = DEFAULT_MAX_NODES,
+        truncate_max_total_length: int = DEFAULT_MAX_TOTAL_LENGTH,
+        run_name: Optional[str] = None,
+        sampling_key: Optional[Hashable] = None,
+    ) -> RunnableConfig:
+        """
+        Асинхронный вариант create_config(), не блокирующий event loop.
+
+        Если настройки, версия Langfuse и обработчик уже в кэшах процесса,
+        конфигурация создается сразу. Иначе чтение настроек, определение
+        версии и создание обработчика и клиента выполняются в executor'е.
+        Параметры совпадают с create_config().
+
+        Returns:
+            RunnableConfig с настроенным Langfuse callback'ом с обрезкой
+        """
+        create = functools.partial(
+            LangfuseTruncatingRunnableConfig.create_config,
+            settings=settings,
+            url=url,
+            public_key=public_key,
+            secret_key=secret_key,
+            debug=debug,
+            truncate_max_length=truncate_max_length,
+            truncate_max_vector_elements=truncate_max_vector_elements,
+            truncate_max_depth=truncate_max_depth,
+            truncate_max_nodes=truncate_max_nodes,
+            truncate_max_total_length=truncate_max_total_length,
+            run_name=run_name,
+            sampling_key=sampling_key,
+        )
+        if LangfuseTruncatingRunnableConfig._is_ready(settings, url):
+            return create()
+        return await run_off_loop(create)
@@ -0,0 +1,70 @@
+"""Заблаговременная подготовка трейсинга в процессе воркера."""
+
+import logging
+import time
+from typing import Any, NamedTuple, Optional, Union
+
+from langfuse_runnable_config.factories.simple import LangfuseRunnableConfig
+from langfuse_runnable_config.factories.truncating import LangfuseTruncatingRunnableConfig
+from langfuse_runnable_config.internal.cache import get_settings_cache
+from langfuse_runnable_config.settings import LangfuseSettings, LangfuseTruncatingSettings
+
+logger = logging.getLogger(__name__)
+
+
+class WarmupReport(NamedTuple):
+    """Результат warmup()."""
+
+    version: Optional[int]
+    handler: Any
+    duration_ms: float
+
+
+def warmup(
+    settings: Optional[Union[LangfuseSettings, LangfuseTruncatingSettings]] = None,
+    truncating: bool = True,
+) -> WarmupReport:
+    """
+    Выполняет заранее все, что иначе замедлило бы первый трейсинг в процессе.
+
+    Импортирует langfuse, определяет его версию, загружает настройки из
+    окружения, создает класс обработчика, сам обработчик и клиент и кладет
+    обработчик в кэш, так что следующий create_config() с теми же настройками
+    возвращает его без задержки. Выборка (sample_rate) при этом не применяется.
+
+    Вызывайте в каждом воркере после fork(), например в хуке post_fork
+    gunicorn: состояние, созданное до fork(), в дочернем процессе сбрасывается
+    (см. reset_after_fork).
+
+    Args:
+        settings: Настройки (по умолчанию читаются из окружения, как в create_config())
+        truncating: Готовить обработчик с обрезкой (LangfuseTruncatingRunnableConfig)
+            или простой (LangfuseRunnableConfig); при переданных settings
+            определяется их типом
+
+    Returns:
+        Версия Langfuse, для которой создан обработчик (major_version из
+        настроек или версия установленного пакета), сам обработчик (оба None,
+        если Langfuse не установлен или не настроен) и длительность
+        подготовки в мс
+    """
+    start = time.perf_counter()
+    if settings is not None:
+        truncating = isinstance(settings, LangfuseTruncatingSettings)
+    version = None
+    handler = None
+    try:
+        if truncating:
+            settings_obj = settings or get_settings_cache().get(LangfuseTruncatingSettings)
+            handler, version = LangfuseTruncatingRunnableConfig.resolve_callback(settings_obj)
+        else:
+            settings_obj = settings or get_settings_cache().get(LangfuseSettings)
+            handler, version = LangfuseRunnableConfig.resolve_callback(settings_obj)
+    except ImportError as e:
+        logger.warning(
+            f"⚠️ Langfuse не установлен — прогрев пропущен. "
+            f"Установите: pip install langfuse. Ошибка: {e}"
+        )
+    except Exception as e:
+        logger.warning(f"⚠️ Langfuse не настроен — прогрев пропущен. Ошибка: {e}")
+    return WarmupReport(version, handler, (time.perf_counter() - start) * 1000)
@@ -0,0 +1,23 @@
+"""Кэширование обработчиков и настроек Langfuse."""
+
+from langfuse_runnable_config.internal.cache.handlers import (
+    CacheInfo,
+    HandlerCache,
+    get_handler_cache,
+    make_cache_key,
+)
+from langfuse_runnable_config.internal.cache.settings import (
+    SettingsCache,
+    get_settings_cache,
+    reload_settings,
+)
+
+__all__ = [
+    "CacheInfo",
+    "HandlerCache",
+    "SettingsCache",
+    "get_handler_cache",
+    "get_settings_cache",
+    "make_cache_key",
+    "reload_settings",
+]
@@ -0,0 +1,186 @@
+"""Процессный LRU-кэш обработчиков Langfuse."""
+
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, List, NamedTuple
+
+from pydantic_settings import BaseSettings
+
+from langfuse_runnable_config.internal.constants import DEFAULT_HANDLER_CACHE_SIZE
+from langfuse_runnable_config.internal.handlers.lifecycle import release_handler, shutdown_handler
+
+# Поля настроек, не влияющие на создаваемый обработчик
+_NON_HANDLER_FIELDS = {"sample_rate", "sample_rates"}
+
+
+class CacheInfo(NamedTuple):
+    """Статистика кэша обработчиков."""
+
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+
+
+def make_cache_key(kind: str, version: int, settings: BaseSettings) -> Hashable:
+    """
+    Строит ключ кэша по эффективным настройкам.
+
+    Параметры выборки не влияют на обработчик и в ключ не входят.
+
+    Args:
+        kind: Тип фабрики ("simple" или "truncating")
+        version: Мажорная версия Langfuse
+        settings: Объект настроек
+
+    Returns:
+        Хешируемый ключ кэша
+    """
+    return (
+        kind,
+        version,
+        type(settings),
+        settings.model_dump_json(exclude=_NON_HANDLER_FIELDS),
+    )
+
+
+class HandlerCache:
+    """
+    Потокобезопасный LRU-кэш обработчиков, ключом которого служат настройки.
+
+    Вытесненные обработчики сбрасывают буфер в фоновом потоке, не задерживая
+    вызвавший промах запрос, но могут еще использоваться в созданных ранее
+    конфигурациях, поэтому их очередь и клиент останавливаются, когда на
+    обработчик не останется ссылок. clear() останавливает обработчики сразу.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_HANDLER_CACHE_SIZE) -> None:
+        """
+        Инициализирует кэш.
+
+        Args:
+            maxsize: Максимальное количество обработчиков (0 отключает кэш)
+        """
+        self._maxsize = maxsize
+        self._handlers: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def get_or_create(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Возвращает обработчик из кэша или создает новый.
+
+        Args:
+            key: Ключ кэша (см. make_cache_key)
+            factory: Функция создания обработчика при промахе
+
+        Returns:
+            CallbackHandler для Langfuse
+        """
+        with self._lock:
+            handler = self._handlers.get(key)
+            if handler is not None:
+                self._handlers.move_to_end(key)
+                self._hits += 1
+                return handler
+            self._misses += 1
+
+        # Создание обработчика может быть долгим — выполняем его без блокировки
+        handler = factory()
+        if self._maxsize <= 0:
+            return handler
+
+        with self._lock:
+            existing = self._handlers.get(key)
+            if existing is None:
+                self._handlers[key] = handler
+                evicted = self._evict_locked()
+            else:
+                # Параллельный промах уже создал обработчик — используем его
+                self._handlers.move_to_end(key)
+                evicted = [handler]
+                handler = existing
+
+        self._release(evicted)
+        return handler
+
+    def contains(self, key: Hashable) -> bool:
+        """Проверяет, есть ли в кэше обработчик с ключом, не меняя статистику."""
+        with self._lock:
+            return key in self._handlers
+
+    def info(self) -> CacheInfo:
+        """Возвращает статистику попаданий и промахов."""
+        with self._lock:
+            return CacheInfo(self._hits, self._misses, self._maxsize, len(self._handlers))
+
+    def resize(self, maxsize: int) -> None:
+        """
+        Изменяет максимальный размер кэша, вытесняя лишние обработчики.
+
+        Args:
+            maxsize: Новый максимальный размер (0 отключает кэш)
+        """
+        with self._lock:
+            self._maxsize = maxsize
+            evicted = self._evict_locked()
+        self._release(evicted)
+
+    def clear(self) -> None:
+        """Очищает кэш, останавливая все обработчики, и сбрасывает статистику."""
+        with self._lock:
+            evicted = list(self._handlers.values())
+            self._handlers.clear()
+            self._hits = 0
+            self._misses = 0
+        self._shutdown(evicted)
+
+    def reset_after_fork(self) -> None:
+        """
+        Забывает обработчики, унаследованные дочерним процессом после fork().
+
+        Обработчики не останавливаются: их очереди и клиенты принадлежат
+        родительскому процессу, и повторная отправка продублировала бы события.
+        """
+        self._handlers = OrderedDict()
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+
+    def _evict_locked(self) -> List[Any]:
+        """Удаляет наименее используемые обработчики сверх лимита."""
+        evicted = []
+        while self._handlers and len(self._handlers) > max(self._maxsize, 0):
+            _, handler = self._handlers.popitem(last=False)
+            evicted.append(handler)
+        return evicted
+
+    @staticmethod
+    def _release(handlers: List[Any]) -> None:
+        """Сбрасывает вытесненные обработчики в daemon-потоке (см. release_handler)."""
+        if not handlers:
+            return
+
+        def release() -> None:
+            for handler in handlers:
+                release_handler(handler)
+
+        # Очередь вытесненного обработчика и отправка в сеть не ограничены по
+        # времени — поток запроса их не ждет, а при завершении процесса события
+        # отправит flush_all() реестра обработчиков
+        threading.Thread(target=release, name="langfuse-release", daemon=True).start()
+
+    @staticmethod
+    def _shutdown(handlers: List[Any]) -> None:
+        """Останавливает вытесненные обработчики вне блокировки."""
+        for handler in handlers:
+            shutdown_handler(handler)
+
+
+_handler_cache = HandlerCache()
+
+
+def get_handler_cache() -> HandlerCache:
+    """Возвращает общий для процесса кэш обработчиков."""
+    return _handler_cache
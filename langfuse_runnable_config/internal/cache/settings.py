@@ -0,0 +1,125 @@
+"""Кэш настроек, загружаемых из переменных окружения и .env."""
+
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple, Type, TypeVar
+
+from pydantic_settings import BaseSettings
+
+SettingsT = TypeVar("SettingsT", bound=BaseSettings)
+
+# Состояние env-файлов: (путь, mtime_ns) для каждого файла, None — файла нет
+_EnvFilesState = Tuple[Tuple[str, Optional[int]], ...]
+
+
+def _env_files_state(settings_cls: Type[BaseSettings]) -> _EnvFilesState:
+    """Возвращает время изменения env-файлов класса настроек."""
+    env_file = settings_cls.model_config.get("env_file")
+    if env_file is None:
+        return ()
+    paths = [env_file] if isinstance(env_file, (str, os.PathLike)) else list(env_file)
+
+    state = []
+    for path in paths:
+        try:
+            mtime: Optional[int] = os.stat(path).st_mtime_ns
+        except OSError:
+            mtime = None
+        state.append((os.fspath(path), mtime))
+    return tuple(state)
+
+
+class SettingsCache:
+    """
+    Потокобезопасный кэш настроек, создаваемых без параметров.
+
+    Настройки читаются из окружения и .env один раз на класс. Изменения
+    окружения подхватываются только после reload(). Если включен
+    watch_env_file, .env перечитывается при изменении его mtime.
+    """
+
+    def __init__(self, watch_env_file: bool = False) -> None:
+        """
+        Создает пустой кэш.
+
+        Args:
+            watch_env_file: Проверять mtime env-файлов при каждом обращении
+        """
+        self.watch_env_file = watch_env_file
+        self._settings: Dict[type, Tuple[Any, _EnvFilesState]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, settings_cls: Type[SettingsT]) -> SettingsT:
+        """
+        Возвращает закэшированные настройки класса, загружая их при первом обращении.
+
+        Args:
+            settings_cls: Класс настроек
+
+        Returns:
+            Экземпляр settings_cls, общий для всех вызовов до reload()
+
+        Raises:
+            pydantic.ValidationError: Если настройки не заданы или некорректны
+        """
+        entry = self._settings.get(settings_cls)
+        if entry is not None and (
+            not self.watch_env_file or entry[1] == _env_files_state(settings_cls)
+        ):
+            return entry[0]
+
+        with self._lock:
+            state = _env_files_state(settings_cls)
+            entry = self._settings.get(settings_cls)
+            if entry is None or (self.watch_env_file and entry[1] != state):
+                entry = (settings_cls(), state)
+                self._settings[settings_cls] = entry
+            return entry[0]
+
+    def peek(self, settings_cls: Type[SettingsT]) -> Optional[SettingsT]:
+        """
+        Возвращает закэшированные настройки класса без чтения окружения и файлов.
+
+        Returns:
+            Экземпляр settings_cls или None, если настройки еще не загружены
+            или включен watch_env_file (проверка mtime требует обращения к ФС)
+        """
+        entry = self._settings.get(settings_cls)
+        if entry is None or self.watch_env_file:
+            return None
+        return entry[0]
+
+    def reset_after_fork(self) -> None:
+        """Заменяет блокировку, которую мог удерживать поток родительского процесса."""
+        self._lock = threading.Lock()
+
+    def reload(self, settings_cls: Optional[Type[BaseSettings]] = None) -> None:
+        """
+        Сбрасывает кэш, чтобы настройки перечитались при следующем обращении.
+
+        Args:
+            settings_cls: Класс настроек (по умолчанию — все классы)
+        """
+        with self._lock:
+            if settings_cls is None:
+                self._settings.clear()
+            else:
+                self._settings.pop(settings_cls, None)
+
+
+_settings_cache = SettingsCache()
+
+
+def get_settings_cache() -> SettingsCache:
+    """Возвращает общий для процесса кэш настроек."""
+    return _settings_cache
+
+
+def reload_settings(settings_cls: Optional[Type[BaseSettings]] = None) -> None:
+    """
+    Перечитывает настройки из окружения и .env при следующем create_config().
+
+    Args:
+        settings_cls: Класс настроек (по умолчанию — все классы)
+    """
+    _settings_cache.reload(settings_cls)
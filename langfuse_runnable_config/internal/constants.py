@@ -3,3 +3,41 @@
 # Значения по умолчанию для обрезки
 DEFAULT_MAX_LENGTH: int = 10_000
 DEFAULT_MAX_VECTOR_ELEMENTS: int = 10
+
+# Максимальное количество обработчиков в кэше
+DEFAULT_HANDLER_CACHE_SIZE: int = 32
+
+# Параметры пула HTTP-соединений (совпадают со значениями httpx по умолчанию)
+DEFAULT_HTTP_MAX_CONNECTIONS: int = 100
+DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+DEFAULT_HTTP_KEEPALIVE_EXPIRY: float = 5.0
+DEFAULT_HTTP_TIMEOUT: float = 5.0
+
+# Ограничения обхода данных при сериализации
+DEFAULT_MAX_DEPTH: int = 20
+DEFAULT_MAX_NODES: int = 10_000
+DEFAULT_MAX_TOTAL_LENGTH: int = 1_000_000
+
+# Отложенная сериализация: размер очереди и политика при ее заполнении
+DEFAULT_OFFLOAD_QUEUE_SIZE: int = 1_000
+DEFAULT_OFFLOAD_POLICY: str = "degrade"
+
+# Количество запоминаемых обработчиком результатов обрезки
+DEFAULT_MEMO_SIZE: int = 64
+
+# Ограничения обхода данных в режиме деградации (очередь переполнена)
+DEGRADED_MAX_LENGTH: int = 200
+DEGRADED_MAX_VECTOR_ELEMENTS: int = 3
+DEGRADED_MAX_DEPTH: int = 5
+DEGRADED_MAX_NODES: int = 200
+DEGRADED_MAX_TOTAL_LENGTH: int = 5_000
+
+# Адаптивная обрезка: нижние границы лимитов, целевое время сериализации события
+# и целевой объем событий в очереди фонового потока (суммарная длина строк)
+DEFAULT_ADAPTIVE_MIN_LENGTH: int = 500
+DEFAULT_ADAPTIVE_MIN_VECTOR_ELEMENTS: int = 2
+DEFAULT_ADAPTIVE_TARGET_MS: float = 2.0
+DEFAULT_ADAPTIVE_TARGET_QUEUE_LENGTH: int = 10_000_000
+
+# Максимальное время отправки накопленных событий при завершении процесса, в секундах
+DEFAULT_SHUTDOWN_TIMEOUT: float = 5.0
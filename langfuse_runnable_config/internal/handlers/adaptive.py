@@ -0,0 +1,169 @@
+"""Адаптивное изменение лимитов обрезки под нагрузкой."""
+
+import threading
+from typing import Any, Dict, Mapping, NamedTuple
+
+from langfuse_runnable_config.internal.constants import (
+    DEFAULT_ADAPTIVE_MIN_LENGTH,
+    DEFAULT_ADAPTIVE_MIN_VECTOR_ELEMENTS,
+    DEFAULT_ADAPTIVE_TARGET_MS,
+    DEFAULT_ADAPTIVE_TARGET_QUEUE_LENGTH,
+)
+
+# Вес нового измерения в скользящем среднем
+_EWMA_ALPHA: float = 0.2
+
+# Окно скользящего среднего в событиях: после уменьшения масштаба средние
+# отражают новые лимиты только через столько событий
+_EWMA_WINDOW: int = round(1 / _EWMA_ALPHA)
+
+# Уменьшение масштаба при перегрузке и прирост за каждое событие без нее
+_DECREASE_FACTOR: float = 0.5
+_INCREASE_STEP: float = 0.05
+
+
+class AdaptiveLimitsInfo(NamedTuple):
+    """Текущее состояние адаптивных лимитов."""
+
+    scale: float
+    max_length: int
+    max_vector_elements: int
+    serialize_ms: float
+    payload_length: float
+    queue_length: float
+
+
+class AdaptiveLimits:
+    """
+    Масштабирует max_length и max_vector_elements по нагрузке (AIMD).
+
+    Перегрузкой считается скользящее среднее времени сериализации события
+    выше target_ms или объем неотправленных событий выше target_queue_length.
+    Объем оценивается как количество ожидающих событий (очередь отложенной
+    сериализации и очередь ингеста SDK v2), умноженное на скользящее среднее
+    суммарной длины строк события. При перегрузке масштаб уменьшается вдвое,
+    но не чаще раза за окно скользящего среднего, без нее — растет на 5% за
+    событие до 1.0. Лимиты не опускаются ниже нижних границ.
+    """
+
+    def __init__(
+        self,
+        max_length: int,
+        max_vector_elements: int,
+        min_length: int = DEFAULT_ADAPTIVE_MIN_LENGTH,
+        min_vector_elements: int = DEFAULT_ADAPTIVE_MIN_VECTOR_ELEMENTS,
+        target_ms: float = DEFAULT_ADAPTIVE_TARGET_MS,
+        target_queue_length: int = DEFAULT_ADAPTIVE_TARGET_QUEUE_LENGTH,
+    ) -> None:
+        """
+        Инициализирует контроллер с исходными (максимальными) лимитами.
+
+        Args:
+            max_length: Максимальная длина строки (верхняя граница)
+            max_vector_elements: Максимальное количество элементов вектора
+            min_length: Нижняя граница длины строки
+            min_vector_elements: Нижняя граница количества элементов вектора
+            target_ms: Целевое среднее время сериализации события в мс
+            target_queue_length: Целевая суммарная длина строк событий в очереди
+        """
+        self._max_length = max_length
+        self._max_vector_elements = max_vector_elements
+        self._min_length = min_length
+        self._min_vector_elements = min_vector_elements
+        self._target_ms = target_ms
+        self._target_queue_length = target_queue_length
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self._scale = 1.0
+        self._serialize_ms = 0.0
+        self._payload_length = 0.0
+        self._queue_length = 0.0
+        # Событий с последнего уменьшения масштаба (первая перегрузка учитывается сразу)
+        self._since_decrease = _EWMA_WINDOW
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # Копия начинает с исходных лимитов и без измерений
+        return {
+            "_max_length": self._max_length,
+            "_max_vector_elements": self._max_vector_elements,
+            "_min_length": self._min_length,
+            "_min_vector_elements": self._min_vector_elements,
+            "_target_ms": self._target_ms,
+            "_target_queue_length": self._target_queue_length,
+        }
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._init_state()
+
+    @property
+    def scale(self) -> float:
+        """Текущий масштаб лимитов от 0 до 1."""
+        return self._scale
+
+    def apply(self, limits: Mapping[str, int]) -> Dict[str, int]:
+        """
+        Масштабирует лимиты события.
+
+        Args:
+            limits: Лимиты TracingSerializer для типа события
+
+        Returns:
+            Лимиты с уменьшенными max_length и max_vector_elements
+        """
+        scale = self._scale
+        if scale >= 1.0:
+            return dict(limits)
+        return {
+            **limits,
+            "max_length": self._scaled(limits["max_length"], self._min_length, scale),
+            "max_vector_elements": self._scaled(
+                limits["max_vector_elements"], self._min_vector_elements, scale
+            ),
+        }
+
+    def observe(self, serialize_ms: float, payload_length: int, queued_events: int = 0) -> None:
+        """
+        Учитывает измерение одного события и пересчитывает масштаб.
+
+        Args:
+            serialize_ms: Время сериализации события в мс
+            payload_length: Суммарная длина строк в результате
+            queued_events: Количество событий, ожидающих сериализации или отправки
+        """
+        with self._lock:
+            self._serialize_ms += _EWMA_ALPHA * (serialize_ms - self._serialize_ms)
+            self._payload_length += _EWMA_ALPHA * (payload_length - self._payload_length)
+            self._queue_length = self._payload_length * queued_events
+            self._since_decrease += 1
+            if (
+                self._serialize_ms > self._target_ms
+                or self._queue_length > self._target_queue_length
+            ):
+                # Средние еще не отражают предыдущее уменьшение
+                if self._since_decrease >= _EWMA_WINDOW:
+                    self._scale *= _DECREASE_FACTOR
+                    self._since_decrease = 0
+            else:
+                self._scale = min(1.0, self._scale + _INCREASE_STEP)
+
+    def info(self) -> AdaptiveLimitsInfo:
+        """Возвращает текущие эффективные лимиты и измерения."""
+        scale = self._scale
+        return AdaptiveLimitsInfo(
+            scale=scale,
+            max_length=self._scaled(self._max_length, self._min_length, scale),
+            max_vector_elements=self._scaled(
+                self._max_vector_elements, self._min_vector_elements, scale
+            ),
+            serialize_ms=self._serialize_ms,
+            payload_length=self._payload_length,
+            queue_length=self._queue_length,
+        )
+
+    @staticmethod
+    def _scaled(limit: int, lower: int, scale: float) -> int:
+        """Масштабирует лимит, не опуская его ниже нижней границы."""
+        return max(min(limit, lower), int(limit * scale))
@@ -1,14 +1,88 @@
 """Базовый mixin для обработчиков с автоматической обрезкой."""
 
-from typing import Any, Dict, Sequence
+import threading
+import time
+from typing import Any, Callable, Dict, List, Mapping, Optional, Sequence, Set, Tuple
 
 from langchain_core.documents import Document
 
 from langfuse_runnable_config.internal.constants import (
+    DEFAULT_ADAPTIVE_MIN_LENGTH,
+    DEFAULT_ADAPTIVE_MIN_VECTOR_ELEMENTS,
+    DEFAULT_ADAPTIVE_TARGET_MS,
+    DEFAULT_ADAPTIVE_TARGET_QUEUE_LENGTH,
+    DEFAULT_MAX_DEPTH,
     DEFAULT_MAX_LENGTH,
+    DEFAULT_MAX_NODES,
+    DEFAULT_MAX_TOTAL_LENGTH,
     DEFAULT_MAX_VECTOR_ELEMENTS,
+    DEFAULT_MEMO_SIZE,
+    DEFAULT_OFFLOAD_POLICY,
+    DEFAULT_OFFLOAD_QUEUE_SIZE,
+    DEGRADED_MAX_DEPTH,
+    DEGRADED_MAX_LENGTH,
+    DEGRADED_MAX_NODES,
+    DEGRADED_MAX_TOTAL_LENGTH,
+    DEGRADED_MAX_VECTOR_ELEMENTS,
+)
+from langfuse_runnable_config.internal.handlers.adaptive import AdaptiveLimits, AdaptiveLimitsInfo
+from langfuse_runnable_config.internal.handlers.lifecycle import pending_events
+from langfuse_runnable_config.internal.handlers.offload import SerializationOffloader
+from langfuse_runnable_config.internal.metrics import MetricsSink, get_metrics_sink
+from langfuse_runnable_config.internal.serializers import (
+    STRING_STRATEGIES,
+    ScopedMemo,
+    SerializationMemo,
+    TracingSerializer,
+    resolve_length_unit,
+)
+from langfuse_runnable_config.internal.transport import (
+    get_http_client_pool,
+    get_langfuse_client_registry,
 )
-from langfuse_runnable_config.internal.serializers import serialize_for_tracing
+
+# Типы событий, для которых можно задать собственные лимиты
+EVENT_TYPES = frozenset({"chain", "retriever", "llm", "chat_model", "tool", "agent"})
+
+# Параметры TracingSerializer, которые можно переопределить для типа события
+LIMIT_NAMES = frozenset(
+    {"max_length", "max_vector_elements", "max_depth", "max_nodes", "max_total_length"}
+)
+
+# Политики при переполненной очереди отложенной сериализации
+OFFLOAD_POLICIES = frozenset({"drop", "block", "degrade"})
+
+# Подготовка аргументов события: обходчик -> (args, kwargs) базового обработчика
+_Prepare = Callable[[Any], Tuple[Tuple[Any, ...], Dict[str, Any]]]
+
+# Атрибуты mixin'а, которые переносятся pickle; остальное состояние (клиент SDK,
+# блокировки, незавершенные запуски) базовый обработчик создает заново
+_PICKLED_ATTRIBUTES = (
+    "_max_length",
+    "_max_vector_elements",
+    "_max_depth",
+    "_max_nodes",
+    "_max_total_length",
+    "_event_limits",
+    "_offload_policy",
+    "_offloader",
+    "_adaptive",
+    "_metrics_sink",
+    "_memo",
+    "_document_options",
+    "_client_settings",
+    "_base_kwargs",
+)
+
+# Аргументы базового обработчика, которые не переносятся pickle (общий httpx.Client v2)
+_UNPICKLED_BASE_KWARGS = frozenset({"httpx_client"})
+
+
+def _copy_model(model: Any, **update: Any) -> Any:
+    """Копирует модель LangChain с заменой полей (Pydantic v2 и v1)."""
+    if hasattr(model, "model_copy"):
+        return model.model_copy(update=update)
+    return model.copy(update=update)
 
 
 class TruncatingMixin:
@@ -16,13 +90,60 @@ class TruncatingMixin:
     Mixin, добавляющий автоматическую обрезку данных для Langfuse callbacks.
 
     Автоматически обрезает большие строки и векторы перед отправкой в Langfuse,
-    предотвращая проблемы с размером данных.
+    предотвращая проблемы с размером данных. Обрезаются входы и выходы цепочек,
+    ретриверов, LLM и чат-моделей, инструментов и агентов.
+
+    В режиме offload обрезка и передача события базовому обработчику выполняются
+    в фоновом потоке обработчика, поэтому callback почти не задерживает цепочку.
+    Данные события при этом не копируются: их нельзя изменять после вызова.
+
+    В адаптивном режиме лимиты уменьшаются под нагрузкой, а их текущие
+    значения доступны через adaptive_limits_info().
+
+    Время сериализации, размеры данных до и после обрезки и количество
+    обрезанных значений передаются в приемник метрик (см. set_metrics_sink).
+    По умолчанию метрики не собираются и замеры не выполняются.
+
+    С memo результаты обрезки запоминаются по идентичности объекта, так что
+    состояние, переданное выходом одного шага и входом следующего, обрезается
+    один раз. Кэш очищается по завершении корневой цепочки трейса.
+
+    При pickle сохраняются настройки обрезки и аргументы базового обработчика,
+    а при восстановлении базовый обработчик создается заново: клиент SDK и
+    незавершенные запуски не переносятся. Если переданы client_settings, в
+    процессе восстановления клиент проекта v3+ создается через реестр клиентов,
+    а общий httpx.Client v2 берется из пула.
     """
 
+    # Базовый обработчик принимает общий httpx.Client из пула (Langfuse v2)
+    _uses_http_client_pool = False
+
     def __init__(
         self,
         max_length: int = DEFAULT_MAX_LENGTH,
         max_vector_elements: int = DEFAULT_MAX_VECTOR_ELEMENTS,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        max_nodes: int = DEFAULT_MAX_NODES,
+        max_total_length: int = DEFAULT_MAX_TOTAL_LENGTH,
+        event_limits: Optional[Mapping[str, Mapping[str, int]]] = None,
+        offload: bool = False,
+        offload_queue_size: int = DEFAULT_OFFLOAD_QUEUE_SIZE,
+        offload_policy: str = DEFAULT_OFFLOAD_POLICY,
+        adaptive: bool = False,
+        adaptive_min_length: int = DEFAULT_ADAPTIVE_MIN_LENGTH,
+        adaptive_min_vector_elements: int = DEFAULT_ADAPTIVE_MIN_VECTOR_ELEMENTS,
+        adaptive_target_ms: float = DEFAULT_ADAPTIVE_TARGET_MS,
+        adaptive_target_queue_length: int = DEFAULT_ADAPTIVE_TARGET_QUEUE_LENGTH,
+        metrics_sink: Optional[MetricsSink] = None,
+        memo: bool = False,
+        memo_size: int = DEFAULT_MEMO_SIZE,
+        document_metadata_keys: Optional[Sequence[str]] = None,
+        dedupe_documents: bool = False,
+        length_unit: str = "chars",
+        tokenizer: str = "approx",
+        string_strategy: str = "head",
+        fingerprint: bool = False,
+        client_settings: Optional[Any] = None,
         **kwargs: Any,
     ) -> None:
         """
@@ -31,72 +152,558 @@ class TruncatingMixin:
         Args:
             max_length: Максимальная длина строки перед обрезкой
             max_vector_elements: Максимальное количество элементов вектора
+            max_depth: Максимальная глубина вложенности данных
+            max_nodes: Максимальное количество узлов в одном событии
+            max_total_length: Максимальная суммарная длина строк в одном событии
+            event_limits: Лимиты для отдельных типов событий, например
+                {"llm": {"max_length": 2000}}; типы событий — EVENT_TYPES
+            offload: Сериализовать и отправлять события в фоновом потоке
+            offload_queue_size: Максимальное количество событий в очереди
+            offload_policy: Поведение при переполненной очереди: "block" — ждать
+                места, "degrade" — обрезать с жесткими лимитами, "drop" —
+                отбросить событие начала запуска вместе с его завершением
+            adaptive: Уменьшать max_length и max_vector_elements под нагрузкой
+            adaptive_min_length: Нижняя граница max_length в адаптивном режиме
+            adaptive_min_vector_elements: Нижняя граница max_vector_elements
+            adaptive_target_ms: Целевое среднее время сериализации события в мс
+            adaptive_target_queue_length: Целевая суммарная длина строк
+                неотправленных событий (очередь отложенной сериализации и
+                очередь ингеста SDK v2; очередь спанов v3+ не учитывается)
+            metrics_sink: Приемник метрик обработчика (по умолчанию общий
+                приемник процесса, см. get_metrics_sink)
+            memo: Запоминать результаты обрезки повторно передаваемых объектов
+            memo_size: Максимальное количество запомненных объектов
+            document_metadata_keys: Ключи метаданных Document, которые нужно
+                сохранить (None — все)
+            dedupe_documents: Заменять повторяющееся в событии содержимое
+                Document ссылкой на первое вхождение
+            length_unit: Единица лимитов длины строк: "chars", "bytes" (UTF-8)
+                или "tokens"
+            tokenizer: Токенизатор для length_unit="tokens": "approx" или имя,
+                зарегистрированное через register_tokenizer
+            string_strategy: Какую часть длинной строки сохранить: "head",
+                "tail" или "head_tail"
+            fingerprint: Добавлять к обрезанной строке исходную длину и хеш
+                содержимого
+            client_settings: Настройки Langfuse, по которым обработчик,
+                восстановленный из pickle, заново получает клиент SDK
             **kwargs: Дополнительные аргументы для базового класса
+
+        Raises:
+            ValueError: Если в event_limits указан неизвестный тип события или лимит,
+                либо неизвестны политика offload_policy, единица длины, токенизатор
+                или стратегия обрезки строк
         """
+        if offload_policy not in OFFLOAD_POLICIES:
+            raise ValueError(f"Неизвестная политика offload_policy: {offload_policy!r}")
+        if string_strategy not in STRING_STRATEGIES:
+            raise ValueError(f"Неизвестная стратегия обрезки строк: {string_strategy!r}")
         self._max_length = max_length
         self._max_vector_elements = max_vector_elements
+        self._max_depth = max_depth
+        self._max_nodes = max_nodes
+        self._max_total_length = max_total_length
+        self._event_limits = self._resolve_event_limits(event_limits or {})
+        self._offload_policy = offload_policy
+        self._offloader = SerializationOffloader(offload_queue_size) if offload else None
+        self._adaptive = (
+            AdaptiveLimits(
+                max_length,
+                max_vector_elements,
+                min_length=adaptive_min_length,
+                min_vector_elements=adaptive_min_vector_elements,
+                target_ms=adaptive_target_ms,
+                target_queue_length=adaptive_target_queue_length,
+            )
+            if adaptive
+            else None
+        )
+        self._metrics_sink = metrics_sink
+        self._memo = SerializationMemo(memo_size) if memo else None
+        # run_id запуска -> run_id корня его трейса и обратный индекс (только с memo);
+        # обработчик из кэша разделяется потоками, поэтому индексы под блокировкой
+        self._trace_roots: Dict[Any, Any] = {}
+        self._trace_runs: Dict[Any, Set[Any]] = {}
+        # run_id запусков, начало которых отброшено политикой "drop"
+        self._dropped_runs: Set[Any] = set()
+        self._trace_lock = threading.Lock()
+        self._document_options: Dict[str, Any] = {
+            "document_metadata_keys": document_metadata_keys,
+            "dedupe_documents": dedupe_documents,
+            "length_unit": resolve_length_unit(length_unit, tokenizer),
+            "string_strategy": string_strategy,
+            "fingerprint": fingerprint,
+        }
+        self._client_settings = client_settings
+        self._base_kwargs = kwargs
         super().__init__(**kwargs)
 
-    def on_chain_start(self, serialized: Any, inputs: Any, **kwargs: Any) -> Any:
-        return super().on_chain_start(
-            serialized,
-            serialize_for_tracing(inputs, self._max_length, self._max_vector_elements),
-            **kwargs,
+    def __getstate__(self) -> Dict[str, Any]:
+        state = {name: getattr(self, name) for name in _PICKLED_ATTRIBUTES}
+        state["_base_kwargs"] = {
+            key: value
+            for key, value in self._base_kwargs.items()
+            if key not in _UNPICKLED_BASE_KWARGS
+        }
+        return state
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self.__dict__.update(state)
+        self._trace_roots = {}
+        self._trace_runs = {}
+        self._dropped_runs = set()
+        self._trace_lock = threading.Lock()
+        super().__init__(**self._base_kwargs, **self._restore_transport())
+
+    def _restore_transport(self) -> Dict[str, Any]:
+        """Заново получает клиент SDK в процессе, где обработчик восстановлен из pickle."""
+        settings = self._client_settings
+        if settings is None:
+            return {}
+        if self._uses_http_client_pool:
+            return {"httpx_client": get_http_client_pool().get_client(settings)}
+        # CallbackHandler v3+ находит клиент проекта в SDK по public_key
+        get_langfuse_client_registry().get_client(settings)
+        return {}
+
+    def adaptive_limits_info(self) -> Optional[AdaptiveLimitsInfo]:
+        """Возвращает текущие эффективные лимиты адаптивного режима (None, если выключен)."""
+        if self._adaptive is None:
+            return None
+        return self._adaptive.info()
+
+    def _resolve_event_limits(
+        self, event_limits: Mapping[str, Mapping[str, int]]
+    ) -> Dict[str, Dict[str, int]]:
+        """Объединяет общие лимиты с переопределениями для типов событий."""
+        unknown_events = set(event_limits) - EVENT_TYPES
+        if unknown_events:
+            raise ValueError(f"Неизвестные типы событий в event_limits: {sorted(unknown_events)}")
+
+        defaults = {
+            "max_length": self._max_length,
+            "max_vector_elements": self._max_vector_elements,
+            "max_depth": self._max_depth,
+            "max_nodes": self._max_nodes,
+            "max_total_length": self._max_total_length,
+        }
+        resolved = {}
+        for event in EVENT_TYPES:
+            overrides = dict(event_limits.get(event, {}))
+            unknown_limits = set(overrides) - LIMIT_NAMES
+            if unknown_limits:
+                raise ValueError(
+                    f"Неизвестные лимиты для событий {event!r}: {sorted(unknown_limits)}"
+                )
+            resolved[event] = {**defaults, **overrides}
+        return resolved
+
+    def _serializer(self, event: str, memo: Optional[ScopedMemo] = None) -> TracingSerializer:
+        """Создает обходчик с общим бюджетом для одного события."""
+        if self._adaptive is not None:
+            limits = self._adaptive.apply(self._event_limits[event])
+        else:
+            limits = self._event_limits[event]
+        return TracingSerializer(**limits, memo=memo, **self._document_options)
+
+    def _degraded_serializer(
+        self, event: str, memo: Optional[ScopedMemo] = None
+    ) -> TracingSerializer:
+        """Создает обходчик с жесткими лимитами для переполненной очереди."""
+        limits = self._event_limits[event]
+        return TracingSerializer(
+            max_length=min(limits["max_length"], DEGRADED_MAX_LENGTH),
+            max_vector_elements=min(limits["max_vector_elements"], DEGRADED_MAX_VECTOR_ELEMENTS),
+            max_depth=min(limits["max_depth"], DEGRADED_MAX_DEPTH),
+            max_nodes=min(limits["max_nodes"], DEGRADED_MAX_NODES),
+            max_total_length=min(limits["max_total_length"], DEGRADED_MAX_TOTAL_LENGTH),
+            memo=memo,
+            **self._document_options,
         )
 
-    async def on_chain_start_async(
-        self, serialized: Any, inputs: Any, **kwargs: Any
+    def _emit(
+        self,
+        event: str,
+        callback: Callable[..., Any],
+        prepare: _Prepare,
+        kwargs: Mapping[str, Any],
+        phase: Optional[str] = None,
     ) -> Any:
-        return await super().on_chain_start_async(
-            serialized,
-            serialize_for_tracing(inputs, self._max_length, self._max_vector_elements),
-            **kwargs,
+        """
+        Подготавливает аргументы события и передает их базовому обработчику.
+
+        Без отложенной сериализации все выполняется в текущем потоке. Иначе
+        задача ставится в очередь обработчика, а при переполненной очереди
+        применяется политика offload_policy: "degrade" обрезает событие с
+        жесткими лимитами в текущем потоке и ставит в очередь только его
+        отправку, даже сверх offload_queue_size; "drop" отбрасывает событие
+        начала запуска, а остальные события обрабатывает как "degrade".
+        События запуска с отброшенным началом отбрасываются до его завершения
+        или ошибки включительно. Порядок событий обработчика сохраняется.
+
+        Args:
+            phase: "start" для начала запуска, "end" для завершения или ошибки
+        """
+        memo = self._trace_memo(kwargs)
+        offloader = self._offloader
+        if offloader is None:
+            args, kwargs = self._run_prepare(prepare, self._serializer(event, memo), event)
+            return callback(*args, **kwargs)
+
+        run_id = kwargs.get("run_id")
+        if self._dropped_runs and self._skip_dropped(run_id, phase):
+            return None
+
+        def deliver() -> Any:
+            return self._deliver(callback, prepare, event, memo)
+
+        if self._offload_policy == "block":
+            offloader.submit(deliver)
+            return None
+        if offloader.try_submit(deliver):
+            return None
+
+        self._record_offload_fallback(event)
+        if self._offload_policy == "drop" and phase == "start":
+            if run_id is not None:
+                with self._trace_lock:
+                    self._dropped_runs.add(run_id)
+            return None
+        args, kwargs = self._run_prepare(prepare, self._degraded_serializer(event, memo), event)
+        # Отправка остается в очереди, чтобы не обогнать события перед ней
+        offloader.force_submit(lambda: callback(*args, **kwargs))
+        return None
+
+    def _skip_dropped(self, run_id: Any, phase: Optional[str]) -> bool:
+        """Проверяет, отброшено ли начало запуска, и забывает его на завершении."""
+        with self._trace_lock:
+            if run_id not in self._dropped_runs:
+                return False
+            if phase == "end":
+                self._dropped_runs.discard(run_id)
+            return True
+
+    def _record_offload_fallback(self, event: str) -> None:
+        """Учитывает в метриках событие, обработанное политикой переполнения."""
+        sink = self._metrics_sink or get_metrics_sink()
+        if sink.enabled:
+            sink.record_offload_fallback(event, self._offload_policy)
+
+    def _deliver(
+        self,
+        callback: Callable[..., Any],
+        prepare: _Prepare,
+        event: str,
+        memo: Optional[ScopedMemo],
+    ) -> Any:
+        args, kwargs = self._run_prepare(prepare, self._serializer(event, memo), event)
+        return callback(*args, **kwargs)
+
+    def _run_prepare(
+        self, prepare: _Prepare, serializer: TracingSerializer, event: str
+    ) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+        """
+        Подготавливает аргументы события.
+
+        Если включены адаптивные лимиты или приемник метрик, замеряет время
+        сериализации и передает измерения им.
+        """
+        adaptive = self._adaptive
+        sink = self._metrics_sink or get_metrics_sink()
+        if adaptive is None and not sink.enabled:
+            return prepare(serializer)
+
+        start = time.perf_counter()
+        result = prepare(serializer)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+        if adaptive is not None:
+            adaptive.observe(elapsed_ms, serializer.total_length, pending_events(self))
+        if sink.enabled:
+            sink.record_serialization(event, elapsed_ms, serializer.stats())
+            if adaptive is not None:
+                sink.record_adaptive(adaptive.info())
+        return result
+
+    def _trace_memo(self, kwargs: Mapping[str, Any]) -> Optional[ScopedMemo]:
+        """
+        Возвращает кэш результатов обрезки для трейса события.
+
+        Трейс определяется по run_id корневого запуска. LangChain передает
+        только parent_run_id, поэтому корень каждого дочернего запуска
+        запоминается до завершения или ошибки корневого запуска.
+        """
+        memo = self._memo
+        if memo is None:
+            return None
+        run_id = kwargs.get("run_id")
+        parent_run_id = kwargs.get("parent_run_id")
+        if parent_run_id is None:
+            return memo.scoped(run_id)
+        with self._trace_lock:
+            root = self._trace_roots.get(parent_run_id, parent_run_id)
+            if run_id is not None and run_id not in self._trace_roots:
+                self._trace_roots[run_id] = root
+                self._trace_runs.setdefault(root, set()).add(run_id)
+        return memo.scoped(root)
+
+    def _end_trace(self, kwargs: Mapping[str, Any]) -> None:
+        """
+        Освобождает кэш результатов обрезки трейса после завершения корневого запуска.
+
+        Вызывается из end- и error-хуков цепочек, инструментов, LLM и
+        ретриверов: корнем трейса может быть любой из них.
+        """
+        memo = self._memo
+        if memo is None or kwargs.get("parent_run_id") is not None:
+            return
+        root = kwargs.get("run_id")
+        with self._trace_lock:
+            for run_id in self._trace_runs.pop(root, ()):
+                self._trace_roots.pop(run_id, None)
+
+        def evict() -> None:
+            memo.evict(root)
+
+        # Записи удаляются после событий трейса в очереди, а при заполненной
+        # очереди — сразу (записи, добавленные позже, вытесняются по LRU)
+        offloader = self._offloader
+        if offloader is None or not offloader.try_submit(evict):
+            evict()
+
+    def _truncate_message(self, message: Any, serializer: Any) -> Any:
+        """Обрезает содержимое сообщения, сохраняя его тип для Langfuse."""
+        if not hasattr(message, "content"):
+            return serializer.serialize(message)
+        update = {"content": serializer.serialize(message.content)}
+        if getattr(message, "additional_kwargs", None):
+            update["additional_kwargs"] = serializer.serialize(message.additional_kwargs)
+        return _copy_model(message, **update)
+
+    def _truncate_llm_result(self, response: Any, serializer: Any) -> Any:
+        """Обрезает генерации LLMResult, сохраняя usage и llm_output."""
+        generations = []
+        for batch in response.generations:
+            truncated = []
+            for generation in batch:
+                update = {"text": serializer.serialize(generation.text)}
+                if getattr(generation, "generation_info", None):
+                    update["generation_info"] = serializer.serialize(generation.generation_info)
+                if hasattr(generation, "message"):
+                    update["message"] = self._truncate_message(generation.message, serializer)
+                truncated.append(_copy_model(generation, **update))
+            generations.append(truncated)
+        return _copy_model(response, generations=generations)
+
+    def _prepare_chain_start(
+        self, serialized: Any, inputs: Any, kwargs: Dict[str, Any]
+    ) -> _Prepare:
+        return lambda s: ((serialized, s.serialize(inputs)), kwargs)
+
+    def _prepare_single(self, value: Any, kwargs: Dict[str, Any]) -> _Prepare:
+        return lambda s: ((s.serialize(value),), kwargs)
+
+    def _prepare_error(self, error: BaseException, kwargs: Dict[str, Any]) -> _Prepare:
+        # Ошибка не обрезается: событие проходит через _emit ради порядка в очереди
+        return lambda s: ((error,), kwargs)
+
+    def _prepare_prompts(
+        self, serialized: Any, prompts: List[str], kwargs: Dict[str, Any]
+    ) -> _Prepare:
+        return lambda s: ((serialized, [s.serialize(prompt) for prompt in prompts]), kwargs)
+
+    def _prepare_messages(
+        self, serialized: Any, messages: List[List[Any]], kwargs: Dict[str, Any]
+    ) -> _Prepare:
+        return lambda s: (
+            (serialized, [[self._truncate_message(m, s) for m in batch] for batch in messages]),
+            kwargs,
         )
 
-    def on_chain_end(self, outputs: Any, **kwargs: Any) -> Any:
-        return super().on_chain_end(
-            serialize_for_tracing(outputs, self._max_length, self._max_vector_elements),
-            **kwargs,
+    def _prepare_llm_end(self, response: Any, kwargs: Dict[str, Any]) -> _Prepare:
+        return lambda s: ((self._truncate_llm_result(response, s),), kwargs)
+
+    def _prepare_tool_start(
+        self, serialized: Any, input_str: str, kwargs: Dict[str, Any]
+    ) -> _Prepare:
+        def prepare(s: Any) -> Tuple[Tuple[Any, ...], Dict[str, Any]]:
+            tool_kwargs = kwargs
+            if kwargs.get("inputs") is not None:
+                tool_kwargs = {**kwargs, "inputs": s.serialize(kwargs["inputs"])}
+            return (serialized, s.serialize(input_str)), tool_kwargs
+
+        return prepare
+
+    def _prepare_agent_action(self, action: Any, kwargs: Dict[str, Any]) -> _Prepare:
+        return lambda s: (
+            (
+                _copy_model(
+                    action,
+                    tool_input=s.serialize(action.tool_input),
+                    log=s.serialize(action.log),
+                ),
+            ),
+            kwargs,
         )
 
-    async def on_chain_end_async(self, outputs: Any, **kwargs: Any) -> Any:
-        return await super().on_chain_end_async(
-            serialize_for_tracing(outputs, self._max_length, self._max_vector_elements),
-            **kwargs,
+    def _prepare_agent_finish(self, finish: Any, kwargs: Dict[str, Any]) -> _Prepare:
+        return lambda s: (
+            (
+                _copy_model(
+                    finish,
+                    return_values=s.serialize(finish.return_values),
+                    log=s.serialize(finish.log),
+                ),
+            ),
+            kwargs,
         )
 
-    def on_retriever_start(
-        self, serialized: Dict[str, Any], query: str, **kwargs: Any
-    ) -> Any:
-        return super().on_retriever_start(
-            serialized,
-            serialize_for_tracing(query, self._max_length, self._max_vector_elements),
-            **kwargs,
+    def on_chain_start(self, serialized: Any, inputs: Any, **kwargs: Any) -> Any:
+        return self._emit(
+            "chain",
+            super().on_chain_start,
+            self._prepare_chain_start(serialized, inputs, kwargs),
+            kwargs,
+            phase="start",
         )
 
-    async def on_retriever_start_async(
-        self, serialized: Dict[str, Any], query: str, **kwargs: Any
-    ) -> Any:
-        return await super().on_retriever_start_async(
-            serialized,
-            serialize_for_tracing(query, self._max_length, self._max_vector_elements),
-            **kwargs,
+    def on_chain_end(self, outputs: Any, **kwargs: Any) -> Any:
+        result = self._emit(
+            "chain",
+            super().on_chain_end,
+            self._prepare_single(outputs, kwargs),
+            kwargs,
+            phase="end",
+        )
+        self._end_trace(kwargs)
+        return result
+
+    def on_retriever_start(self, serialized: Dict[str, Any], query: str, **kwargs: Any) -> Any:
+        return self._emit(
+            "retriever",
+            super().on_retriever_start,
+            self._prepare_chain_start(serialized, query, kwargs),
+            kwargs,
+            phase="start",
         )
 
     def on_retriever_end(self, documents: Sequence[Document], **kwargs: Any) -> Any:
-        return super().on_retriever_end(
-            serialize_for_tracing(
-                documents, self._max_length, self._max_vector_elements
-            ),
-            **kwargs,
+        result = self._emit(
+            "retriever",
+            super().on_retriever_end,
+            self._prepare_single(documents, kwargs),
+            kwargs,
+            phase="end",
         )
+        self._end_trace(kwargs)
+        return result
 
-    async def on_retriever_end_async(
-        self, documents: Sequence[Document], **kwargs: Any
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], **kwargs: Any) -> Any:
+        return self._emit(
+            "llm",
+            super().on_llm_start,
+            self._prepare_prompts(serialized, prompts, kwargs),
+            kwargs,
+            phase="start",
+        )
+
+    def on_chat_model_start(
+        self, serialized: Dict[str, Any], messages: List[List[Any]], **kwargs: Any
     ) -> Any:
-        return await super().on_retriever_end_async(
-            serialize_for_tracing(
-                documents, self._max_length, self._max_vector_elements
-            ),
-            **kwargs,
+        return self._emit(
+            "chat_model",
+            super().on_chat_model_start,
+            self._prepare_messages(serialized, messages, kwargs),
+            kwargs,
+            phase="start",
+        )
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> Any:
+        result = self._emit(
+            "llm",
+            super().on_llm_end,
+            self._prepare_llm_end(response, kwargs),
+            kwargs,
+            phase="end",
+        )
+        self._end_trace(kwargs)
+        return result
+
+    def on_tool_start(self, serialized: Dict[str, Any], input_str: str, **kwargs: Any) -> Any:
+        return self._emit(
+            "tool",
+            super().on_tool_start,
+            self._prepare_tool_start(serialized, input_str, kwargs),
+            kwargs,
+            phase="start",
+        )
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> Any:
+        result = self._emit(
+            "tool",
+            super().on_tool_end,
+            self._prepare_single(output, kwargs),
+            kwargs,
+            phase="end",
+        )
+        self._end_trace(kwargs)
+        return result
+
+    def on_chain_error(self, error: BaseException, **kwargs: Any) -> Any:
+        result = self._emit(
+            "chain",
+            super().on_chain_error,
+            self._prepare_error(error, kwargs),
+            kwargs,
+            phase="end",
+        )
+        self._end_trace(kwargs)
+        return result
+
+    def on_retriever_error(self, error: BaseException, **kwargs: Any) -> Any:
+        result = self._emit(
+            "retriever",
+            super().on_retriever_error,
+            self._prepare_error(error, kwargs),
+            kwargs,
+            phase="end",
+        )
+        self._end_trace(kwargs)
+        return result
+
+    def on_llm_error(self, error: BaseException, **kwargs: Any) -> Any:
+        result = self._emit(
+            "llm",
+            super().on_llm_error,
+            self._prepare_error(error, kwargs),
+            kwargs,
+            phase="end",
+        )
+        self._end_trace(kwargs)
+        return result
+
+    def on_tool_error(self, error: BaseException, **kwargs: Any) -> Any:
+        result = self._emit(
+            "tool",
+            super().on_tool_error,
+            self._prepare_error(error, kwargs),
+            kwargs,
+            phase="end",
+        )
+        self._end_trace(kwargs)
+        return result
+
+    def on_agent_action(self, action: Any, **kwargs: Any) -> Any:
+        return self._emit(
+            "agent",
+            super().on_agent_action,
+            self._prepare_agent_action(action, kwargs),
+            kwargs,
+        )
+
+    def on_agent_finish(self, finish: Any, **kwargs: Any) -> Any:
+        return self._emit(
+            "agent",
+            super().on_agent_finish,
+            self._prepare_agent_finish(finish, kwargs),
+            kwargs,
         )
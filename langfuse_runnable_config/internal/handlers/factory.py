@@ -1,6 +1,6 @@
 """Фабрики для создания обработчиков."""
 
-from typing import Any
+from typing import Any, Optional
 
 from langfuse_runnable_config.internal.version import detect_langfuse_version
 from langfuse_runnable_config.internal.handlers.simple import (
@@ -11,7 +11,7 @@ from langfuse_runnable_config.internal.handlers.v2 import create_v2_handler
 from langfuse_runnable_config.internal.handlers.v3 import create_v3_handler
 
 
-def create_handler(**kwargs: Any) -> Any:
+def create_handler(*, langfuse_version: Optional[int] = None, **kwargs: Any) -> Any:
     """
     Создает простой обработчик для установленной версии Langfuse без обрезки данных.
 
@@ -20,14 +20,15 @@ def create_handler(**kwargs: Any) -> Any:
     - v3+ → использует langfuse.langchain.CallbackHandler
 
     Args:
+        langfuse_version: Мажорная версия Langfuse (по умолчанию определяется автоматически)
         **kwargs: Дополнительные параметры для обработчика
             Для v2: host, public_key, secret_key, debug, httpx_client
-            Для v3+: обычно не требуются (используются переменные окружения)
+            Для v3+: public_key клиента из реестра (см. get_langfuse_client_registry)
 
     Returns:
         CallbackHandler без обрезки данных
     """
-    version = detect_langfuse_version()
+    version = langfuse_version or detect_langfuse_version()
 
     if version == 2:
         return create_v2_handler_simple(**kwargs)
@@ -39,6 +40,8 @@ def create_handler(**kwargs: Any) -> Any:
 def create_truncating_handler(
     max_length: int,
     max_vector_elements: int,
+    *,
+    langfuse_version: Optional[int] = None,
     **kwargs: Any,
 ) -> Any:
     """
@@ -51,14 +54,21 @@ def create_truncating_handler(
     Args:
         max_length: Максимальная длина строки
         max_vector_elements: Максимальное количество элементов вектора
+        langfuse_version: Мажорная версия Langfuse (по умолчанию определяется автоматически)
         **kwargs: Дополнительные параметры для обработчика
+            Обрезка: max_depth, max_nodes, max_total_length, event_limits,
+                offload, offload_queue_size, offload_policy, adaptive, adaptive_min_length,
+                adaptive_min_vector_elements, adaptive_target_ms,
+                adaptive_target_queue_length, metrics_sink, memo, memo_size,
+                document_metadata_keys, dedupe_documents, length_unit, tokenizer,
+                string_strategy, fingerprint, client_settings (см. TruncatingMixin)
             Для v2: host, public_key, secret_key, debug, httpx_client
-            Для v3+: обычно не требуются (используются переменные окружения)
+            Для v3+: public_key клиента из реестра (см. get_langfuse_client_registry)
 
     Returns:
         CallbackHandler с автоматической обрезкой
     """
-    version = detect_langfuse_version()
+    version = langfuse_version or detect_langfuse_version()
 
     if version == 2:
         return create_v2_handler(max_length, max_vector_elements, **kwargs)
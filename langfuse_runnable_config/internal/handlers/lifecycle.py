@@ -0,0 +1,131 @@
+"""Управление жизненным циклом созданных обработчиков."""
+
+import logging
+import weakref
+from typing import Any, Callable, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def get_flush(handler: Any) -> Optional[Callable[[], Any]]:
+    """
+    Возвращает функцию отправки накопленных событий обработчика в Langfuse.
+
+    Для v2 это CallbackHandler.flush(), для v3+ — flush() клиента, к которому
+    привязан обработчик (один клиент может разделяться обработчиками).
+
+    Args:
+        handler: CallbackHandler любой версии Langfuse
+
+    Returns:
+        Связанный метод flush() или None, если обработчику нечего отправлять
+    """
+    flush = getattr(handler, "flush", None)
+    if callable(flush):
+        return flush
+
+    client = getattr(handler, "client", None) or getattr(handler, "_langfuse_client", None)
+    client_flush = getattr(client, "flush", None)
+    if callable(client_flush):
+        return client_flush
+    return None
+
+
+def pending_events(handler: Any) -> int:
+    """
+    Возвращает количество событий обработчика, еще не отправленных в Langfuse.
+
+    Учитываются очередь отложенной сериализации и очередь ингеста SDK v2.
+    Спаны v3+ в очереди OpenTelemetry не учитываются.
+
+    Args:
+        handler: CallbackHandler любой версии Langfuse
+    """
+    pending = 0
+    offloader = getattr(handler, "_offloader", None)
+    if offloader is not None:
+        pending += offloader.pending()
+    task_manager = getattr(getattr(handler, "langfuse", None), "task_manager", None)
+    queue = getattr(task_manager, "_ingestion_queue", None)
+    try:
+        pending += queue.qsize() if queue is not None else 0
+    except Exception:
+        pass
+    return pending
+
+
+def flush_handler(handler: Any) -> None:
+    """
+    Отправляет накопленные обработчиком события в Langfuse.
+
+    Сначала дожидается событий из очереди отложенной сериализации. Для v2
+    используется CallbackHandler.flush(), для v3+ — flush() клиента, к которому
+    привязан обработчик.
+
+    Args:
+        handler: CallbackHandler любой версии Langfuse
+    """
+    offloader = getattr(handler, "_offloader", None)
+    if offloader is not None:
+        offloader.join()
+
+    flush = get_flush(handler)
+    if flush is not None:
+        flush()
+
+
+def shutdown_handler(handler: Any) -> None:
+    """
+    Сбрасывает буфер обработчика и останавливает его собственный клиент.
+
+    Клиент v2 принадлежит обработчику и останавливается вместе с ним.
+    Клиент v3+ разделяется между обработчиками, поэтому только сбрасывается.
+
+    Args:
+        handler: CallbackHandler любой версии Langfuse
+    """
+    try:
+        flush_handler(handler)
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось корректно остановить обработчик Langfuse: {e}")
+        return
+    _close_owned(getattr(handler, "_offloader", None), getattr(handler, "langfuse", None))
+
+
+def release_handler(handler: Any) -> None:
+    """
+    Сбрасывает буфер обработчика, который больше не нужен владельцу.
+
+    Обработчик, вытесненный из кэша, может еще использоваться в RunnableConfig,
+    созданном раньше, поэтому его очередь и собственный клиент v2
+    останавливаются, только когда на обработчик не останется ссылок.
+    Обработчик без поддержки слабых ссылок только сбрасывается.
+
+    Args:
+        handler: CallbackHandler любой версии Langfuse
+    """
+    try:
+        flush_handler(handler)
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось отправить события Langfuse: {e}")
+    try:
+        weakref.finalize(
+            handler,
+            _close_owned,
+            getattr(handler, "_offloader", None),
+            getattr(handler, "langfuse", None),
+        )
+    except TypeError:
+        pass
+
+
+def _close_owned(offloader: Any, client: Any) -> None:
+    """Останавливает очередь отложенной сериализации и собственный клиент v2 обработчика."""
+    try:
+        if offloader is not None:
+            offloader.close()
+        shutdown = getattr(client, "shutdown", None)
+        if callable(shutdown):
+            shutdown()
+    except Exception as e:
+        logger.warning(f"⚠️ Не удалось корректно остановить обработчик Langfuse: {e}")
@@ -0,0 +1,231 @@
+"""Фоновая очередь для сериализации и отправки событий обработчика."""
+
+import atexit
+import contextvars
+import logging
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Callable, Deque, Dict, Optional, Tuple
+
+from langfuse_runnable_config.internal.constants import (
+    DEFAULT_OFFLOAD_QUEUE_SIZE,
+    DEFAULT_SHUTDOWN_TIMEOUT,
+)
+
+logger = logging.getLogger(__name__)
+
+# Все созданные очереди; при завершении процесса они дорабатывают накопленное
+_offloaders: "weakref.WeakSet[SerializationOffloader]" = weakref.WeakSet()
+_atexit_lock = threading.Lock()
+_atexit_registered = False
+
+
+class SerializationOffloader:
+    """
+    Ограниченная очередь с одним рабочим потоком на обработчик.
+
+    Лимит queue_size превышают только задачи, поставленные force_submit().
+
+    Один поток сохраняет порядок событий (start всегда раньше end), а задачи
+    выполняются в contextvars.Context места вызова callback'а.
+    """
+
+    def __init__(self, queue_size: int = DEFAULT_OFFLOAD_QUEUE_SIZE) -> None:
+        """
+        Создает очередь; рабочий поток запускается при первой задаче.
+
+        Args:
+            queue_size: Максимальное количество задач, ожидающих выполнения
+
+        Raises:
+            ValueError: Если queue_size меньше 1
+        """
+        if queue_size < 1:
+            raise ValueError("queue_size должен быть положительным")
+        self._queue_size = queue_size
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self._queue: Deque[Tuple[contextvars.Context, Callable[[], Any]]] = deque()
+        self._cond = threading.Condition()
+        self._unfinished = 0
+        self._thread: Optional[threading.Thread] = None
+        self._closed = False
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_queue_size": self._queue_size}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._queue_size = state["_queue_size"]
+        self._init_state()
+
+    @property
+    def queue_size(self) -> int:
+        """Максимальный размер очереди."""
+        return self._queue_size
+
+    def qsize(self) -> int:
+        """Возвращает текущее количество ожидающих задач."""
+        return len(self._queue)
+
+    def pending(self) -> int:
+        """Возвращает количество задач в очереди и выполняющихся."""
+        return self._unfinished
+
+    def is_full(self) -> bool:
+        """Проверяет, заполнена ли очередь."""
+        return len(self._queue) >= self._queue_size
+
+    def submit(self, task: Callable[[], Any]) -> None:
+        """
+        Ставит задачу в очередь, ожидая свободного места.
+
+        Args:
+            task: Функция без аргументов
+        """
+        self._put(task, wait=True)
+
+    def try_submit(self, task: Callable[[], Any]) -> bool:
+        """
+        Ставит задачу в очередь, если в ней есть место, не ожидая.
+
+        Args:
+            task: Функция без аргументов
+
+        Returns:
+            False, если очередь заполнена и задача не поставлена
+        """
+        return self._put(task, wait=False)
+
+    def force_submit(self, task: Callable[[], Any]) -> None:
+        """
+        Ставит задачу в очередь даже сверх queue_size, не ожидая.
+
+        Предназначен для дешевых задач, которые нельзя отбросить, не нарушив
+        порядок событий (отправка уже обрезанного события).
+
+        Args:
+            task: Функция без аргументов
+        """
+        self._put(task, wait=False, force=True)
+
+    def _put(self, task: Callable[[], Any], wait: bool, force: bool = False) -> bool:
+        context = contextvars.copy_context()
+        with self._cond:
+            while wait and not self._closed and len(self._queue) >= self._queue_size:
+                self._cond.wait()
+            if not self._closed:
+                if not force and len(self._queue) >= self._queue_size:
+                    return False
+                self._queue.append((context, task))
+                self._unfinished += 1
+                self._ensure_worker()
+                self._cond.notify_all()
+                return True
+        # После остановки очереди задача выполняется синхронно
+        context.run(task)
+        return True
+
+    def join(self, timeout: Optional[float] = None) -> bool:
+        """
+        Ожидает выполнения всех поставленных задач.
+
+        Args:
+            timeout: Максимальное время ожидания в секундах
+
+        Returns:
+            True, если очередь опустела до истечения таймаута
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while self._unfinished:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+            return True
+
+    def close(self, timeout: Optional[float] = None) -> None:
+        """
+        Дожидается очереди и останавливает рабочий поток.
+
+        Args:
+            timeout: Общее время ожидания очереди и потока в секундах
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self.join(timeout)
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(None if deadline is None else max(deadline - time.monotonic(), 0.0))
+
+    def _ensure_worker(self) -> None:
+        """Запускает рабочий поток при первой задаче (вызывается под блокировкой)."""
+        if self._thread is not None:
+            return
+        self._thread = threading.Thread(
+            target=self._run, name="langfuse-serialization", daemon=True
+        )
+        self._thread.start()
+        _register(self)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._queue:
+                    if self._closed:
+                        return
+                    self._cond.wait()
+                context, task = self._queue.popleft()
+                self._cond.notify_all()
+            try:
+                context.run(task)
+            except Exception as e:
+                logger.warning(f"⚠️ Ошибка при отложенной отправке события Langfuse: {e}")
+            finally:
+                with self._cond:
+                    self._unfinished -= 1
+                    if not self._unfinished:
+                        self._cond.notify_all()
+            # Ожидающий поток не должен удерживать обработчик через последнюю задачу
+            del context, task
+
+
+def _register(offloader: SerializationOffloader) -> None:
+    """Добавляет очередь в реестр, дорабатываемый при завершении процесса."""
+    global _atexit_registered
+    with _atexit_lock:
+        _offloaders.add(offloader)
+        if not _atexit_registered:
+            atexit.register(_close_all)
+            _atexit_registered = True
+
+
+def reset_offloaders_after_fork() -> None:
+    """
+    Сбрасывает очереди, унаследованные дочерним процессом после fork().
+
+    Рабочие потоки не переживают fork(), а задачи в очереди принадлежат
+    родительскому процессу и будут выполнены им. Очереди очищаются, и рабочий
+    поток дочернего процесса запускается при первой новой задаче.
+    """
+    global _atexit_lock
+    _atexit_lock = threading.Lock()
+    for offloader in list(_offloaders):
+        offloader._init_state()
+
+
+def _close_all(timeout: float = DEFAULT_SHUTDOWN_TIMEOUT) -> None:
+    """
+    Дорабатывает очереди при завершении процесса в пределах общего таймаута.
+
+    Зависшая сериализация или отправка не должна блокировать выход: задачи,
+    не выполненные до истечения таймаута, теряются.
+    """
+    deadline = time.monotonic() + timeout
+    for offloader in list(_offloaders):
+        offloader.close(max(deadline - time.monotonic(), 0.0))
@@ -24,7 +24,7 @@ def create_v3_handler_simple(**kwargs: Any) -> Any:
     Создает простой обработчик для Langfuse v3+ без обрезки данных.
 
     Args:
-        **kwargs: Дополнительные параметры (обычно не требуются для v3+)
+        **kwargs: Параметры для CallbackHandler v3+ (public_key клиента проекта)
 
     Returns:
         CallbackHandler для Langfuse v3+
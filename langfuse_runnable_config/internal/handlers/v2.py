@@ -1,9 +1,50 @@
 """Обработчик для Langfuse v2 с автоматической обрезкой данных."""
 
-from typing import Any
+import threading
+from typing import Any, Optional
 
 from langfuse_runnable_config.internal.handlers.base import TruncatingMixin
 
+_handler_class: Optional[type] = None
+_handler_class_lock = threading.Lock()
+
+
+def get_v2_handler_class() -> type:
+    """
+    Возвращает класс TruncatingCallbackHandler для Langfuse v2.
+
+    Класс создается один раз при первом обращении и доступен по стабильному
+    имени langfuse_runnable_config.internal.handlers.v2.TruncatingCallbackHandler,
+    поэтому isinstance и pickle работают между вызовами.
+
+    Returns:
+        Класс CallbackHandler для Langfuse v2 с автоматической обрезкой
+    """
+    global _handler_class
+
+    if _handler_class is not None:
+        return _handler_class
+
+    with _handler_class_lock:
+        if _handler_class is None:
+            from langfuse.callback import CallbackHandler  # type: ignore[import-untyped]
+
+            class TruncatingCallbackHandler(TruncatingMixin, CallbackHandler):
+                """CallbackHandler для Langfuse v2 с автоматической обрезкой."""
+
+                _uses_http_client_pool = True
+
+            TruncatingCallbackHandler.__qualname__ = "TruncatingCallbackHandler"
+            _handler_class = TruncatingCallbackHandler
+        return _handler_class
+
+
+def __getattr__(name: str) -> Any:
+    """Лениво предоставляет TruncatingCallbackHandler как атрибут модуля."""
+    if name == "TruncatingCallbackHandler":
+        return get_v2_handler_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def create_v2_handler(
     max_length: int,
@@ -22,14 +63,7 @@ def create_v2_handler(
     Returns:
         CallbackHandler для Langfuse v2 с автоматической обрезкой
     """
-    from langfuse.callback import CallbackHandler  # type: ignore[import-untyped]
-
-    class TruncatingCallbackHandler(TruncatingMixin, CallbackHandler):
-        """CallbackHandler для Langfuse v2 с автоматической обрезкой."""
-
-        pass
-
-    return TruncatingCallbackHandler(
+    return get_v2_handler_class()(
         max_length=max_length,
         max_vector_elements=max_vector_elements,
         **kwargs,
@@ -1,9 +1,55 @@
 """Обработчик для Langfuse v3 и выше с автоматической обрезкой данных."""
 
-from typing import Any
+import threading
+from typing import Any, Optional
 
 from langfuse_runnable_config.internal.handlers.base import TruncatingMixin
 
+_handler_class: Optional[type] = None
+_handler_class_lock = threading.Lock()
+
+
+def get_v3_handler_class() -> type:
+    """
+    Возвращает класс TruncatingCallbackHandler для Langfuse v3 и выше.
+
+    Класс создается один раз при первом обращении и доступен по стабильному
+    имени langfuse_runnable_config.internal.handlers.v3.TruncatingCallbackHandler,
+    поэтому isinstance и pickle работают между вызовами.
+
+    Returns:
+        Класс CallbackHandler для Langfuse v3+ с автоматической обрезкой
+    """
+    global _handler_class
+
+    if _handler_class is not None:
+        return _handler_class
+
+    with _handler_class_lock:
+        if _handler_class is None:
+            from langfuse.langchain import CallbackHandler  # type: ignore[import-untyped]
+
+            class TruncatingCallbackHandler(TruncatingMixin, CallbackHandler):
+                """
+                CallbackHandler для Langfuse v3+ с автоматической обрезкой.
+
+                Работает с версиями 3, 4, 5 и выше, так как они используют
+                одинаковый API через langfuse.langchain.
+                """
+
+                pass
+
+            TruncatingCallbackHandler.__qualname__ = "TruncatingCallbackHandler"
+            _handler_class = TruncatingCallbackHandler
+        return _handler_class
+
+
+def __getattr__(name: str) -> Any:
+    """Лениво предоставляет TruncatingCallbackHandler как атрибут модуля."""
+    if name == "TruncatingCallbackHandler":
+        return get_v3_handler_class()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 def create_v3_handler(
     max_length: int,
@@ -14,29 +60,17 @@ def create_v3_handler(
     Создает обработчик для Langfuse v3 и выше с автоматической обрезкой данных.
 
     Этот обработчик работает для всех версий >= 3, так как они используют
-    одинаковый подход с переменными окружения через langfuse.langchain.CallbackHandler.
+    одинаковый API langfuse.langchain.CallbackHandler.
 
     Args:
         max_length: Максимальная длина строки
         max_vector_elements: Максимальное количество элементов вектора
-        **kwargs: Дополнительные параметры (обычно не требуются для v3+)
+        **kwargs: Дополнительные параметры (public_key клиента проекта)
 
     Returns:
         CallbackHandler для Langfuse v3+ с автоматической обрезкой
     """
-    from langfuse.langchain import CallbackHandler  # type: ignore[import-untyped]
-
-    class TruncatingCallbackHandler(TruncatingMixin, CallbackHandler):
-        """
-        CallbackHandler для Langfuse v3+ с автоматической обрезкой.
-
-        Работает с версиями 3, 4, 5 и выше, так как они используют
-        одинаковый API через langfuse.langchain.
-        """
-
-        pass
-
-    return TruncatingCallbackHandler(
+    return get_v3_handler_class()(
         max_length=max_length,
         max_vector_elements=max_vector_elements,
         **kwargs,
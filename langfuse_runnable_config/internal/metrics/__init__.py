@@ -0,0 +1,21 @@
+"""Метрики обрезки данных обработчиками."""
+
+from langfuse_runnable_config.internal.metrics.opentelemetry import OpenTelemetryMetricsSink
+from langfuse_runnable_config.internal.metrics.prometheus import PrometheusMetricsSink
+from langfuse_runnable_config.internal.metrics.sink import (
+    InMemoryMetricsSink,
+    MetricsSink,
+    NoopMetricsSink,
+    get_metrics_sink,
+    set_metrics_sink,
+)
+
+__all__ = [
+    "InMemoryMetricsSink",
+    "MetricsSink",
+    "NoopMetricsSink",
+    "OpenTelemetryMetricsSink",
+    "PrometheusMetricsSink",
+    "get_metrics_sink",
+    "set_metrics_sink",
+]
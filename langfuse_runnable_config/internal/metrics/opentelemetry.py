@@ -0,0 +1,96 @@
+"""Приемник метрик для OpenTelemetry (opentelemetry-api)."""
+
+from typing import TYPE_CHECKING, Any, Optional
+
+from langfuse_runnable_config.internal.metrics.sink import MetricsSink
+from langfuse_runnable_config.internal.serializers import SerializerStats
+
+if TYPE_CHECKING:
+    from langfuse_runnable_config.internal.handlers.adaptive import AdaptiveLimitsInfo
+
+
+class OpenTelemetryMetricsSink(MetricsSink):
+    """
+    Публикует метрики обрезки через OpenTelemetry Metrics API.
+
+    Инструменты (с атрибутом event):
+    - langfuse.truncation.serialize.duration (мс) и langfuse.truncation.nodes — гистограммы
+    - langfuse.truncation.input_chars, langfuse.truncation.output_chars — счетчики
+    - langfuse.truncation.truncated (атрибут kind), langfuse.truncation.budget_exhausted
+    - langfuse.truncation.offload_fallback (атрибут policy)
+    - langfuse.truncation.adaptive_scale — гистограмма масштаба адаптивных лимитов
+    """
+
+    def __init__(self, meter: Optional[Any] = None) -> None:
+        """
+        Создает инструменты.
+
+        Args:
+            meter: Meter OpenTelemetry (по умолчанию из глобального MeterProvider)
+
+        Raises:
+            ImportError: Если opentelemetry-api не установлен
+        """
+        if meter is None:
+            try:
+                from opentelemetry import metrics
+            except ImportError as exc:
+                raise ImportError(
+                    "Для OpenTelemetryMetricsSink нужен opentelemetry-api: "
+                    "pip install langfuse-runnable-config[opentelemetry]"
+                ) from exc
+            meter = metrics.get_meter("langfuse_runnable_config")
+
+        self._duration = meter.create_histogram(
+            "langfuse.truncation.serialize.duration",
+            unit="ms",
+            description="Время сериализации события",
+        )
+        self._nodes = meter.create_histogram(
+            "langfuse.truncation.nodes", description="Количество посещенных узлов события"
+        )
+        self._input_chars = meter.create_counter(
+            "langfuse.truncation.input_chars", description="Символов во входных строках"
+        )
+        self._output_chars = meter.create_counter(
+            "langfuse.truncation.output_chars", description="Символов в строках после обрезки"
+        )
+        self._truncated = meter.create_counter(
+            "langfuse.truncation.truncated", description="Обрезанных значений"
+        )
+        self._budget_exhausted = meter.create_counter(
+            "langfuse.truncation.budget_exhausted",
+            description="Значений, замененных заглушкой исчерпанного бюджета",
+        )
+        self._offload_fallback = meter.create_counter(
+            "langfuse.truncation.offload_fallback",
+            description="Событий, обработанных при переполненной очереди",
+        )
+        self._adaptive_scale = meter.create_histogram(
+            "langfuse.truncation.adaptive_scale", description="Масштаб адаптивных лимитов"
+        )
+
+    def record_serialization(
+        self, event: str, duration_ms: float, stats: SerializerStats
+    ) -> None:
+        attributes = {"event": event}
+        self._duration.record(duration_ms, attributes)
+        self._nodes.record(stats.nodes, attributes)
+        self._input_chars.add(stats.input_length, attributes)
+        self._output_chars.add(stats.output_length, attributes)
+        for kind, count in (
+            ("string", stats.truncated_strings),
+            ("vector", stats.truncated_vectors),
+            ("container", stats.truncated_containers),
+            ("document", stats.deduplicated_documents),
+        ):
+            if count:
+                self._truncated.add(count, {"event": event, "kind": kind})
+        if stats.budget_exhausted:
+            self._budget_exhausted.add(stats.budget_exhausted, attributes)
+
+    def record_offload_fallback(self, event: str, policy: str) -> None:
+        self._offload_fallback.add(1, {"event": event, "policy": policy})
+
+    def record_adaptive(self, info: "AdaptiveLimitsInfo") -> None:
+        self._adaptive_scale.record(info.scale)
@@ -0,0 +1,114 @@
+"""Приемник метрик для Prometheus (prometheus_client)."""
+
+from typing import TYPE_CHECKING, Any, Optional
+
+from langfuse_runnable_config.internal.metrics.sink import MetricsSink
+from langfuse_runnable_config.internal.serializers import SerializerStats
+
+if TYPE_CHECKING:
+    from langfuse_runnable_config.internal.handlers.adaptive import AdaptiveLimitsInfo
+
+# Границы гистограммы времени сериализации события в секундах
+_DURATION_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0)
+
+# Границы гистограммы количества узлов события
+_NODES_BUCKETS = (10, 50, 100, 500, 1_000, 5_000, 10_000, 50_000)
+
+
+class PrometheusMetricsSink(MetricsSink):
+    """
+    Публикует метрики обрезки через prometheus_client.
+
+    Метрики (с префиксом namespace):
+    - truncation_serialize_seconds{event} — время сериализации события
+    - truncation_nodes{event} — количество посещенных узлов
+    - truncation_input_chars_total{event}, truncation_output_chars_total{event}
+    - truncation_truncated_total{event, kind} — kind: string, vector, container,
+      document (повторяющийся документ заменен ссылкой)
+    - truncation_budget_exhausted_total{event} — значения, замененные заглушкой бюджета
+    - truncation_offload_fallback_total{event, policy}
+    - truncation_adaptive_scale — масштаб адаптивных лимитов
+    """
+
+    def __init__(self, registry: Optional[Any] = None, namespace: str = "langfuse") -> None:
+        """
+        Регистрирует метрики.
+
+        Args:
+            registry: CollectorRegistry (по умолчанию глобальный REGISTRY)
+            namespace: Префикс имен метрик
+
+        Raises:
+            ImportError: Если prometheus_client не установлен
+        """
+        try:
+            from prometheus_client import REGISTRY, Counter, Gauge, Histogram
+        except ImportError as exc:
+            raise ImportError(
+                "Для PrometheusMetricsSink нужен prometheus_client: "
+                "pip install langfuse-runnable-config[prometheus]"
+            ) from exc
+
+        options = dict(namespace=namespace, registry=registry if registry is not None else REGISTRY)
+        self._duration = Histogram(
+            "truncation_serialize_seconds",
+            "Время сериализации события",
+            ["event"],
+            buckets=_DURATION_BUCKETS,
+            **options,
+        )
+        self._nodes = Histogram(
+            "truncation_nodes",
+            "Количество посещенных узлов события",
+            ["event"],
+            buckets=_NODES_BUCKETS,
+            **options,
+        )
+        self._input_chars = Counter(
+            "truncation_input_chars", "Символов во входных строках", ["event"], **options
+        )
+        self._output_chars = Counter(
+            "truncation_output_chars", "Символов в строках после обрезки", ["event"], **options
+        )
+        self._truncated = Counter(
+            "truncation_truncated", "Обрезанных значений", ["event", "kind"], **options
+        )
+        self._budget_exhausted = Counter(
+            "truncation_budget_exhausted",
+            "Значений, замененных заглушкой исчерпанного бюджета",
+            ["event"],
+            **options,
+        )
+        self._offload_fallback = Counter(
+            "truncation_offload_fallback",
+            "Событий, обработанных при переполненной очереди",
+            ["event", "policy"],
+            **options,
+        )
+        self._adaptive_scale = Gauge(
+            "truncation_adaptive_scale", "Масштаб адаптивных лимитов", **options
+        )
+
+    def record_serialization(
+        self, event: str, duration_ms: float, stats: SerializerStats
+    ) -> None:
+        self._duration.labels(event).observe(duration_ms / 1000)
+        self._nodes.labels(event).observe(stats.nodes)
+        self._input_chars.labels(event).inc(stats.input_length)
+        self._output_chars.labels(event).inc(stats.output_length)
+        if stats.truncated_strings:
+            self._truncated.labels(event, "string").inc(stats.truncated_strings)
+        if stats.truncated_vectors:
+            self._truncated.labels(event, "vector").inc(stats.truncated_vectors)
+        if stats.truncated_containers:
+            self._truncated.labels(event, "container").inc(stats.truncated_containers)
+        if stats.deduplicated_documents:
+            self._truncated.labels(event, "document").inc(stats.deduplicated_documents)
+        if stats.budget_exhausted:
+            self._budget_exhausted.labels(event).inc(stats.budget_exhausted)
+
+    def record_offload_fallback(self, event: str, policy: str) -> None:
+        self._offload_fallback.labels(event, policy).inc()
+
+    def record_adaptive(self, info: "AdaptiveLimitsInfo") -> None:
+        self._adaptive_scale.set(info.scale)
@@ -0,0 +1,149 @@
+"""Приемники метрик обрезки данных."""
+
+import threading
+from typing import TYPE_CHECKING, Any, Dict, Optional
+
+from langfuse_runnable_config.internal.serializers import SerializerStats
+
+if TYPE_CHECKING:
+    from langfuse_runnable_config.internal.handlers.adaptive import AdaptiveLimitsInfo
+
+
+class MetricsSink:
+    """
+    Приемник метрик TruncatingMixin.
+
+    Методы вызываются в горячем пути callback'ов (в потоке цепочки или в
+    фоновом потоке отложенной сериализации), поэтому должны быть быстрыми и
+    потокобезопасными. Базовая реализация ничего не делает.
+    """
+
+    # False отключает замеры в обработчике целиком
+    enabled: bool = True
+
+    def record_serialization(
+        self, event: str, duration_ms: float, stats: SerializerStats
+    ) -> None:
+        """
+        Учитывает обрезку одного события.
+
+        Args:
+            event: Тип события (см. EVENT_TYPES)
+            duration_ms: Время сериализации события в мс
+            stats: Статистика обходчика события
+        """
+
+    def record_offload_fallback(self, event: str, policy: str) -> None:
+        """
+        Учитывает событие, обработанное по политике переполненной очереди.
+
+        Args:
+            event: Тип события
+            policy: Примененная политика ("drop" или "degrade")
+        """
+
+    def record_adaptive(self, info: "AdaptiveLimitsInfo") -> None:
+        """
+        Учитывает текущее состояние адаптивных лимитов.
+
+        Args:
+            info: Эффективные лимиты и измерения AdaptiveLimits
+        """
+
+
+class NoopMetricsSink(MetricsSink):
+    """Приемник по умолчанию: метрики не собираются и не замеряются."""
+
+    enabled = False
+
+
+class InMemoryMetricsSink(MetricsSink):
+    """
+    Приемник, агрегирующий метрики в памяти по типам событий.
+
+    Подходит для тестов и разовой диагностики: snapshot() возвращает
+    накопленные суммы, максимальное время сериализации и последнее состояние
+    адаптивных лимитов.
+    """
+
+    def __init__(self) -> None:
+        self._events: Dict[str, Dict[str, float]] = {}
+        self._adaptive: Optional["AdaptiveLimitsInfo"] = None
+        self._lock = threading.Lock()
+
+    def record_serialization(
+        self, event: str, duration_ms: float, stats: SerializerStats
+    ) -> None:
+        with self._lock:
+            totals = self._totals(event)
+            totals["events"] += 1
+            totals["duration_ms"] += duration_ms
+            totals["max_duration_ms"] = max(totals["max_duration_ms"], duration_ms)
+            for name, value in zip(stats._fields, stats):
+                totals[name] += value
+
+    def record_offload_fallback(self, event: str, policy: str) -> None:
+        with self._lock:
+            self._totals(event)[f"offload_{policy}"] += 1
+
+    def record_adaptive(self, info: "AdaptiveLimitsInfo") -> None:
+        self._adaptive = info
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Возвращает копию накопленных метрик.
+
+        Returns:
+            {"events": {тип события: {метрика: значение}}, "adaptive": AdaptiveLimitsInfo}
+        """
+        with self._lock:
+            return {
+                "events": {event: dict(totals) for event, totals in self._events.items()},
+                "adaptive": self._adaptive,
+            }
+
+    def reset(self) -> None:
+        """Сбрасывает накопленные метрики."""
+        with self._lock:
+            self._events.clear()
+            self._adaptive = None
+
+    def _totals(self, event: str) -> Dict[str, float]:
+        totals = self._events.get(event)
+        if totals is None:
+            totals = dict.fromkeys(
+                (
+                    "events",
+                    "duration_ms",
+                    "max_duration_ms",
+                    *SerializerStats._fields,
+                    "offload_drop",
+                    "offload_degrade",
+                ),
+                0,
+            )
+            self._events[event] = totals
+        return totals
+
+
+_NOOP_SINK = NoopMetricsSink()
+_metrics_sink: MetricsSink = _NOOP_SINK
+
+
+def get_metrics_sink() -> MetricsSink:
+    """Возвращает общий для процесса приемник метрик."""
+    return _metrics_sink
+
+
+def set_metrics_sink(sink: Optional[MetricsSink]) -> None:
+    """
+    Устанавливает общий для процесса приемник метрик.
+
+    Действует сразу и на уже созданные обработчики, если им не передан
+    собственный metrics_sink.
+
+    Args:
+        sink: Приемник метрик; None возвращает приемник по умолчанию (без метрик)
+    """
+    global _metrics_sink
+    _metrics_sink = sink if sink is not None else _NOOP_SINK
@@ -0,0 +1,23 @@
+"""Жизненный цикл обработчиков в процессе приложения."""
+
+from langfuse_runnable_config.internal.runtime.aio import aflush, ashutdown, run_off_loop
+from langfuse_runnable_config.internal.runtime.fork import reset_after_fork
+from langfuse_runnable_config.internal.runtime.registry import (
+    FlushReport,
+    HandlerRegistry,
+    flush_all,
+    get_handler_registry,
+    install_shutdown_hooks,
+)
+
+__all__ = [
+    "FlushReport",
+    "HandlerRegistry",
+    "aflush",
+    "ashutdown",
+    "flush_all",
+    "get_handler_registry",
+    "install_shutdown_hooks",
+    "reset_after_fork",
+    "run_off_loop",
+]
@@ -0,0 +1,83 @@
+"""Асинхронный жизненный цикл обработчиков для приложений на asyncio."""
+
+import asyncio
+import contextvars
+import functools
+from typing import Any, Callable, List, Mapping, Optional, TypeVar
+
+from langfuse_runnable_config.internal.cache import get_handler_cache
+from langfuse_runnable_config.internal.handlers.lifecycle import flush_handler
+from langfuse_runnable_config.internal.runtime.registry import flush_all
+from langfuse_runnable_config.internal.transport import (
+    get_http_client_pool,
+    get_langfuse_client_registry,
+)
+
+T = TypeVar("T")
+
+
+async def run_off_loop(func: Callable[..., T], *args: Any, **kwargs: Any) -> T:
+    """
+    Выполняет блокирующую функцию в executor'е по умолчанию, не блокируя event loop.
+
+    Контекстные переменные текущей задачи передаются в поток, как в
+    asyncio.to_thread() (доступен только с Python 3.9).
+
+    Args:
+        func: Блокирующая функция
+        *args: Позиционные аргументы функции
+        **kwargs: Именованные аргументы функции
+
+    Returns:
+        Результат функции
+    """
+    loop = asyncio.get_running_loop()
+    call = functools.partial(contextvars.copy_context().run, func, *args, **kwargs)
+    return await loop.run_in_executor(None, call)
+
+
+def _callbacks_of(target: Any) -> List[Any]:
+    """Возвращает обработчики из RunnableConfig, списка или одного обработчика."""
+    if isinstance(target, Mapping):
+        target = target.get("callbacks") or []
+    if isinstance(target, (list, tuple)):
+        return list(target)
+    # CallbackManager хранит обработчики в атрибуте handlers
+    handlers = getattr(target, "handlers", None)
+    if isinstance(handlers, list):
+        return list(handlers)
+    return [target]
+
+
+async def aflush(target: Optional[Any] = None) -> None:
+    """
+    Отправляет накопленные события в Langfuse, не блокируя event loop.
+
+    Обработчики сбрасываются параллельно в executor'е.
+
+    Args:
+        target: Обработчик, список обработчиков или RunnableConfig (по
+            умолчанию — все созданные фабриками обработчики, см. flush_all)
+    """
+    if target is None:
+        await run_off_loop(flush_all)
+        return
+    await asyncio.gather(*(run_off_loop(flush_handler, h) for h in _callbacks_of(target)))
+
+
+def _shutdown() -> None:
+    """Останавливает обработчики из кэша, клиенты v3+ и пул HTTP-клиентов v2."""
+    get_handler_cache().clear()
+    get_langfuse_client_registry().clear()
+    get_http_client_pool().close()
+
+
+async def ashutdown() -> None:
+    """
+    Отправляет накопленные события и освобождает клиенты, не блокируя event loop.
+
+    Предназначен для завершения lifespan приложения: следующий create_config()
+    создаст обработчики и клиенты заново.
+    """
+    await aflush()
+    await run_off_loop(_shutdown)
@@ -0,0 +1,38 @@
+"""Сброс состояния библиотеки в дочернем процессе после fork()."""
+
+import os
+
+from langfuse_runnable_config.internal.cache import get_handler_cache, get_settings_cache
+from langfuse_runnable_config.internal.handlers.offload import reset_offloaders_after_fork
+from langfuse_runnable_config.internal.runtime.registry import get_handler_registry
+from langfuse_runnable_config.internal.transport import (
+    get_http_client_pool,
+    get_langfuse_client_registry,
+)
+from langfuse_runnable_config.internal.version import reset_detector_after_fork
+
+
+def reset_after_fork() -> None:
+    """
+    Сбрасывает унаследованные от родительского процесса обработчики, клиенты и пулы.
+
+    Вызывается автоматически в дочернем процессе после os.fork() (в том числе
+    в воркерах gunicorn и multiprocessing с методом fork). Кэш обработчиков,
+    реестры клиентов и обработчиков и пул HTTP-клиентов очищаются без
+    остановки и отправки событий, очереди отложенной сериализации очищаются,
+    а блокировки создаются заново. Следующий create_config() создаст
+    обработчики и клиенты в дочернем процессе.
+
+    Настройки и определенная версия Langfuse сохраняются.
+    """
+    reset_detector_after_fork()
+    get_settings_cache().reset_after_fork()
+    get_handler_cache().reset_after_fork()
+    get_handler_registry().reset_after_fork()
+    get_langfuse_client_registry().reset_after_fork()
+    get_http_client_pool().reset_after_fork()
+    reset_offloaders_after_fork()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=reset_after_fork)
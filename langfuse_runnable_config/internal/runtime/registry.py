@@ -0,0 +1,267 @@
+"""Реестр созданных обработчиков и их отправка при завершении процесса."""
+
+import atexit
+import logging
+import os
+import signal
+import threading
+import time
+import weakref
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional
+
+from langfuse_runnable_config.internal.constants import DEFAULT_SHUTDOWN_TIMEOUT
+from langfuse_runnable_config.internal.handlers.lifecycle import get_flush, pending_events
+from langfuse_runnable_config.internal.transport import get_langfuse_client_registry
+
+logger = logging.getLogger(__name__)
+
+
+class FlushReport(NamedTuple):
+    """Результат отправки накопленных событий всех обработчиков."""
+
+    handlers: int
+    flushed_events: int
+    dropped_events: int
+    timed_out: int
+    duration_ms: float
+
+
+def _run_all(tasks: Iterable[Callable[[], Any]], deadline: Optional[float]) -> int:
+    """
+    Выполняет задачи параллельно в daemon-потоках и ждет их до deadline.
+
+    Потоки-демоны не задерживают завершение процесса после таймаута, а в
+    отличие от ThreadPoolExecutor их можно запускать из обработчиков atexit.
+
+    Returns:
+        Количество задач, не завершившихся до deadline
+    """
+    threads = []
+    for task in tasks:
+        thread = threading.Thread(target=task, name="langfuse-flush", daemon=True)
+        thread.start()
+        threads.append(thread)
+    timed_out = 0
+    for thread in threads:
+        thread.join(None if deadline is None else max(deadline - time.monotonic(), 0))
+        if thread.is_alive():
+            timed_out += 1
+    return timed_out
+
+
+def _guarded(func: Callable[[], Any]) -> Callable[[], None]:
+    """Оборачивает отправку, чтобы ошибка одного клиента не прерывала остальные."""
+
+    def run() -> None:
+        try:
+            func()
+        except Exception as e:
+            logger.warning(f"⚠️ Не удалось отправить события Langfuse: {e}")
+
+    return run
+
+
+class HandlerRegistry:
+    """
+    Потокобезопасный реестр обработчиков, созданных фабриками.
+
+    Обработчики хранятся по слабым ссылкам и не продлевают свою жизнь.
+    flush_all() отправляет накопленные события всех живых обработчиков и
+    клиентов v3+ параллельно и с общим таймаутом.
+    """
+
+    def __init__(self) -> None:
+        self._handlers: "weakref.WeakSet[Any]" = weakref.WeakSet()
+        # RLock: обработчик сигнала может прервать главный поток внутри track()
+        self._lock = threading.RLock()
+        self._atexit_timeout: Optional[float] = None
+        self._previous_handlers: Dict[int, Any] = {}
+
+    def track(self, handler: Any) -> Any:
+        """
+        Добавляет обработчик в реестр.
+
+        flush_all() регистрируется в atexit заново при каждом новом
+        обработчике. atexit выполняет функции в обратном порядке, поэтому
+        отправка выполнится раньше остановки клиентов SDK, созданных фабриками
+        вместе с обработчиками; клиенты, созданные позже последнего
+        обработчика, будут остановлены раньше нее.
+
+        Args:
+            handler: CallbackHandler любой версии Langfuse
+
+        Returns:
+            Тот же обработчик
+        """
+        with self._lock:
+            try:
+                self._handlers.add(handler)
+            except TypeError:
+                # Обработчик без поддержки слабых ссылок не отслеживается
+                return handler
+            if self._atexit_timeout is None:
+                self._atexit_timeout = DEFAULT_SHUTDOWN_TIMEOUT
+            self._register_at_exit()
+        return handler
+
+    def reset_after_fork(self) -> None:
+        """
+        Забывает обработчики родительского процесса после fork().
+
+        Их клиенты и потоки остались в родительском процессе, поэтому
+        дочерний процесс не должен отправлять их события при завершении.
+        """
+        self._handlers = weakref.WeakSet()
+        self._lock = threading.RLock()
+
+    def handlers(self) -> List[Any]:
+        """Возвращает снимок живых обработчиков."""
+        with self._lock:
+            return list(self._handlers)
+
+    def flush_all(self, timeout: Optional[float] = None) -> FlushReport:
+        """
+        Отправляет накопленные события всех обработчиков и клиентов в Langfuse.
+
+        Сначала параллельно дорабатываются очереди отложенной сериализации,
+        затем параллельно вызывается flush() каждого клиента SDK — по одному
+        разу, даже если клиент разделяется несколькими обработчиками.
+
+        Args:
+            timeout: Общее время ожидания в секундах (None — без ограничения)
+
+        Returns:
+            Количество обработчиков, отправленных и не отправленных до
+            таймаута событий и незавершенных отправок
+        """
+        start = time.monotonic()
+        deadline = None if timeout is None else start + timeout
+        handlers = self.handlers()
+        pending = sum(pending_events(handler) for handler in handlers)
+
+        offloaders = [
+            offloader
+            for offloader in (getattr(handler, "_offloader", None) for handler in handlers)
+            if offloader is not None and offloader.pending()
+        ]
+        # Очередь ждется без собственного таймаута: незавершенной ее считает _run_all
+        timed_out = _run_all((_guarded(offloader.join) for offloader in offloaders), deadline)
+
+        flushes: Dict[int, Callable[[], Any]] = {}
+        for flush in [get_flush(handler) for handler in handlers] + [
+            client.flush for client in get_langfuse_client_registry().clients()
+        ]:
+            if flush is not None:
+                # Один клиент v3+ разделяется обработчиками — отправляем его один раз
+                flushes.setdefault(id(getattr(flush, "__self__", flush)), flush)
+        timed_out += _run_all((_guarded(flush) for flush in flushes.values()), deadline)
+
+        dropped = sum(pending_events(handler) for handler in handlers) if timed_out else 0
+        return FlushReport(
+            handlers=len(handlers),
+            flushed_events=max(pending - dropped, 0),
+            dropped_events=dropped,
+            timed_out=timed_out,
+            duration_ms=(time.monotonic() - start) * 1000,
+        )
+
+    def install_shutdown_hooks(
+        self,
+        timeout: float = DEFAULT_SHUTDOWN_TIMEOUT,
+        signals: Iterable[int] = (signal.SIGTERM,),
+    ) -> None:
+        """
+        Отправляет накопленные события при завершении процесса и по сигналам.
+
+        Обработчик сигнала вызывает flush_all(timeout), а затем прежний
+        обработчик сигнала; если прежним было действие по умолчанию или
+        обработчик, установленный не из Python, сигнал повторяется с действием
+        по умолчанию. Сигналы можно перехватывать только из главного
+        потока, из других потоков устанавливается только atexit.
+
+        Args:
+            timeout: Время ожидания отправки в секундах
+            signals: Сигналы, по которым отправляются события
+        """
+        with self._lock:
+            self._atexit_timeout = timeout
+            self._register_at_exit()
+        if threading.current_thread() is not threading.main_thread():
+            logger.warning("⚠️ Обработчики сигналов Langfuse можно установить только из main")
+            return
+        for signum in signals:
+            previous = signal.getsignal(signum)
+            if previous is not self._on_signal:
+                self._previous_handlers[signum] = previous
+                signal.signal(signum, self._on_signal)
+
+    def _register_at_exit(self) -> None:
+        """Переносит flush_all() в конец atexit, чтобы он выполнился первым."""
+        atexit.unregister(self._flush_at_exit)
+        atexit.register(self._flush_at_exit)
+
+    def _on_signal(self, signum: int, frame: Any) -> None:
+        # Без логирования: logging не реентерабелен и может прервать сам себя
+        self.flush_all(self._atexit_timeout)
+        previous = self._previous_handlers.get(signum, signal.SIG_DFL)
+        if callable(previous):
+            previous(signum, frame)
+        elif previous is None or previous == signal.SIG_DFL:
+            # None — обработчик установлен не из Python; повторяем сигнал с действием
+            # по умолчанию, чтобы он не был поглощен
+            signal.signal(signum, signal.SIG_DFL)
+            os.kill(os.getpid(), signum)
+
+    def _flush_at_exit(self) -> None:
+        if self.handlers():
+            self._report(self.flush_all(self._atexit_timeout))
+
+    @staticmethod
+    def _report(report: FlushReport) -> None:
+        """Логирует итог отправки при завершении процесса."""
+        if report.dropped_events or report.timed_out:
+            logger.warning(
+                f"⚠️ Langfuse: за {report.duration_ms:.0f} мс отправлено "
+                f"{report.flushed_events} событий, не отправлено {report.dropped_events}, "
+                f"незавершенных отправок: {report.timed_out}"
+            )
+        else:
+            logger.info(
+                f"Langfuse: отправлено {report.flushed_events} событий "
+                f"{report.handlers} обработчиков за {report.duration_ms:.0f} мс"
+            )
+
+
+_handler_registry = HandlerRegistry()
+
+
+def get_handler_registry() -> HandlerRegistry:
+    """Возвращает общий для процесса реестр обработчиков."""
+    return _handler_registry
+
+
+def flush_all(timeout: Optional[float] = None) -> FlushReport:
+    """
+    Отправляет накопленные события всех созданных обработчиков в Langfuse.
+
+    Args:
+        timeout: Общее время ожидания в секундах (None — без ограничения)
+
+    Returns:
+        Отчет об отправке (см. HandlerRegistry.flush_all)
+    """
+    return _handler_registry.flush_all(timeout)
+
+
+def install_shutdown_hooks(
+    timeout: float = DEFAULT_SHUTDOWN_TIMEOUT,
+    signals: Iterable[int] = (signal.SIGTERM,),
+) -> None:
+    """
+    Отправляет накопленные события при завершении процесса и по сигналам.
+
+    Args:
+        timeout: Время ожидания отправки в секундах
+        signals: Сигналы, по которым отправляются события
+    """
+    _handler_registry.install_shutdown_hooks(timeout, signals)
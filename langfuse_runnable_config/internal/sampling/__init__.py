@@ -0,0 +1,10 @@
+"""Выборка запусков для трейсинга."""
+
+from langfuse_runnable_config.internal.sampling.sampler import (
+    NoopCallbackHandler,
+    get_noop_handler,
+    get_sample_rate,
+    is_sampled,
+)
+
+__all__ = ["NoopCallbackHandler", "get_noop_handler", "get_sample_rate", "is_sampled"]
@@ -0,0 +1,93 @@
+"""Head-based выборка запусков для трейсинга."""
+
+import hashlib
+import random
+from typing import Any, Hashable, Optional, Union
+
+from langchain_core.callbacks import BaseCallbackHandler
+
+from langfuse_runnable_config.settings import LangfuseSettings, LangfuseTruncatingSettings
+
+# Количество значений 64-битного хеша ключа выборки
+_HASH_SPACE: int = 2**64
+
+
+def get_sample_rate(
+    settings: Union[LangfuseSettings, LangfuseTruncatingSettings],
+    run_name: Optional[str] = None,
+) -> float:
+    """
+    Возвращает долю отправляемых запусков для имени запуска.
+
+    Args:
+        settings: Настройки Langfuse
+        run_name: Имя запуска; если для него задана доля в sample_rates,
+            используется она, иначе sample_rate
+
+    Returns:
+        Доля запусков от 0.0 до 1.0
+    """
+    if run_name is not None and run_name in settings.sample_rates:
+        return settings.sample_rates[run_name]
+    return settings.sample_rate
+
+
+def is_sampled(
+    settings: Union[LangfuseSettings, LangfuseTruncatingSettings],
+    run_name: Optional[str] = None,
+    sampling_key: Optional[Hashable] = None,
+) -> bool:
+    """
+    Решает, отправлять ли запуск в Langfuse.
+
+    С ключом выборки (id трейса или сессии) решение детерминировано: все
+    запуски с одним ключом либо отправляются, либо нет, поэтому трейс
+    остается полным. Без ключа решение случайное.
+
+    Args:
+        settings: Настройки Langfuse
+        run_name: Имя запуска для выбора доли из sample_rates
+        sampling_key: Ключ детерминированной выборки; ключи, отличные от
+            строк (например, UUID), сравниваются по str()
+
+    Returns:
+        True, если запуск нужно отправить
+    """
+    rate = get_sample_rate(settings, run_name)
+    if rate >= 1.0:
+        return True
+    if rate <= 0.0:
+        return False
+    if sampling_key is None:
+        return random.random() < rate
+
+    digest = hashlib.blake2b(str(sampling_key).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "big") < rate * _HASH_SPACE
+
+
+class NoopCallbackHandler(BaseCallbackHandler):
+    """
+    Обработчик для невыбранных запусков: игнорирует все события.
+
+    Не сериализует данные и не обращается к сети, а флаги ignore_* позволяют
+    LangChain не вызывать его вовсе.
+    """
+
+    ignore_llm = True
+    ignore_retry = True
+    ignore_chain = True
+    ignore_agent = True
+    ignore_retriever = True
+    ignore_chat_model = True
+    ignore_custom_event = True
+
+    def flush(self) -> None:
+        """Ничего не отправляет."""
+
+
+_noop_handler = NoopCallbackHandler()
+
+
+def get_noop_handler() -> Any:
+    """Возвращает общий для процесса обработчик невыбранных запусков."""
+    return _noop_handler
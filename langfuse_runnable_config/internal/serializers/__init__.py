@@ -1,7 +1,38 @@
 """Модуль для сериализации и обрезки данных."""
 
+from langfuse_runnable_config.internal.serializers.memo import ScopedMemo, SerializationMemo
 from langfuse_runnable_config.internal.serializers.truncator import (
+    STRING_STRATEGIES,
+    SerializerStats,
+    TracingSerializer,
     serialize_for_tracing,
 )
+from langfuse_runnable_config.internal.serializers.units import (
+    LENGTH_UNITS,
+    ApproxTokenizer,
+    EncodingTokenizer,
+    LengthUnit,
+    TiktokenTokenizer,
+    Utf8Bytes,
+    get_tokenizer,
+    register_tokenizer,
+    resolve_length_unit,
+)
 
-__all__ = ["serialize_for_tracing"]
+__all__ = [
+    "LENGTH_UNITS",
+    "STRING_STRATEGIES",
+    "ApproxTokenizer",
+    "EncodingTokenizer",
+    "LengthUnit",
+    "ScopedMemo",
+    "SerializationMemo",
+    "SerializerStats",
+    "TiktokenTokenizer",
+    "TracingSerializer",
+    "Utf8Bytes",
+    "get_tokenizer",
+    "register_tokenizer",
+    "resolve_length_unit",
+    "serialize_for_tracing",
+]
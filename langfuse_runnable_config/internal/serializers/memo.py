@@ -0,0 +1,188 @@
+"""Запоминание результатов обрезки повторно передаваемых объектов."""
+
+import threading
+import weakref
+from collections import OrderedDict
+from typing import TYPE_CHECKING, Any, Dict, Hashable, Mapping, Optional, Sequence, Tuple
+
+from langfuse_runnable_config.internal.constants import DEFAULT_MEMO_SIZE
+
+if TYPE_CHECKING:
+    from langfuse_runnable_config.internal.serializers.truncator import SerializerStats
+
+# Запись: (ссылка на объект, версия, результат обрезки, статистика обхода)
+_Entry = Tuple[Any, Tuple[Any, ...], Any, "SerializerStats"]
+
+
+def _size(value: Any) -> int:
+    """Возвращает длину значения или -1, если у него нет длины."""
+    if getattr(type(value), "__len__", None) is None:
+        return -1
+    try:
+        return len(value)
+    except Exception:
+        return -1
+
+
+def _version(data: Any, max_elements: int) -> Optional[Tuple[Any, ...]]:
+    """
+    Строит дешевую версию объекта для проверки, что он не изменился.
+
+    Версия включает длину объекта и идентичность и длину тех дочерних
+    значений, которые читает обход (первые max_elements), поэтому замена
+    значения или добавление элемента во вложенный список меняют версию.
+    Изменения глубже первого уровня не отслеживаются.
+
+    Returns:
+        Кортеж версии или None, если объект не подходит для запоминания
+    """
+    if isinstance(data, (str, bytes)):
+        return None
+    if isinstance(data, Mapping):
+        children = iter(data.items())
+    elif isinstance(data, Sequence):
+        children = enumerate(data)
+    elif hasattr(data, "__dict__"):
+        children = iter(vars(data).items())
+    else:
+        return None
+
+    version = [_size(data)]
+    for index, (key, value) in enumerate(children):
+        if index >= max_elements:
+            break
+        version.append((key, id(value), _size(value)))
+    return tuple(version)
+
+
+class SerializationMemo:
+    """
+    Потокобезопасный LRU-кэш результатов обрезки по идентичности объекта.
+
+    Предназначен для одного обработчика: в цепочках в стиле LangGraph одно и
+    то же состояние передается выходом одного узла и входом следующего, и
+    повторная обрезка заменяется поиском в кэше. Объекты, поддерживающие
+    слабые ссылки (модели Pydantic, Document), не удерживаются кэшем; dict и
+    list удерживаются до вытеснения, чтобы их id не переиспользовался.
+
+    Записи разделяются по области (scope), например по трейсу: обработчик из
+    кэша обслуживает параллельные запросы, и evict() освобождает записи
+    только завершенного трейса.
+    """
+
+    def __init__(self, maxsize: int = DEFAULT_MEMO_SIZE) -> None:
+        """
+        Создает пустой кэш.
+
+        Args:
+            maxsize: Максимальное количество запомненных объектов
+        """
+        self._maxsize = maxsize
+        self._init_state()
+
+    def _init_state(self) -> None:
+        self._entries: "OrderedDict[Hashable, _Entry]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> Dict[str, Any]:
+        return {"_maxsize": self._maxsize}
+
+    def __setstate__(self, state: Dict[str, Any]) -> None:
+        self._maxsize = state["_maxsize"]
+        self._init_state()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(
+        self, data: Any, limits: Tuple[Any, ...], scope: Hashable = None
+    ) -> Optional[Tuple[Any, "SerializerStats"]]:
+        """
+        Возвращает запомненный результат обрезки объекта с теми же лимитами.
+
+        Args:
+            data: Исходный объект
+            limits: Параметры обходчика (результат зависит от них)
+            scope: Область записи (например, run_id корня трейса)
+
+        Returns:
+            (результат, статистика обхода) или None, если объект не запомнен
+            или изменился
+        """
+        key = (scope, id(data), limits)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            ref, version, result, stats = entry
+            target = ref() if isinstance(ref, weakref.ref) else ref
+            if target is not data or version != _version(data, limits[1]):
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return result, stats
+
+    def put(
+        self,
+        data: Any,
+        limits: Tuple[Any, ...],
+        result: Any,
+        stats: "SerializerStats",
+        scope: Hashable = None,
+    ) -> None:
+        """
+        Запоминает результат обрезки объекта.
+
+        Args:
+            data: Исходный объект
+            limits: Параметры обходчика; limits[1] — max_vector_elements
+            result: Результат обрезки
+            stats: Статистика обхода
+            scope: Область записи (например, run_id корня трейса)
+        """
+        version = _version(data, limits[1])
+        if version is None or self._maxsize <= 0:
+            return
+        try:
+            ref: Any = weakref.ref(data)
+        except TypeError:
+            ref = data
+        key = (scope, id(data), limits)
+        with self._lock:
+            self._entries[key] = (ref, version, result, stats)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self._maxsize:
+                self._entries.popitem(last=False)
+
+    def scoped(self, scope: Hashable) -> "ScopedMemo":
+        """Возвращает представление кэша, запоминающее результаты в области scope."""
+        return ScopedMemo(self, scope)
+
+    def evict(self, scope: Hashable) -> None:
+        """Удаляет записи области scope."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == scope]:
+                del self._entries[key]
+
+    def clear(self) -> None:
+        """Очищает кэш."""
+        with self._lock:
+            self._entries.clear()
+
+
+class ScopedMemo:
+    """Представление SerializationMemo для одной области (передается обходчику)."""
+
+    __slots__ = ("_memo", "_scope")
+
+    def __init__(self, memo: SerializationMemo, scope: Hashable) -> None:
+        self._memo = memo
+        self._scope = scope
+
+    def get(self, data: Any, limits: Tuple[Any, ...]) -> Optional[Tuple[Any, "SerializerStats"]]:
+        return self._memo.get(data, limits, self._scope)
+
+    def put(
+        self, data: Any, limits: Tuple[Any, ...], result: Any, stats: "SerializerStats"
+    ) -> None:
+        self._memo.put(data, limits, result, stats, self._scope)
@@ -1,16 +1,96 @@
 """Утилиты для обрезки больших данных при трейсинге."""
 
-from typing import Any, List, Mapping, Sequence
+import hashlib
+import reprlib
+import sys
+from collections.abc import MappingView, Set as AbstractSet
+from itertools import chain, islice
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Mapping,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+)
 
 from langchain_core.documents import Document
 
 from langfuse_runnable_config.internal.constants import (
+    DEFAULT_MAX_DEPTH,
     DEFAULT_MAX_LENGTH,
+    DEFAULT_MAX_NODES,
+    DEFAULT_MAX_TOTAL_LENGTH,
     DEFAULT_MAX_VECTOR_ELEMENTS,
 )
+from langfuse_runnable_config.internal.serializers.memo import ScopedMemo, SerializationMemo
+from langfuse_runnable_config.internal.serializers.units import (
+    LengthUnit,
+    resolve_length_unit,
+)
+
+# Сколько узлов проверяет быстрая оценка размера, прежде чем сдаться
+_FAST_PATH_MAX_NODES: int = 256
+
+# Типы скаляров, которые обходчик возвращает без изменений
+_SCALAR_TYPES = (bool, int, float)
+
+# Максимальное количество байт на символ в UTF-8
+_MAX_UTF8_CHAR_BYTES: int = 4
+
+# Размер части строки, кодируемой за один шаг при подсчете отпечатка
+_FINGERPRINT_CHUNK_CHARS: int = 64 * 1024
+
+# Длина отпечатка содержимого в байтах (16 шестнадцатеричных цифр)
+_FINGERPRINT_DIGEST_SIZE: int = 8
+
+# Длина строк в символах для стратегий обрезки с единицей по умолчанию
+_CHARS = LengthUnit()
+
+# Какую часть длинной строки сохранять: начало, конец или начало и конец
+STRING_STRATEGIES = frozenset({"head", "tail", "head_tail"})
+
+# Маркер на месте опущенной части строки
+ELISION_MARKER: str = "..."
+
+# Исходная длина в символах и отпечаток содержимого обрезанной строки
+FINGERPRINT_FORMAT: str = " [{} chars, blake2b:{}]"
+
+# Ключ, под которым в словаре указывается количество опущенных ключей
+ELIDED_KEY: str = "…"
+
+# Заглушки, которыми заменяются пропущенные значения
+CYCLE_PLACEHOLDER: str = "<cycle>"
+MAX_DEPTH_PLACEHOLDER: str = "<max depth exceeded>"
+BUDGET_PLACEHOLDER: str = "<budget exhausted>"
 
-# Количество элементов для проверки вектора
-_VECTOR_CHECK_SAMPLE_SIZE: int = 3
+# Содержимое документа, повторяющего ранее выведенный (номер первого вхождения)
+DUPLICATE_DOCUMENT_FORMAT: str = "<duplicate of document #{}>"
+
+# Маркер выхода из контейнера в стеке обхода
+_EXIT = object()
+
+# Задача обхода: (контейнер результата, ключ, исходное значение, глубина)
+_Task = Tuple[Any, Any, Any, int]
+
+
+class SerializerStats(NamedTuple):
+    """Статистика обхода данных одним TracingSerializer."""
+
+    nodes: int
+    input_length: int
+    output_length: int
+    truncated_strings: int
+    truncated_vectors: int
+    truncated_containers: int
+    budget_exhausted: int
+    deduplicated_documents: int = 0
 
 
 def _truncate_str(value: str, max_length: int) -> str:
@@ -29,30 +109,68 @@ def _truncate_str(value: str, max_length: int) -> str:
     return value[:max_length] + "..."
 
 
-def _is_vector(data: Sequence[Any]) -> bool:
+def _fingerprint(value: str) -> str:
+    """
+    Возвращает отпечаток обрезанной строки: ее длину и хеш всего содержимого.
+
+    Строка кодируется и хешируется частями за один проход, без копии всего
+    содержимого в памяти. Одинаковые значения в разных трейсах и процессах
+    получают одинаковый отпечаток.
+
+    Args:
+        value: Исходная строка
+
+    Returns:
+        Отпечаток в формате FINGERPRINT_FORMAT
+    """
+    digest = hashlib.blake2b(digest_size=_FINGERPRINT_DIGEST_SIZE)
+    for start in range(0, len(value), _FINGERPRINT_CHUNK_CHARS):
+        chunk = value[start : start + _FINGERPRINT_CHUNK_CHARS]
+        digest.update(chunk.encode("utf-8", errors="surrogatepass"))
+    return FINGERPRINT_FORMAT.format(len(value), digest.hexdigest())
+
+
+def _decode_prefix(data: bytes, max_chars: int) -> str:
+    """
+    Декодирует только начало буфера, достаточное для max_chars символов.
+
+    Args:
+        data: Буфер для декодирования
+        max_chars: Максимальное количество символов результата обрезки
+            (см. LengthUnit.max_chars)
+
+    Returns:
+        Декодированная строка; длиннее max_chars, если буфер не поместился
+    """
+    # Один лишний байт гарантирует, что обрезка останется видимой
+    limit = max_chars * _MAX_UTF8_CHAR_BYTES + 1
+    if len(data) <= limit:
+        return data.decode(errors="replace")
+    return data[:limit].decode(errors="replace")
+
+
+def _is_vector(data: Sequence[Any], max_elements: int) -> bool:
     """
     Проверяет, является ли последовательность вектором (list[float]).
 
-    Выполняет быструю проверку первых элементов для определения типа.
+    Проверяются все элементы, которые останутся после обрезки: вектор
+    возвращается без обхода элементов, поэтому строка или объект среди них
+    миновали бы лимиты длины и бюджета.
 
     Args:
         data: Последовательность для проверки
+        max_elements: Количество сохраняемых элементов
 
     Returns:
-        True если последовательность похожа на вектор чисел
+        True если сохраняемые элементы — числа
     """
     if not data:
         return False
 
-    try:
-        sample_size = min(_VECTOR_CHECK_SAMPLE_SIZE, len(data))
-        for i in range(sample_size):
-            x = data[i]
-            if not isinstance(x, (int, float)) or isinstance(x, bool):
-                return False
-        return True
-    except (IndexError, TypeError):
-        return False
+    for x in islice(data, max_elements):
+        if not isinstance(x, (int, float)) or isinstance(x, bool):
+            return False
+    return True
 
 
 def _truncate_vector(vector: Sequence[float], max_elements: int) -> List[float]:
@@ -68,27 +186,639 @@ def _truncate_vector(vector: Sequence[float], max_elements: int) -> List[float]:
     """
     if len(vector) <= max_elements:
         return list(vector) if not isinstance(vector, list) else vector
-    return list(vector[:max_elements])
+    return list(islice(vector, max_elements))
+
+
+def _is_array_like(data: Any) -> bool:
+    """
+    Проверяет, является ли объект многомерным массивом (NumPy, torch, memoryview).
+
+    NumPy не импортируется: массивы распознаются по протоколу __array__.
+
+    Args:
+        data: Объект для проверки
+
+    Returns:
+        True если объект поддерживает __array__ или является memoryview
+    """
+    return isinstance(data, memoryview) or hasattr(type(data), "__array__")
+
+
+def _truncate_array(data: Any, max_elements: int) -> Any:
+    """
+    Обрезает массив без копирования данных за пределами лимита.
+
+    По каждой оси берутся первые max_elements элементов (для пакета эмбеддингов —
+    первые строки × первые столбцы). Срез NumPy и torch является view, поэтому
+    копируются только попавшие в результат элементы.
+
+    Args:
+        data: Массив NumPy, тензор или memoryview
+        max_elements: Максимальное количество элементов по каждой оси
+
+    Returns:
+        Словарь с исходной формой, типом и обрезанными значениями, число для
+        скаляров NumPy или None, если массив не поддерживает срезы
+    """
+    try:
+        if isinstance(data, memoryview):
+            dtype = data.format
+            if data.ndim > 1:
+                # Многомерные срезы memoryview не поддерживает — используем view NumPy
+                numpy = sys.modules.get("numpy")
+                if numpy is None:
+                    return {"shape": list(data.shape), "dtype": dtype, "values": None}
+                data = numpy.asarray(data)
+        else:
+            dtype = str(data.dtype)
+
+        shape = tuple(data.shape)
+        if not shape:
+            return data.tolist()
+        if len(shape) == 1:
+            values = data[:max_elements].tolist()
+        else:
+            values = data[tuple(slice(0, max_elements) for _ in shape)].tolist()
+    except Exception:
+        return None
+    return {"shape": list(shape), "dtype": dtype, "values": values}
+
+
+def _is_numeric_array(data: Any) -> bool:
+    """
+    Проверяет, что массив содержит только числа (bool, int, uint, float, complex).
+
+    Тензоры и memoryview без dtype.kind считаются числовыми.
+    """
+    kind = getattr(getattr(data, "dtype", None), "kind", None)
+    return kind is None or kind in "biufc"
+
+
+def _iter_model_fields(data: Any) -> Optional[Iterator[Tuple[str, Any]]]:
+    """
+    Возвращает ленивый итератор полей Pydantic модели без вызова model_dump().
+
+    Значения читаются по мере обхода, поэтому поля за пределами лимита
+    не копируются. Порядок и состав полей соответствуют model_dump():
+    обычные поля (кроме exclude=True), extra-поля и вычисляемые поля.
+
+    Args:
+        data: Экземпляр Pydantic модели
+
+    Returns:
+        Итератор пар (имя поля, значение) или None, если data не модель Pydantic
+    """
+    cls = type(data)
+    fields = getattr(cls, "model_fields", None)
+    if isinstance(fields, Mapping):
+        # Pydantic v2
+        names = [name for name, info in fields.items() if not getattr(info, "exclude", False)]
+        extra = getattr(data, "__pydantic_extra__", None) or {}
+        computed = getattr(cls, "model_computed_fields", None) or {}
+        return chain(
+            ((name, getattr(data, name)) for name in names),
+            extra.items(),
+            ((name, getattr(data, name)) for name in computed),
+        )
+
+    fields = getattr(cls, "__fields__", None)
+    if isinstance(fields, Mapping):
+        # Pydantic v1
+        return ((name, getattr(data, name)) for name in fields)
+
+    return None
+
+
+class TracingSerializer:
+    """
+    Итеративный обходчик данных с ограничениями по глубине и бюджету.
+
+    Использует явный стек вместо рекурсии, поэтому глубоко вложенные данные
+    не приводят к RecursionError. Контейнеры на текущем пути отслеживаются
+    по id() для обнаружения циклов. После исчерпания бюджета (количество
+    посещенных узлов или суммарная длина строк) оставшиеся значения заменяются
+    заглушкой, так что стоимость сериализации ограничена бюджетом.
+
+    Небольшие данные из dict, list и скаляров, которые укладываются во все
+    лимиты, возвращаются как есть, без копирования: сначала выполняется
+    дешевая оценка размера с ранним выходом, и только если что-то нужно
+    обрезать, данные перестраиваются.
+
+    С memo результат обрезки объекта, переданного первым в serialize(),
+    запоминается, и повторная обрезка того же неизмененного объекта с теми же
+    лимитами возвращает запомненный результат.
+
+    Для Document можно оставить только выбранные ключи метаданных и заменить
+    содержимое повторяющихся документов ссылкой на первое вхождение.
+
+    Лимиты длины строк задаются в символах или, с length_unit, в байтах UTF-8
+    или токенах; строка при этом обрезается по границе символа.
+
+    У длинной строки сохраняется начало, конец или начало и конец
+    (string_strategy), а к обрезанной строке можно добавить ее исходную длину и
+    отпечаток содержимого, по которым одинаковые значения находятся в разных
+    трейсах.
+    """
+
+    def __init__(
+        self,
+        max_length: int = DEFAULT_MAX_LENGTH,
+        max_vector_elements: int = DEFAULT_MAX_VECTOR_ELEMENTS,
+        max_depth: int = DEFAULT_MAX_DEPTH,
+        max_nodes: int = DEFAULT_MAX_NODES,
+        max_total_length: int = DEFAULT_MAX_TOTAL_LENGTH,
+        memo: Optional[Union[SerializationMemo, ScopedMemo]] = None,
+        document_metadata_keys: Optional[Sequence[str]] = None,
+        dedupe_documents: bool = False,
+        length_unit: Optional[LengthUnit] = None,
+        string_strategy: str = "head",
+        fingerprint: bool = False,
+    ) -> None:
+        """
+        Инициализирует обходчик с ограничениями.
+
+        Бюджет общий для всех вызовов serialize() одного экземпляра, поэтому
+        несколько частей одного события можно обрезать с общим бюджетом.
+
+        Args:
+            max_length: Максимальная длина строки
+            max_vector_elements: Максимальное количество элементов вектора/списка
+            max_depth: Максимальная глубина вложенности контейнеров
+            max_nodes: Максимальное количество посещенных узлов
+            max_total_length: Максимальная суммарная длина строк в результате
+            memo: Кэш результатов обрезки (обычно общий для обработчика) или
+                его представление для одного трейса (SerializationMemo.scoped)
+            document_metadata_keys: Ключи метаданных Document, которые нужно
+                сохранить (None — все)
+            dedupe_documents: Заменять содержимое Document, совпадающее с уже
+                выведенным в этом обходчике, ссылкой DUPLICATE_DOCUMENT_FORMAT
+            length_unit: Единица max_length и max_total_length (None — символы,
+                см. resolve_length_unit)
+            string_strategy: Какую часть длинной строки сохранить: "head" —
+                начало, "tail" — конец, "head_tail" — начало и конец с маркером
+                ELISION_MARKER между ними
+            fingerprint: Добавлять к обрезанной строке FINGERPRINT_FORMAT с
+                исходной длиной и хешем BLAKE2b всего содержимого. Кроме
+                обрезки по умолчанию (начало строки в символах без отпечатка),
+                маркер и отпечаток входят в max_length
+
+        Raises:
+            ValueError: Если стратегия string_strategy неизвестна
+        """
+        if string_strategy not in STRING_STRATEGIES:
+            raise ValueError(f"Неизвестная стратегия обрезки строк: {string_strategy!r}")
+        self._max_length = max_length
+        self._max_vector_elements = max_vector_elements
+        self._max_depth = max_depth
+        self._max_nodes = max_nodes
+        self._max_total_length = max_total_length
+        self._nodes = 0
+        self._total_length = 0
+        self._input_length = 0
+        self._truncated_strings = 0
+        self._truncated_vectors = 0
+        self._truncated_containers = 0
+        self._budget_exhausted = 0
+        self._active: Set[int] = set()
+        self._repr: Optional[reprlib.Repr] = None
+        self._memo = memo
+        self._document_metadata_keys = (
+            tuple(document_metadata_keys) if document_metadata_keys is not None else None
+        )
+        self._dedupe_documents = dedupe_documents
+        self._unit = length_unit
+        self._suffix_size = (
+            length_unit.measure(ELISION_MARKER) if length_unit is not None else len(ELISION_MARKER)
+        )
+        self._string_strategy = string_strategy
+        self._fingerprint = fingerprint
+        # Обрезка по умолчанию: начало строки в символах без отпечатка
+        self._plain_head = length_unit is None and string_strategy == "head" and not fingerprint
+        # Содержимое документа -> номер первого документа с ним; хеш строки кэшируется
+        self._documents: Dict[str, int] = {}
+        self._documents_seen = 0
+        self._deduplicated_documents = 0
+
+    @property
+    def nodes(self) -> int:
+        """Количество посещенных узлов."""
+        return self._nodes
+
+    @property
+    def total_length(self) -> int:
+        """Суммарная длина строк в результатах."""
+        return self._total_length
+
+    def stats(self) -> SerializerStats:
+        """
+        Возвращает статистику всех вызовов serialize() этого экземпляра.
+
+        Выходная длина считается в единицах лимитов (length_unit), входная — в
+        символах и только для строк, до которых дошел обход: опущенные
+        элементы не читаются.
+        """
+        return SerializerStats(
+            nodes=self._nodes,
+            input_length=self._input_length,
+            output_length=self._total_length,
+            truncated_strings=self._truncated_strings,
+            truncated_vectors=self._truncated_vectors,
+            truncated_containers=self._truncated_containers,
+            budget_exhausted=self._budget_exhausted,
+            deduplicated_documents=self._deduplicated_documents,
+        )
+
+    def serialize(self, data: Any) -> Any:
+        """Сериализует данные, обходя их с помощью явного стека."""
+        if self._fits(data):
+            return data
+        # Запомненный результат корректен, только если бюджет еще не расходовался
+        memo = self._memo
+        if memo is None or self._nodes or self._total_length:
+            return self._walk(data)
+
+        limits = (
+            self._max_length,
+            self._max_vector_elements,
+            self._max_depth,
+            self._max_nodes,
+            self._max_total_length,
+            self._document_metadata_keys,
+            self._dedupe_documents,
+            self._unit,
+            self._string_strategy,
+            self._fingerprint,
+        )
+        cached = memo.get(data, limits)
+        if cached is not None:
+            result, stats = cached
+            self._restore(stats)
+            return result
+        result = self._walk(data)
+        memo.put(data, limits, result, self.stats())
+        return result
+
+    def _walk(self, data: Any) -> Any:
+        """Обходит данные с помощью явного стека, перестраивая контейнеры."""
+        root: List[Any] = [None]
+        stack: List[_Task] = [(root, 0, data, 0)]
+        while stack:
+            target, key, value, depth = stack.pop()
+            if target is _EXIT:
+                self._active.discard(key)
+                continue
+            target[key] = self._visit(value, depth, stack)
+        return root[0]
+
+    def _restore(self, stats: SerializerStats) -> None:
+        """Учитывает в бюджете запомненный обход, как если бы он выполнился."""
+        self._nodes = stats.nodes
+        self._input_length = stats.input_length
+        self._total_length = stats.output_length
+        self._truncated_strings = stats.truncated_strings
+        self._truncated_vectors = stats.truncated_vectors
+        self._truncated_containers = stats.truncated_containers
+        self._budget_exhausted = stats.budget_exhausted
+        self._deduplicated_documents = stats.deduplicated_documents
+
+    def _fits(self, data: Any) -> bool:
+        """
+        Проверяет, что обход вернет данные без изменений.
+
+        Обходит не более _FAST_PATH_MAX_NODES узлов, принимая только точные
+        типы dict, list, str и скаляры. Если данные укладываются в оставшийся
+        бюджет и лимиты, учитывает их в бюджете, как это сделал бы обход.
+        """
+        nodes = self._nodes
+        length = self._total_length
+        chars = 0
+        unit = self._unit
+        node_limit = min(self._max_nodes, nodes + _FAST_PATH_MAX_NODES)
+        stack: List[Tuple[Any, int]] = [(data, 0)]
+        while stack:
+            value, depth = stack.pop()
+            if value is None:
+                continue
+            if nodes >= node_limit:
+                return False
+            nodes += 1
+            cls = type(value)
+            if cls is str:
+                if length >= self._max_total_length:
+                    return False
+                limit = min(self._max_length, self._max_total_length - length)
+                if unit is None:
+                    size = len(value)
+                    if size > limit:
+                        return False
+                else:
+                    # cut() не измеряет строку целиком, если она длиннее лимита
+                    prefix, size = unit.cut(value, limit)
+                    if prefix is not value:
+                        return False
+                length += size
+                chars += len(value)
+            elif cls in _SCALAR_TYPES:
+                continue
+            elif cls is dict or cls is list:
+                if depth >= self._max_depth or len(value) > self._max_vector_elements:
+                    return False
+                if cls is dict:
+                    stack.extend((item, depth + 1) for item in value.values())
+                # Как и в _visit, элементы вектора не обходятся, только если все они числа
+                elif not _is_vector(value, self._max_vector_elements):
+                    stack.extend((item, depth + 1) for item in value)
+            else:
+                return False
+
+        self._input_length += chars
+        self._nodes = nodes
+        self._total_length = length
+        return True
+
+    def _visit(self, data: Any, depth: int, stack: List[_Task]) -> Any:
+        """Сериализует одно значение, добавляя дочерние элементы в стек."""
+        if data is None:
+            return None
+
+        if self._nodes >= self._max_nodes:
+            self._budget_exhausted += 1
+            return BUDGET_PLACEHOLDER
+        self._nodes += 1
+
+        if isinstance(data, str):
+            return self._emit_str(data)
+
+        if isinstance(data, (bool, int, float)):
+            return data
+
+        if isinstance(data, bytes):
+            self._input_length += len(data)
+            unit = self._unit
+            max_chars = self._max_length if unit is None else unit.max_chars(self._max_length)
+            if self._string_strategy != "head" or self._fingerprint or max_chars is None:
+                # Конец буфера, отпечаток и точные токены требуют всего содержимого
+                return self._emit_str(data.decode(errors="replace"), counted=True)
+            return self._emit_str(_decode_prefix(data, max_chars), counted=True)
+
+        if isinstance(data, Document):
+            return self._visit_document(data, depth, stack)
+
+        # Массивы NumPy, тензоры и memoryview — без форматирования всего массива
+        if _is_array_like(data):
+            array = _truncate_array(data, self._max_vector_elements)
+            if array is not None:
+                if isinstance(array, dict) and any(
+                    size > self._max_vector_elements for size in array["shape"]
+                ):
+                    self._truncated_vectors += 1
+                if _is_numeric_array(data):
+                    return array
+                # Строки и объекты обходятся как обычные значения: к ним
+                # применяются max_length, max_total_length и max_nodes
+                if not isinstance(array, dict):
+                    self._nodes -= 1
+                    return self._visit(array, depth, stack)
+                values = array.pop("values")
+                return self._enter(data, depth, stack, array, [("values", values)])
+
+        if isinstance(data, Sequence):
+            # Специальная обработка векторов (list[float])
+            if _is_vector(data, self._max_vector_elements):
+                if len(data) > self._max_vector_elements:
+                    self._truncated_vectors += 1
+                return _truncate_vector(data, max_elements=self._max_vector_elements)
+            # Обрезаем длинные списки; islice работает и без поддержки срезов (deque)
+            items = list(islice(data, self._max_vector_elements))
+            if len(items) < len(data):
+                self._truncated_containers += 1
+            return self._enter(data, depth, stack, [None] * len(items), enumerate(items))
+
+        if isinstance(data, Mapping):
+            return self._visit_items(data, data.items(), depth, stack, total=len(data))
+
+        # Обработка Pydantic BaseModel без материализации model_dump()
+        if hasattr(data, "model_dump") or hasattr(data, "dict"):
+            fields = _iter_model_fields(data)
+            if fields is not None:
+                return self._visit_items(data, fields, depth, stack)
+            # Другие модели с методами model_dump() или dict()
+            dumped = data.model_dump() if hasattr(data, "model_dump") else data.dict()
+            if isinstance(dumped, Mapping):
+                return self._visit_items(dumped, dumped.items(), depth, stack, total=len(dumped))
+            data = dumped
+
+        if isinstance(data, (AbstractSet, MappingView)):
+            return self._emit_str(self._render_collection(data))
+
+        # fallback - обрезаем строковое представление по стратегии и единице длины
+        return self._emit_str(str(data))
+
+    def _visit_document(self, data: Document, depth: int, stack: List[_Task]) -> Any:
+        """Сериализует Document с отбором метаданных и дедупликацией содержимого."""
+        content = data.page_content
+        page_content = None
+        if self._dedupe_documents:
+            index = self._documents_seen
+            self._documents_seen += 1
+            first = self._documents.setdefault(content, index)
+            if first != index:
+                self._deduplicated_documents += 1
+                page_content = DUPLICATE_DOCUMENT_FORMAT.format(first)
+        if page_content is None:
+            page_content = self._emit_str(content)
+
+        metadata = data.metadata
+        keys = self._document_metadata_keys
+        if keys is not None:
+            metadata = {key: metadata[key] for key in keys if key in metadata}
+        out = {"page_content": page_content, "metadata": None}
+        return self._enter(data, depth, stack, out, [("metadata", metadata)])
+
+    def _visit_items(
+        self,
+        data: Any,
+        items: Iterable[Tuple[Any, Any]],
+        depth: int,
+        stack: List[_Task],
+        total: Optional[int] = None,
+    ) -> Any:
+        """
+        Сериализует пары ключ-значение, оставляя первые max_vector_elements.
+
+        Пары читаются потоково, без копирования всего словаря. Если известно
+        общее количество ключей, опущенные ключи отмечаются маркером.
+        """
+        # Обрезаем большие словари
+        head = list(islice(items, self._max_vector_elements))
+        out = dict.fromkeys(key for key, _ in head)
+        result = self._enter(data, depth, stack, out, head)
+        if result is out and total is not None and total > len(head):
+            self._truncated_containers += 1
+            out[ELIDED_KEY] = f"…(+{total - len(head)} keys)"
+        return result
+
+    def _get_repr(self) -> reprlib.Repr:
+        """Возвращает reprlib.Repr, ограниченный лимитами обходчика."""
+        if self._repr is None:
+            self._repr = reprlib.Repr()
+            self._repr.maxlevel = 1
+            self._repr.maxstring = self._max_length
+            self._repr.maxother = self._max_length
+        return self._repr
+
+    def _render_collection(self, data: Any) -> str:
+        """Строит ограниченное строковое представление множества или view словаря."""
+        repr_ = self._get_repr()
+        parts = [repr_.repr(item) for item in islice(data, self._max_vector_elements)]
+        elided = len(data) - len(parts)
+        if elided > 0:
+            self._truncated_containers += 1
+            parts.append(f"…(+{elided} items)")
+        return "{" + ", ".join(parts) + "}"
+
+    def _enter(
+        self,
+        data: Any,
+        depth: int,
+        stack: List[_Task],
+        out: Any,
+        children: Iterable[Tuple[Any, Any]],
+    ) -> Any:
+        """Регистрирует контейнер и добавляет его элементы в стек обхода."""
+        if depth >= self._max_depth:
+            return MAX_DEPTH_PLACEHOLDER
+
+        obj_id = id(data)
+        if obj_id in self._active:
+            return CYCLE_PLACEHOLDER
+        self._active.add(obj_id)
+        # Задача выхода удерживает ссылку на контейнер, чтобы его id не переиспользовался
+        stack.append((_EXIT, obj_id, data, depth))
+
+        # Элементы добавляются в обратном порядке, чтобы обход шел по порядку
+        for key, value in reversed(list(children)):
+            stack.append((out, key, value, depth + 1))
+        return out
+
+    def _emit_str(self, value: str, counted: bool = False) -> str:
+        """
+        Обрезает строку с учетом оставшегося бюджета длины.
+
+        counted=True означает, что входная длина уже учтена (строка получена
+        из префикса буфера bytes).
+        """
+        if not counted:
+            self._input_length += len(value)
+        remaining = self._max_total_length - self._total_length
+        if remaining <= 0:
+            self._budget_exhausted += 1
+            return BUDGET_PLACEHOLDER
+        if self._plain_head:
+            result = _truncate_str(value, min(self._max_length, remaining))
+            size = len(result)
+        else:
+            result, size = self._shorten(value, min(self._max_length, remaining))
+        if result is not value:
+            self._truncated_strings += 1
+        self._total_length += size
+        return result
+
+    def _shorten(self, value: str, limit: int) -> Tuple[str, int]:
+        """
+        Обрезает строку по стратегии string_strategy в единицах length_unit.
+
+        Маркер ELISION_MARKER и отпечаток входят в limit: сохраняемая часть
+        строки обрезается до остатка. Если отпечаток не помещается в limit, он
+        опускается, а если не помещается и маркер — остается только часть строки.
+
+        Returns:
+            Строка (тот же объект, если она укладывается в limit) и ее длина
+            в единицах
+        """
+        unit = self._unit or _CHARS
+        strategy = self._string_strategy
+        if strategy == "tail":
+            kept, size = unit.cut_tail(value, limit)
+        else:
+            kept, size = unit.cut(value, limit)
+        if kept is value:
+            return value, size
+
+        marker = ELISION_MARKER
+        reserved = self._suffix_size
+        fingerprint = _fingerprint(value) if self._fingerprint else ""
+        if fingerprint:
+            fingerprint_size = unit.measure(fingerprint)
+            if reserved + fingerprint_size <= limit:
+                reserved += fingerprint_size
+            else:
+                fingerprint = ""
+        if reserved > limit:
+            marker, reserved = "", 0
+        budget = limit - reserved
+
+        if strategy == "tail":
+            tail, size = unit.cut_tail(value, budget)
+            result = marker + tail
+        elif strategy == "head_tail":
+            # Начало получает большую половину лимита; оно выбирается из уже найденного префикса
+            head, size = unit.cut(kept, budget - budget // 2)
+            tail, tail_size = unit.cut_tail(value, budget // 2)
+            result = head + marker + tail
+            size += tail_size
+        else:
+            head, size = unit.cut(kept, budget)
+            result = head + marker
+        return result + fingerprint, size + reserved
 
 
 def serialize_for_tracing(
     data: Any,
     max_length: int = DEFAULT_MAX_LENGTH,
     max_vector_elements: int = DEFAULT_MAX_VECTOR_ELEMENTS,
+    max_depth: int = DEFAULT_MAX_DEPTH,
+    max_nodes: int = DEFAULT_MAX_NODES,
+    max_total_length: int = DEFAULT_MAX_TOTAL_LENGTH,
+    document_metadata_keys: Optional[Sequence[str]] = None,
+    dedupe_documents: bool = False,
+    length_unit: str = "chars",
+    tokenizer: str = "approx",
+    string_strategy: str = "head",
+    fingerprint: bool = False,
 ) -> Any:
     """
     Сериализует данные для трейсинга, безопасно обрезая большие значения.
 
     Автоматически определяет тип данных и применяет соответствующую обрезку:
-    - Строки обрезаются до max_length
+    - Строки обрезаются до max_length символов, байт UTF-8 или токенов с
+      сохранением начала, конца или начала и конца
     - Векторы обрезаются до max_vector_elements
-    - Списки и словари обрабатываются рекурсивно
+    - Массивы NumPy/torch обрезаются по каждой оси с сохранением shape и dtype
+    - Списки и словари обходятся итеративно до глубины max_depth
     - Pydantic модели конвертируются в словари
+    - У Document остаются выбранные ключи метаданных, повторы содержимого
+      заменяются ссылкой на первое вхождение (если включено)
+    - Циклические ссылки заменяются заглушкой
+    - После max_nodes узлов или max_total_length символов остаток опускается
 
     Args:
         data: Данные для сериализации
         max_length: Максимальная длина строки
         max_vector_elements: Максимальное количество элементов вектора/списка
+        max_depth: Максимальная глубина вложенности контейнеров
+        max_nodes: Максимальное количество посещенных узлов
+        max_total_length: Максимальная суммарная длина строк в результате
+        document_metadata_keys: Ключи метаданных Document, которые нужно сохранить
+            (None — все)
+        dedupe_documents: Заменять повторяющееся содержимое Document ссылкой
+        length_unit: Единица max_length и max_total_length: "chars", "bytes"
+            (UTF-8) или "tokens"
+        tokenizer: Токенизатор для length_unit="tokens" (см. get_tokenizer)
+        string_strategy: Какую часть длинной строки сохранить: "head", "tail"
+            или "head_tail"
+        fingerprint: Добавлять к обрезанной строке исходную длину и хеш
+            содержимого
 
     Returns:
         Сериализованные данные с примененной обрезкой
@@ -100,61 +830,15 @@ def serialize_for_tracing(
         >>> serialize_for_tracing([0.1, 0.2, 0.3] * 100, max_vector_elements=5)
         [0.1, 0.2, 0.3, 0.1, 0.2]
     """
-    if data is None:
-        return None
-
-    if isinstance(data, str):
-        return _truncate_str(data, max_length)
-
-    if isinstance(data, bytes):
-        return _truncate_str(data.decode(errors="replace"), max_length)
-
-    if isinstance(data, Document):
-        return {
-            "page_content": _truncate_str(data.page_content, max_length),
-            "metadata": serialize_for_tracing(
-                data.metadata, max_length, max_vector_elements
-            ),
-        }
-
-    if isinstance(data, Sequence) and not isinstance(data, (str, bytes)):
-        data_len = len(data)
-        # Специальная обработка векторов (list[float])
-        if data_len > 0 and _is_vector(data):
-            return _truncate_vector(data, max_elements=max_vector_elements)
-        # Обрезаем длинные списки
-        if data_len > max_vector_elements:
-            truncated = [
-                serialize_for_tracing(item, max_length, max_vector_elements)
-                for item in data[:max_vector_elements]
-            ]
-            return truncated
-        # Обычный список - рекурсивно обрабатываем элементы
-        return [
-            serialize_for_tracing(item, max_length, max_vector_elements)
-            for item in data
-        ]
-
-    # Обработка Pydantic BaseModel
-    if hasattr(data, "model_dump"):
-        # Pydantic v2
-        return serialize_for_tracing(data.model_dump(), max_length, max_vector_elements)
-    if hasattr(data, "dict"):
-        # Pydantic v1 или другие модели с методом dict()
-        return serialize_for_tracing(data.dict(), max_length, max_vector_elements)
-
-    if isinstance(data, Mapping):
-        # Обрезаем большие словари
-        items = list(data.items())
-        if len(items) > max_vector_elements:
-            items = items[:max_vector_elements]
-        return {
-            key: serialize_for_tracing(value, max_length, max_vector_elements)
-            for key, value in items
-        }
-
-    # fallback - просто обрезаем строковое представление
-    data_str = str(data)
-    if len(data_str) <= max_length:
-        return data_str
-    return data_str[:max_length] + "..."
+    return TracingSerializer(
+        max_length,
+        max_vector_elements,
+        max_depth,
+        max_nodes,
+        max_total_length,
+        document_metadata_keys=document_metadata_keys,
+        dedupe_documents=dedupe_documents,
+        length_unit=resolve_length_unit(length_unit, tokenizer),
+        string_strategy=string_strategy,
+        fingerprint=fingerprint,
+    ).serialize(data)
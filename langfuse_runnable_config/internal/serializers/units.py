@@ -0,0 +1,302 @@
+"""Единицы измерения длины строк для лимитов обрезки: байты UTF-8 и токены."""
+
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+# Единицы, в которых задаются max_length и max_total_length
+LENGTH_UNITS = frozenset({"chars", "bytes", "tokens"})
+
+# Приблизительный токенизатор: символов ASCII на один токен
+_APPROX_ASCII_CHARS_PER_TOKEN: int = 4
+
+
+class LengthUnit:
+    """
+    Единица измерения длины строки.
+
+    cut() и cut_tail() должны находить префикс и суффикс, не измеряя всю
+    строку, если она заметно длиннее лимита: обрезка выполняется в горячем
+    пути callback'ов.
+    """
+
+    name: str = "chars"
+
+    def measure(self, text: str) -> int:
+        """Возвращает длину строки в единицах."""
+        return len(text)
+
+    def max_chars(self, limit: int) -> Optional[int]:
+        """
+        Возвращает наибольшее количество символов в префиксе длиной limit единиц.
+
+        None означает, что оценки нет и строку нужно декодировать целиком.
+        """
+        return limit
+
+    def cut(self, text: str, limit: int) -> Tuple[str, int]:
+        """
+        Возвращает самый длинный префикс длиной не больше limit и его длину.
+
+        Строка, которая укладывается в лимит, возвращается тем же объектом.
+        """
+        if len(text) <= limit:
+            return text, len(text)
+        return text[:limit], limit
+
+    def cut_tail(self, text: str, limit: int) -> Tuple[str, int]:
+        """
+        Возвращает самый длинный суффикс длиной не больше limit и его длину.
+
+        Строка, которая укладывается в лимит, возвращается тем же объектом.
+        """
+        if len(text) <= limit:
+            return text, len(text)
+        if limit <= 0:
+            return "", 0
+        return text[-limit:], limit
+
+
+class Utf8Bytes(LengthUnit):
+    """Длина строки в байтах UTF-8."""
+
+    name = "bytes"
+
+    def max_chars(self, limit: int) -> Optional[int]:
+        # В символе не меньше одного байта
+        return limit
+
+    def measure(self, text: str) -> int:
+        if text.isascii():
+            return len(text)
+        return len(text.encode("utf-8"))
+
+    def cut(self, text: str, limit: int) -> Tuple[str, int]:
+        # В символе не меньше одного байта, поэтому кодируется не больше limit символов
+        prefix = text if len(text) <= limit else text[:limit]
+        if prefix.isascii():
+            return prefix, len(prefix)
+        data = prefix.encode("utf-8")
+        if len(data) <= limit:
+            return prefix, len(data)
+        # Обрезка по границе символа: неполный последний символ отбрасывается
+        result = data[:limit].decode("utf-8", errors="ignore")
+        return result, len(result.encode("utf-8"))
+
+    def cut_tail(self, text: str, limit: int) -> Tuple[str, int]:
+        if limit <= 0 and text:
+            return "", 0
+        suffix = text if len(text) <= limit else text[-limit:]
+        if suffix.isascii():
+            return suffix, len(suffix)
+        data = suffix.encode("utf-8")
+        if len(data) <= limit:
+            return suffix, len(data)
+        # Неполный первый символ отбрасывается
+        result = data[-limit:].decode("utf-8", errors="ignore")
+        return result, len(result.encode("utf-8"))
+
+
+class ApproxTokenizer(LengthUnit):
+    """
+    Быстрая оценка количества токенов без словаря.
+
+    Считает 4 символа ASCII за токен и каждый остальной символ (кириллица,
+    CJK, эмодзи) за отдельный токен, что близко к BPE-токенизаторам моделей
+    OpenAI и Anthropic и не занижает длину для не-ASCII текста.
+    """
+
+    name = "tokens"
+
+    def max_chars(self, limit: int) -> Optional[int]:
+        return limit * _APPROX_ASCII_CHARS_PER_TOKEN
+
+    def measure(self, text: str) -> int:
+        if text.isascii():
+            return -(-len(text) // _APPROX_ASCII_CHARS_PER_TOKEN)
+        ascii_chars = len(text.encode("ascii", errors="ignore"))
+        return -(-ascii_chars // _APPROX_ASCII_CHARS_PER_TOKEN) + len(text) - ascii_chars
+
+    def cut(self, text: str, limit: int) -> Tuple[str, int]:
+        # Токенов не больше, чем символов, и не меньше четверти символов
+        if len(text) <= limit:
+            return text, self.measure(text)
+        bound = limit * _APPROX_ASCII_CHARS_PER_TOKEN
+        prefix = text if len(text) <= bound else text[:bound]
+        if prefix.isascii():
+            return prefix, self.measure(prefix)
+        low, high = limit, len(prefix)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.measure(prefix[:middle]) <= limit:
+                low = middle
+            else:
+                high = middle - 1
+        result = prefix if low == len(prefix) else prefix[:low]
+        return result, self.measure(result)
+
+    def cut_tail(self, text: str, limit: int) -> Tuple[str, int]:
+        if len(text) <= limit:
+            return text, self.measure(text)
+        if limit <= 0:
+            return "", 0
+        bound = limit * _APPROX_ASCII_CHARS_PER_TOKEN
+        suffix = text if len(text) <= bound else text[-bound:]
+        if suffix.isascii():
+            return suffix, self.measure(suffix)
+        low, high = limit, len(suffix)
+        while low < high:
+            middle = (low + high + 1) // 2
+            if self.measure(suffix[-middle:]) <= limit:
+                low = middle
+            else:
+                high = middle - 1
+        result = suffix if low == len(suffix) else suffix[-low:]
+        return result, self.measure(result)
+
+
+class EncodingTokenizer(LengthUnit):
+    """
+    Точный токенизатор поверх encode()/decode() (например, tiktoken).
+
+    Кодируется только префикс (или суффикс) строки: он увеличивается вдвое,
+    пока в нем не наберется больше limit токенов или пока он не станет всей
+    строкой. Неполный символ на границе обрезки отбрасывается.
+    """
+
+    name = "tokens"
+
+    # Начальная оценка количества символов на токен для длины префикса
+    chars_per_token: int = 8
+
+    def __init__(self, encoding: Any) -> None:
+        """
+        Создает токенизатор.
+
+        Args:
+            encoding: Объект с методами encode(str) -> список токенов и
+                decode(список токенов) -> str
+        """
+        self._encoding = encoding
+
+    def max_chars(self, limit: int) -> Optional[int]:
+        # Токен словаря может содержать сколько угодно символов
+        return None
+
+    def measure(self, text: str) -> int:
+        return len(self._encoding.encode(text))
+
+    def cut(self, text: str, limit: int) -> Tuple[str, int]:
+        size = max(limit, 1) * self.chars_per_token
+        while True:
+            prefix = text if len(text) <= size else text[:size]
+            tokens = self._encoding.encode(prefix)
+            if len(tokens) > limit:
+                result = self._encoding.decode(tokens[:limit]).rstrip("\ufffd")
+                return result, len(self._encoding.encode(result))
+            if prefix is text:
+                return text, len(tokens)
+            size *= 2
+
+    def cut_tail(self, text: str, limit: int) -> Tuple[str, int]:
+        if limit <= 0 and text:
+            return "", 0
+        size = limit * self.chars_per_token
+        while True:
+            suffix = text if len(text) <= size else text[-size:]
+            tokens = self._encoding.encode(suffix)
+            if len(tokens) > limit:
+                result = self._encoding.decode(tokens[-limit:]).lstrip("\ufffd")
+                return result, len(self._encoding.encode(result))
+            if suffix is text:
+                return text, len(tokens)
+            size *= 2
+
+
+class TiktokenTokenizer(EncodingTokenizer):
+    """Точный подсчет токенов кодировкой tiktoken."""
+
+    def __init__(self, encoding_name: str = "cl100k_base") -> None:
+        """
+        Загружает кодировку tiktoken.
+
+        Args:
+            encoding_name: Имя кодировки tiktoken
+
+        Raises:
+            ImportError: Если tiktoken не установлен
+        """
+        try:
+            import tiktoken
+        except ImportError as exc:
+            raise ImportError(
+                "Для TiktokenTokenizer нужен tiktoken: "
+                "pip install langfuse-runnable-config[tiktoken]"
+            ) from exc
+        super().__init__(tiktoken.get_encoding(encoding_name))
+
+
+_UTF8_BYTES = Utf8Bytes()
+_tokenizers: Dict[str, LengthUnit] = {"approx": ApproxTokenizer()}
+_tokenizers_lock = threading.Lock()
+
+
+def register_tokenizer(name: str, tokenizer: LengthUnit) -> None:
+    """
+    Регистрирует токенизатор для лимитов в токенах.
+
+    Args:
+        name: Имя для настройки truncate_tokenizer
+        tokenizer: Токенизатор (например, EncodingTokenizer или TiktokenTokenizer)
+    """
+    with _tokenizers_lock:
+        _tokenizers[name] = tokenizer
+
+
+def get_tokenizer(name: str) -> LengthUnit:
+    """
+    Возвращает зарегистрированный токенизатор.
+
+    Имена вида "tiktoken:<кодировка>" регистрируются автоматически при
+    первом обращении.
+
+    Args:
+        name: Имя токенизатора ("approx" — встроенный приблизительный)
+
+    Returns:
+        Токенизатор
+
+    Raises:
+        ValueError: Если токенизатор с таким именем не зарегистрирован
+    """
+    tokenizer = _tokenizers.get(name)
+    if tokenizer is not None:
+        return tokenizer
+    if name.startswith("tiktoken:"):
+        with _tokenizers_lock:
+            if name not in _tokenizers:
+                _tokenizers[name] = TiktokenTokenizer(name.split(":", 1)[1])
+            return _tokenizers[name]
+    raise ValueError(f"Неизвестный токенизатор: {name!r}")
+
+
+def resolve_length_unit(unit: str, tokenizer: str = "approx") -> Optional[LengthUnit]:
+    """
+    Возвращает единицу измерения длины для лимитов обрезки.
+
+    Args:
+        unit: "chars", "bytes" или "tokens"
+        tokenizer: Имя токенизатора для unit="tokens" (см. get_tokenizer)
+
+    Returns:
+        Единица измерения или None для символов (быстрый путь без измерений)
+
+    Raises:
+        ValueError: Если единица или токенизатор неизвестны
+    """
+    if unit not in LENGTH_UNITS:
+        raise ValueError(f"Неизвестная единица длины: {unit!r}")
+    if unit == "chars":
+        return None
+    if unit == "bytes":
+        return _UTF8_BYTES
+    return get_tokenizer(tokenizer)
@@ -2,27 +2,16 @@
 
 from abc import ABC, abstractmethod
 
-from langchain_core.runnables.config import RunnableConfig
-
 from langfuse_runnable_config.settings import LangfuseSettings
 from langfuse_runnable_config.internal.handlers.factory import create_handler
+from langfuse_runnable_config.internal.transport import (
+    get_http_client_pool,
+    get_langfuse_client_registry,
+)
 
 
 class LangfuseStrategy(ABC):
-    """Базовый класс для стратегий создания конфигурации Langfuse."""
-
-    @abstractmethod
-    def create_config(self, settings: LangfuseSettings) -> RunnableConfig:
-        """
-        Создает RunnableConfig с обработчиком Langfuse.
-
-        Args:
-            settings: Настройки Langfuse
-
-        Returns:
-            RunnableConfig с настроенным callback'ом
-        """
-        pass
+    """Базовый класс для стратегий создания обработчика Langfuse."""
 
     @abstractmethod
     def create_callback(self, settings: LangfuseSettings):
@@ -41,41 +30,30 @@ class LangfuseStrategy(ABC):
 class LangfuseV2Strategy(LangfuseStrategy):
     """Стратегия для Langfuse v2."""
 
-    def create_config(self, settings: LangfuseSettings) -> RunnableConfig:
-        """Создает конфигурацию для Langfuse v2."""
-        handler = self.create_callback(settings)
-        return RunnableConfig(callbacks=[handler])
-
     def create_callback(self, settings: LangfuseSettings):
         """Создает чистый callback для Langfuse v2."""
-        import httpx
-
         return create_handler(
+            langfuse_version=2,
             host=settings.url,
             public_key=settings.public_key,
             secret_key=settings.secret_key,
             debug=settings.debug,
-            httpx_client=httpx.Client(verify=False),
+            httpx_client=get_http_client_pool().get_client(settings),
         )
 
 
 class LangfuseV3Strategy(LangfuseStrategy):
     """Стратегия для Langfuse v3 и выше."""
 
-    def create_config(self, settings: LangfuseSettings) -> RunnableConfig:
-        """Создает конфигурацию для Langfuse v3+."""
-        handler = self.create_callback(settings)
-        return RunnableConfig(callbacks=[handler])
-
     def create_callback(self, settings: LangfuseSettings):
-        """Создает чистый callback для Langfuse v3+."""
-        import os
+        """Создает чистый callback для Langfuse v3+, привязанный к клиенту проекта."""
+        get_langfuse_client_registry().get_client(settings)
+        return create_handler(langfuse_version=3, public_key=settings.public_key)
 
-        os.environ["LANGFUSE_PUBLIC_KEY"] = settings.public_key
-        os.environ["LANGFUSE_SECRET_KEY"] = settings.secret_key
-        os.environ["LANGFUSE_BASE_URL"] = settings.url
 
-        return create_handler()
+# Стратегии не хранят состояние, поэтому создаются один раз на процесс
+_V2_STRATEGY = LangfuseV2Strategy()
+_V3_STRATEGY = LangfuseV3Strategy()
 
 
 def get_strategy(version: int) -> LangfuseStrategy:
@@ -89,5 +67,5 @@ def get_strategy(version: int) -> LangfuseStrategy:
         Стратегия для создания конфигурации
     """
     if version == 2:
-        return LangfuseV2Strategy()
-    return LangfuseV3Strategy()
+        return _V2_STRATEGY
+    return _V3_STRATEGY
@@ -2,28 +2,17 @@
 
 from abc import ABC, abstractmethod
 
-from langchain_core.runnables.config import RunnableConfig
-
 from langfuse_runnable_config.settings import LangfuseTruncatingSettings
 from langfuse_runnable_config.internal.handlers.factory import create_truncating_handler
+from langfuse_runnable_config.internal.transport import (
+    get_http_client_pool,
+    get_langfuse_client_registry,
+)
 
 
 class LangfuseTruncatingStrategy(ABC):
     """Базовый класс для стратегий с обрезкой данных."""
 
-    @abstractmethod
-    def create_config(self, settings: LangfuseTruncatingSettings) -> RunnableConfig:
-        """
-        Создает RunnableConfig с обработчиком Langfuse с обрезкой.
-
-        Args:
-            settings: Настройки Langfuse с параметрами обрезки
-
-        Returns:
-            RunnableConfig с настроенным callback'ом
-        """
-        pass
-
     @abstractmethod
     def create_callback(self, settings: LangfuseTruncatingSettings):
         """
@@ -41,48 +30,81 @@ class LangfuseTruncatingStrategy(ABC):
 class LangfuseV2TruncatingStrategy(LangfuseTruncatingStrategy):
     """Стратегия для Langfuse v2 с обрезкой данных."""
 
-    def create_config(self, settings: LangfuseTruncatingSettings) -> RunnableConfig:
-        """Создает конфигурацию для Langfuse v2 с обрезкой."""
-        handler = self.create_callback(settings)
-        return RunnableConfig(callbacks=[handler])
-
     def create_callback(self, settings: LangfuseTruncatingSettings):
         """Создает чистый callback для Langfuse v2 с обрезкой."""
-        import httpx
-
         return create_truncating_handler(
             max_length=settings.truncate_max_length,
             max_vector_elements=settings.truncate_max_vector_elements,
+            max_depth=settings.truncate_max_depth,
+            max_nodes=settings.truncate_max_nodes,
+            max_total_length=settings.truncate_max_total_length,
+            event_limits=settings.truncate_event_limits,
+            offload=settings.truncate_offload,
+            offload_queue_size=settings.truncate_offload_queue_size,
+            offload_policy=settings.truncate_offload_policy,
+            adaptive=settings.truncate_adaptive,
+            adaptive_min_length=settings.truncate_adaptive_min_length,
+            adaptive_min_vector_elements=settings.truncate_adaptive_min_vector_elements,
+            adaptive_target_ms=settings.truncate_adaptive_target_ms,
+            adaptive_target_queue_length=settings.truncate_adaptive_target_queue_length,
+            memo=settings.truncate_memo,
+            memo_size=settings.truncate_memo_size,
+            document_metadata_keys=settings.truncate_document_metadata_keys,
+            dedupe_documents=settings.truncate_document_dedup,
+            length_unit=settings.truncate_length_unit,
+            tokenizer=settings.truncate_tokenizer,
+            string_strategy=settings.truncate_string_strategy,
+            fingerprint=settings.truncate_fingerprint,
+            langfuse_version=2,
             host=settings.url,
             public_key=settings.public_key,
             secret_key=settings.secret_key,
             debug=settings.debug,
-            httpx_client=httpx.Client(verify=False),
+            httpx_client=get_http_client_pool().get_client(settings),
+            client_settings=settings,
         )
 
 
 class LangfuseV3TruncatingStrategy(LangfuseTruncatingStrategy):
     """Стратегия для Langfuse v3+ с обрезкой данных."""
 
-    def create_config(self, settings: LangfuseTruncatingSettings) -> RunnableConfig:
-        """Создает конфигурацию для Langfuse v3+ с обрезкой."""
-        handler = self.create_callback(settings)
-        return RunnableConfig(callbacks=[handler])
-
     def create_callback(self, settings: LangfuseTruncatingSettings):
-        """Создает чистый callback для Langfuse v3+ с обрезкой."""
-        import os
-
-        os.environ["LANGFUSE_PUBLIC_KEY"] = settings.public_key
-        os.environ["LANGFUSE_SECRET_KEY"] = settings.secret_key
-        os.environ["LANGFUSE_BASE_URL"] = settings.url
-
+        """Создает чистый callback для Langfuse v3+ с обрезкой, привязанный к клиенту проекта."""
+        get_langfuse_client_registry().get_client(settings)
         return create_truncating_handler(
             max_length=settings.truncate_max_length,
             max_vector_elements=settings.truncate_max_vector_elements,
+            max_depth=settings.truncate_max_depth,
+            max_nodes=settings.truncate_max_nodes,
+            max_total_length=settings.truncate_max_total_length,
+            event_limits=settings.truncate_event_limits,
+            offload=settings.truncate_offload,
+            offload_queue_size=settings.truncate_offload_queue_size,
+            offload_policy=settings.truncate_offload_policy,
+            adaptive=settings.truncate_adaptive,
+            adaptive_min_length=settings.truncate_adaptive_min_length,
+            adaptive_min_vector_elements=settings.truncate_adaptive_min_vector_elements,
+            adaptive_target_ms=settings.truncate_adaptive_target_ms,
+            adaptive_target_queue_length=settings.truncate_adaptive_target_queue_length,
+            memo=settings.truncate_memo,
+            memo_size=settings.truncate_memo_size,
+            document_metadata_keys=settings.truncate_document_metadata_keys,
+            dedupe_documents=settings.truncate_document_dedup,
+            length_unit=settings.truncate_length_unit,
+            tokenizer=settings.truncate_tokenizer,
+            string_strategy=settings.truncate_string_strategy,
+            fingerprint=settings.truncate_fingerprint,
+            langfuse_version=3,
+            public_key=settings.public_key,
+            client_settings=settings,
         )
 
 
+# Стратегии не хранят состояние, поэтому создаются один раз на процесс
+_V2_STRATEGY = LangfuseV2TruncatingStrategy()
+_V3_STRATEGY = LangfuseV3TruncatingStrategy()
+
+
 def get_truncating_strategy(version: int) -> LangfuseTruncatingStrategy:
     """
     Возвращает стратегию с обрезкой для указанной версии Langfuse.
@@ -94,5 +116,5 @@ def get_truncating_strategy(version: int) -> LangfuseTruncatingStrategy:
         Стратегия для создания конфигурации с обрезкой
     """
     if version == 2:
-        return LangfuseV2TruncatingStrategy()
-    return LangfuseV3TruncatingStrategy()
+        return _V2_STRATEGY
+    return _V3_STRATEGY
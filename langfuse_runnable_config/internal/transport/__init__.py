@@ -0,0 +1,17 @@
+"""HTTP-транспорт и клиенты для обработчиков Langfuse."""
+
+from langfuse_runnable_config.internal.transport.clients import (
+    LangfuseClientRegistry,
+    get_langfuse_client_registry,
+)
+from langfuse_runnable_config.internal.transport.pool import (
+    HttpClientPool,
+    get_http_client_pool,
+)
+
+__all__ = [
+    "HttpClientPool",
+    "LangfuseClientRegistry",
+    "get_http_client_pool",
+    "get_langfuse_client_registry",
+]
@@ -0,0 +1,110 @@
+"""Реестр клиентов Langfuse v3+ по проектам."""
+
+import inspect
+import logging
+import threading
+from typing import Any, Dict, List, Tuple, Union
+
+from langfuse_runnable_config.settings import LangfuseSettings, LangfuseTruncatingSettings
+
+logger = logging.getLogger(__name__)
+
+
+class LangfuseClientRegistry:
+    """
+    Потокобезопасный реестр клиентов Langfuse v3+, по одному на проект.
+
+    Клиент создается явно из настроек, без записи ключей в os.environ, а
+    CallbackHandler привязывается к нему через public_key. SDK хранит клиентов
+    по public_key, поэтому и реестр использует его как ключ.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[str, Tuple[Any, Tuple[str, str]]] = {}
+        self._lock = threading.Lock()
+
+    def get_client(self, settings: Union[LangfuseSettings, LangfuseTruncatingSettings]) -> Any:
+        """
+        Возвращает клиент проекта, создавая его при первом обращении.
+
+        Args:
+            settings: Настройки Langfuse
+
+        Returns:
+            langfuse.Langfuse, зарегистрированный в SDK под settings.public_key
+        """
+        entry = self._clients.get(settings.public_key)
+        if entry is None:
+            with self._lock:
+                entry = self._clients.get(settings.public_key)
+                if entry is None:
+                    entry = (self._create_client(settings), (settings.secret_key, settings.url))
+                    self._clients[settings.public_key] = entry
+
+        client, (secret_key, url) = entry
+        if (secret_key, url) != (settings.secret_key, settings.url):
+            logger.warning(
+                f"⚠️ Клиент Langfuse для public_key {settings.public_key} уже создан "
+                f"с другими secret_key или url — используется существующий клиент"
+            )
+        return client
+
+    def clients(self) -> List[Any]:
+        """Возвращает снимок созданных клиентов."""
+        with self._lock:
+            return [client for client, _ in self._clients.values()]
+
+    def clear(self) -> None:
+        """Сбрасывает буферы клиентов и очищает реестр."""
+        with self._lock:
+            clients = [client for client, _ in self._clients.values()]
+            self._clients.clear()
+        for client in clients:
+            try:
+                client.flush()
+            except Exception as e:
+                logger.debug(f"Не удалось сбросить буфер клиента Langfuse: {e}")
+
+    def reset_after_fork(self) -> None:
+        """
+        Забывает клиенты, унаследованные дочерним процессом после fork().
+
+        Следующий get_client() создаст клиент в дочернем процессе; состояние
+        самого SDK (экспорт спанов OpenTelemetry) восстанавливается SDK.
+        """
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _create_client(settings: Any) -> Any:
+        """
+        Создает клиент Langfuse v3+ с параметрами проекта.
+
+        Новые версии SDK предпочитают переменную окружения LANGFUSE_BASE_URL
+        аргументу host, поэтому url передается как base_url, если SDK его принимает.
+        """
+        from langfuse import Langfuse  # type: ignore[import-untyped]
+
+        url_argument = "base_url" if _accepts_base_url(Langfuse) else "host"
+        return Langfuse(
+            public_key=settings.public_key,
+            secret_key=settings.secret_key,
+            debug=settings.debug,
+            **{url_argument: settings.url},
+        )
+
+
+def _accepts_base_url(client_class: type) -> bool:
+    """Проверяет, что конструктор клиента Langfuse явно принимает base_url."""
+    try:
+        return "base_url" in inspect.signature(client_class).parameters
+    except (TypeError, ValueError):
+        return False
+
+
+_langfuse_client_registry = LangfuseClientRegistry()
+
+
+def get_langfuse_client_registry() -> LangfuseClientRegistry:
+    """Возвращает общий для процесса реестр клиентов Langfuse v3+."""
+    return _langfuse_client_registry
@@ -0,0 +1,115 @@
+"""Общий пул HTTP-клиентов для обработчиков Langfuse v2."""
+
+import atexit
+import logging
+import threading
+from typing import Any, Dict, Hashable, Union
+from urllib.parse import urlsplit
+
+from langfuse_runnable_config.settings import LangfuseSettings, LangfuseTruncatingSettings
+
+logger = logging.getLogger(__name__)
+
+
+class HttpClientPool:
+    """
+    Потокобезопасный реестр httpx.Client, разделяемых обработчиками одного хоста.
+
+    Обработчики с одинаковым хостом и параметрами пула используют один клиент,
+    а значит и общие keep-alive соединения вместо собственного TCP+TLS на каждый.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[Hashable, Any] = {}
+        self._lock = threading.Lock()
+        self._atexit_registered = False
+
+    def get_client(self, settings: Union[LangfuseSettings, LangfuseTruncatingSettings]) -> Any:
+        """
+        Возвращает общий клиент для хоста и параметров пула из настроек.
+
+        Args:
+            settings: Настройки Langfuse
+
+        Returns:
+            httpx.Client, разделяемый обработчиками с тем же ключом
+        """
+        key = self._make_key(settings)
+        client = self._clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._clients.get(key)
+            if client is None:
+                client = self._create_client(settings)
+                self._clients[key] = client
+                if not self._atexit_registered:
+                    atexit.register(self.close)
+                    self._atexit_registered = True
+            return client
+
+    def close(self) -> None:
+        """Закрывает все клиенты пула."""
+        with self._lock:
+            clients = list(self._clients.values())
+            self._clients.clear()
+        for client in clients:
+            try:
+                client.close()
+            except Exception as e:
+                logger.debug(f"Не удалось закрыть HTTP-клиент: {e}")
+
+    def reset_after_fork(self) -> None:
+        """
+        Забывает клиенты, унаследованные дочерним процессом после fork().
+
+        Клиенты не закрываются: их keep-alive соединения разделяются с
+        родительским процессом и остаются за ним.
+        """
+        self._clients = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _make_key(settings: Any) -> Hashable:
+        """Строит ключ пула из хоста и параметров соединений."""
+        parts = urlsplit(settings.url)
+        return (
+            parts.scheme,
+            parts.netloc,
+            settings.http_max_connections,
+            settings.http_max_keepalive_connections,
+            settings.http_keepalive_expiry,
+            settings.http2,
+            settings.http_timeout,
+        )
+
+    @staticmethod
+    def _create_client(settings: Any) -> Any:
+        """Создает httpx.Client с параметрами пула из настроек."""
+        import httpx
+
+        limits = httpx.Limits(
+            max_connections=settings.http_max_connections,
+            max_keepalive_connections=settings.http_max_keepalive_connections,
+            keepalive_expiry=settings.http_keepalive_expiry,
+        )
+        timeout = httpx.Timeout(settings.http_timeout)
+        try:
+            return httpx.Client(
+                verify=False, limits=limits, timeout=timeout, http2=settings.http2
+            )
+        except ImportError as e:
+            logger.warning(
+                f"⚠️ HTTP/2 недоступен — используется HTTP/1.1. "
+                f"Установите: pip install httpx[http2]. Ошибка: {e}"
+            )
+            return httpx.Client(verify=False, limits=limits, timeout=timeout)
+
+
+_http_client_pool = HttpClientPool()
+
+
+def get_http_client_pool() -> HttpClientPool:
+    """Возвращает общий для процесса пул HTTP-клиентов."""
+    return _http_client_pool
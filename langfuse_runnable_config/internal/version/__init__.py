@@ -1,5 +1,15 @@
 """Определение версии установленного Langfuse."""
 
-from langfuse_runnable_config.internal.version.detector import detect_langfuse_version
+from langfuse_runnable_config.internal.version.detector import (
+    detect_langfuse_version,
+    peek_langfuse_version,
+    reset_detector_after_fork,
+    reset_langfuse_version_cache,
+)
 
-__all__ = ["detect_langfuse_version"]
+__all__ = [
+    "detect_langfuse_version",
+    "peek_langfuse_version",
+    "reset_detector_after_fork",
+    "reset_langfuse_version_cache",
+]
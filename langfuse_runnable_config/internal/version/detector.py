@@ -1,6 +1,8 @@
 """Определение версии установленного Langfuse."""
 
 import logging
+import os
+import threading
 from typing import Optional
 
 logger = logging.getLogger(__name__)
@@ -9,17 +11,79 @@ logger = logging.getLogger(__name__)
 SUPPORTED_VERSIONS = frozenset({2, 3})
 TESTED_VERSIONS = frozenset({2, 3})
 
+# Переменная окружения для явного указания мажорной версии
+MAJOR_VERSION_ENV = "LANGFUSE_MAJOR_VERSION"
+
+_detected_version: Optional[int] = None
+# Версия из LANGFUSE_MAJOR_VERSION, проверенная при первом обращении
+_env_version: Optional[int] = None
+_env_checked = False
+_detect_lock = threading.Lock()
+
 
 def detect_langfuse_version() -> int:
     """
     Определяет мажорную версию установленного Langfuse.
 
+    Версия определяется один раз за процесс и кэшируется. Переменная окружения
+    LANGFUSE_MAJOR_VERSION имеет приоритет над определением по пакету; она тоже
+    читается и проверяется один раз до reset_langfuse_version_cache().
+
     Returns:
         Мажорную версию Langfuse (2, 3, 4, ...)
 
     Raises:
         ImportError: Если Langfuse не установлен
     """
+    global _detected_version
+
+    version = _detect_from_env()
+    if version is not None:
+        return version
+
+    version = _detected_version
+    if version is not None:
+        return version
+
+    with _detect_lock:
+        if _detected_version is None:
+            _detected_version = _probe_langfuse_version()
+        return _detected_version
+
+
+def peek_langfuse_version() -> Optional[int]:
+    """
+    Возвращает уже известную версию Langfuse без импорта пакета.
+
+    Returns:
+        Версию из LANGFUSE_MAJOR_VERSION или закэшированную версию; None, если
+        версия еще не определялась
+    """
+    version = _detect_from_env()
+    if version is not None:
+        return version
+    return _detected_version
+
+
+def reset_detector_after_fork() -> None:
+    """Заменяет блокировку определения версии после fork(); версия сохраняется."""
+    global _detect_lock
+
+    _detect_lock = threading.Lock()
+
+
+def reset_langfuse_version_cache() -> None:
+    """Сбрасывает закэшированные версию Langfuse и LANGFUSE_MAJOR_VERSION (для тестов)."""
+    global _detected_version, _env_version, _env_checked
+
+    with _detect_lock:
+        _detected_version = None
+        _env_version = None
+        _env_checked = False
+
+
+def _probe_langfuse_version() -> int:
+    """Определяет версию по установленному пакету Langfuse."""
     version = _detect_from_metadata()
     if version is not None:
         _log_version_warning(version)
@@ -32,6 +96,32 @@ def detect_langfuse_version() -> int:
     raise ImportError("Langfuse не установлен. Установите его: pip install langfuse")
 
 
+def _detect_from_env() -> Optional[int]:
+    """Возвращает версию из LANGFUSE_MAJOR_VERSION, прочитанную при первом обращении."""
+    global _env_version, _env_checked
+
+    if _env_checked:
+        return _env_version
+
+    with _detect_lock:
+        if not _env_checked:
+            _env_version = _read_env_version()
+            _env_checked = True
+        return _env_version
+
+
+def _read_env_version() -> Optional[int]:
+    """Читает и проверяет переменную окружения LANGFUSE_MAJOR_VERSION."""
+    value = os.environ.get(MAJOR_VERSION_ENV)
+    if not value:
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        logger.warning(f"⚠️ Некорректное значение {MAJOR_VERSION_ENV}={value!r} — игнорируется.")
+        return None
+
+
 def _detect_from_metadata() -> Optional[int]:
     """Определяет версию из метаданных пакета."""
     try:
@@ -1,8 +1,17 @@
 """Простая настройка для Langfuse без обрезки данных."""
 
-from pydantic import Field
+from typing import Dict, Optional
+
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
+from langfuse_runnable_config.internal.constants import (
+    DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+    DEFAULT_HTTP_MAX_CONNECTIONS,
+    DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_HTTP_TIMEOUT,
+)
+
 
 class LangfuseSettings(BaseSettings):
     """
@@ -24,3 +33,43 @@ class LangfuseSettings(BaseSettings):
     public_key: str = Field(..., description="Публичный ключ Langfuse")
     secret_key: str = Field(..., description="Секретный ключ Langfuse")
     debug: bool = Field(default=False, description="Включить отладочный режим")
+    major_version: Optional[int] = Field(
+        default=None,
+        description="Мажорная версия Langfuse (по умолчанию определяется автоматически)",
+    )
+    sample_rate: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description="Доля запусков, отправляемых в Langfuse",
+    )
+    sample_rates: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Доля отправляемых запусков для имен запусков (run_name)",
+    )
+    http_max_connections: int = Field(
+        default=DEFAULT_HTTP_MAX_CONNECTIONS,
+        description="Максимальное количество HTTP-соединений в пуле (v2)",
+    )
+    http_max_keepalive_connections: int = Field(
+        default=DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        description="Максимальное количество keep-alive соединений в пуле (v2)",
+    )
+    http_keepalive_expiry: float = Field(
+        default=DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+        description="Время жизни простаивающего соединения в секундах (v2)",
+    )
+    http2: bool = Field(default=False, description="Использовать HTTP/2 (v2, требуется h2)")
+    http_timeout: float = Field(
+        default=DEFAULT_HTTP_TIMEOUT,
+        description="Таймаут HTTP-запросов в секундах (v2)",
+    )
+
+    @field_validator("sample_rates")
+    @classmethod
+    def _check_sample_rates(cls, value: Dict[str, float]) -> Dict[str, float]:
+        """Проверяет, что доли выборки для имен запусков лежат в [0, 1]."""
+        invalid = {name: rate for name, rate in value.items() if not 0.0 <= rate <= 1.0}
+        if invalid:
+            raise ValueError(f"Доли выборки должны быть в диапазоне [0, 1]: {invalid}")
+        return value
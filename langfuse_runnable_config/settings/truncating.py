@@ -1,11 +1,26 @@
 """Настройка для Langfuse с автоматической обрезкой данных."""
 
-from pydantic import Field
+from typing import Dict, List, Literal, Optional
+
+from pydantic import Field, field_validator
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
 from langfuse_runnable_config.internal.constants import (
+    DEFAULT_ADAPTIVE_MIN_LENGTH,
+    DEFAULT_ADAPTIVE_MIN_VECTOR_ELEMENTS,
+    DEFAULT_ADAPTIVE_TARGET_MS,
+    DEFAULT_ADAPTIVE_TARGET_QUEUE_LENGTH,
+    DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+    DEFAULT_HTTP_MAX_CONNECTIONS,
+    DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+    DEFAULT_HTTP_TIMEOUT,
+    DEFAULT_MAX_DEPTH,
     DEFAULT_MAX_LENGTH,
+    DEFAULT_MAX_NODES,
+    DEFAULT_MAX_TOTAL_LENGTH,
     DEFAULT_MAX_VECTOR_ELEMENTS,
+    DEFAULT_MEMO_SIZE,
+    DEFAULT_OFFLOAD_QUEUE_SIZE,
 )
 
 
@@ -28,11 +43,140 @@ class LangfuseTruncatingSettings(BaseSettings):
     public_key: str = Field(..., description="Публичный ключ Langfuse")
     secret_key: str = Field(..., description="Секретный ключ Langfuse")
     debug: bool = Field(default=False, description="Включить отладочный режим")
+    major_version: Optional[int] = Field(
+        default=None,
+        description="Мажорная версия Langfuse (по умолчанию определяется автоматически)",
+    )
+    sample_rate: float = Field(
+        default=1.0,
+        ge=0.0,
+        le=1.0,
+        description="Доля запусков, отправляемых в Langfuse",
+    )
+    sample_rates: Dict[str, float] = Field(
+        default_factory=dict,
+        description="Доля отправляемых запусков для имен запусков (run_name)",
+    )
     truncate_max_length: int = Field(
         default=DEFAULT_MAX_LENGTH,
-        description="Максимальная длина строки перед обрезкой",
+        description="Максимальная длина строки перед обрезкой (см. truncate_length_unit)",
     )
     truncate_max_vector_elements: int = Field(
         default=DEFAULT_MAX_VECTOR_ELEMENTS,
         description="Максимальное количество элементов вектора",
     )
+    truncate_max_depth: int = Field(
+        default=DEFAULT_MAX_DEPTH,
+        description="Максимальная глубина вложенности данных",
+    )
+    truncate_max_nodes: int = Field(
+        default=DEFAULT_MAX_NODES,
+        description="Максимальное количество узлов данных в одном событии",
+    )
+    truncate_max_total_length: int = Field(
+        default=DEFAULT_MAX_TOTAL_LENGTH,
+        description="Максимальная суммарная длина строк в одном событии (см. truncate_length_unit)",
+    )
+    truncate_event_limits: Dict[str, Dict[str, int]] = Field(
+        default_factory=dict,
+        description=(
+            "Лимиты для типов событий (chain, retriever, llm, chat_model, tool, agent), "
+            'например {"llm": {"max_length": 2000}}'
+        ),
+    )
+    truncate_offload: bool = Field(
+        default=False,
+        description="Обрезать и отправлять события в фоновом потоке обработчика",
+    )
+    truncate_offload_queue_size: int = Field(
+        default=DEFAULT_OFFLOAD_QUEUE_SIZE,
+        description="Максимальное количество событий в очереди фонового потока",
+    )
+    truncate_offload_policy: Literal["drop", "block", "degrade"] = Field(
+        default="degrade",
+        description="Поведение при переполненной очереди: drop, block или degrade",
+    )
+    truncate_adaptive: bool = Field(
+        default=False,
+        description="Уменьшать лимиты обрезки под нагрузкой",
+    )
+    truncate_adaptive_min_length: int = Field(
+        default=DEFAULT_ADAPTIVE_MIN_LENGTH,
+        description="Нижняя граница длины строки в адаптивном режиме",
+    )
+    truncate_adaptive_min_vector_elements: int = Field(
+        default=DEFAULT_ADAPTIVE_MIN_VECTOR_ELEMENTS,
+        description="Нижняя граница количества элементов вектора в адаптивном режиме",
+    )
+    truncate_adaptive_target_ms: float = Field(
+        default=DEFAULT_ADAPTIVE_TARGET_MS,
+        description="Целевое среднее время сериализации события в мс",
+    )
+    truncate_adaptive_target_queue_length: int = Field(
+        default=DEFAULT_ADAPTIVE_TARGET_QUEUE_LENGTH,
+        description=(
+            "Целевая суммарная длина строк неотправленных событий: очередь фонового "
+            "потока и очередь ингеста SDK v2 (очередь спанов v3+ не учитывается)"
+        ),
+    )
+    truncate_memo: bool = Field(
+        default=False,
+        description="Запоминать результаты обрезки объектов, повторяющихся в трейсе",
+    )
+    truncate_memo_size: int = Field(
+        default=DEFAULT_MEMO_SIZE,
+        description="Максимальное количество запомненных результатов обрезки",
+    )
+    truncate_document_metadata_keys: Optional[List[str]] = Field(
+        default=None,
+        description="Ключи метаданных Document, которые нужно сохранить (по умолчанию все)",
+    )
+    truncate_document_dedup: bool = Field(
+        default=False,
+        description="Заменять повторяющееся в событии содержимое Document ссылкой",
+    )
+    truncate_length_unit: Literal["chars", "bytes", "tokens"] = Field(
+        default="chars",
+        description="Единица truncate_max_length и truncate_max_total_length",
+    )
+    truncate_tokenizer: str = Field(
+        default="approx",
+        description=(
+            "Токенизатор для лимитов в токенах: approx, tiktoken:<кодировка> или имя, "
+            "зарегистрированное через register_tokenizer"
+        ),
+    )
+    truncate_string_strategy: Literal["head", "tail", "head_tail"] = Field(
+        default="head",
+        description="Какую часть длинной строки сохранять: начало, конец или начало и конец",
+    )
+    truncate_fingerprint: bool = Field(
+        default=False,
+        description="Добавлять к обрезанной строке исходную длину и хеш содержимого",
+    )
+    http_max_connections: int = Field(
+        default=DEFAULT_HTTP_MAX_CONNECTIONS,
+        description="Максимальное количество HTTP-соединений в пуле (v2)",
+    )
+    http_max_keepalive_connections: int = Field(
+        default=DEFAULT_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        description="Максимальное количество keep-alive соединений в пуле (v2)",
+    )
+    http_keepalive_expiry: float = Field(
+        default=DEFAULT_HTTP_KEEPALIVE_EXPIRY,
+        description="Время жизни простаивающего соединения в секундах (v2)",
+    )
+    http2: bool = Field(default=False, description="Использовать HTTP/2 (v2, требуется h2)")
+    http_timeout: float = Field(
+        default=DEFAULT_HTTP_TIMEOUT,
+        description="Таймаут HTTP-запросов в секундах (v2)",
+    )
+
+    @field_validator("sample_rates")
+    @classmethod
+    def _check_sample_rates(cls, value: Dict[str, float]) -> Dict[str, float]:
+        """Проверяет, что доли выборки для имен запусков лежат в [0, 1]."""
+        invalid = {name: rate for name, rate in value.items() if not 0.0 <= rate <= 1.0}
+        if invalid:
+            raise ValueError(f"Доли выборки должны быть в диапазоне [0, 1]: {invalid}")
+        return value
@@ -0,0 +1,119 @@
+"""Общие фикстуры тестов."""
+
+import sys
+import types
+from typing import Any, List, Tuple
+
+import pytest
+from langchain_core.callbacks import BaseCallbackHandler
+
+from langfuse_runnable_config.internal.cache import get_handler_cache
+from langfuse_runnable_config.internal.handlers import v2, v3
+from langfuse_runnable_config.internal.transport import get_langfuse_client_registry
+from langfuse_runnable_config.internal.version import reset_langfuse_version_cache
+
+
+class FakeCallbackHandler(BaseCallbackHandler):
+    """CallbackHandler-заглушка, запоминающая полученные события."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.init_kwargs = kwargs
+        self.events: List[Tuple[str, Any]] = []
+        self.flush_count = 0
+
+    def flush(self) -> None:
+        self.flush_count += 1
+
+    def on_chain_start(self, serialized: Any, inputs: Any, **kwargs: Any) -> None:
+        self.events.append(("chain_start", inputs))
+
+    def on_chain_end(self, outputs: Any, **kwargs: Any) -> None:
+        self.events.append(("chain_end", outputs))
+
+    def on_retriever_start(self, serialized: Any, query: Any, **kwargs: Any) -> None:
+        self.events.append(("retriever_start", query))
+
+    def on_retriever_end(self, documents: Any, **kwargs: Any) -> None:
+        self.events.append(("retriever_end", documents))
+
+    def on_llm_start(self, serialized: Any, prompts: Any, **kwargs: Any) -> None:
+        self.events.append(("llm_start", prompts))
+
+    def on_chat_model_start(self, serialized: Any, messages: Any, **kwargs: Any) -> None:
+        self.events.append(("chat_model_start", messages))
+
+    def on_llm_end(self, response: Any, **kwargs: Any) -> None:
+        self.events.append(("llm_end", response))
+
+    def on_tool_start(self, serialized: Any, input_str: Any, **kwargs: Any) -> None:
+        self.events.append(("tool_start", (input_str, kwargs.get("inputs"))))
+
+    def on_tool_end(self, output: Any, **kwargs: Any) -> None:
+        self.events.append(("tool_end", output))
+
+    def on_chain_error(self, error: BaseException, **kwargs: Any) -> None:
+        self.events.append(("chain_error", error))
+
+    def on_tool_error(self, error: BaseException, **kwargs: Any) -> None:
+        self.events.append(("tool_error", error))
+
+    def on_agent_action(self, action: Any, **kwargs: Any) -> None:
+        self.events.append(("agent_action", action))
+
+    def on_agent_finish(self, finish: Any, **kwargs: Any) -> None:
+        self.events.append(("agent_finish", finish))
+
+
+class FakeLangfuse:
+    """Заглушка клиента langfuse.Langfuse."""
+
+    def __init__(self, **kwargs: Any) -> None:
+        self.init_kwargs = kwargs
+        self.flush_count = 0
+
+    def flush(self) -> None:
+        self.flush_count += 1
+
+
+class FakeV2CallbackHandler(FakeCallbackHandler):
+    """Заглушка langfuse.callback.CallbackHandler."""
+
+
+class FakeV3CallbackHandler(FakeCallbackHandler):
+    """Заглушка langfuse.langchain.CallbackHandler."""
+
+
+def _make_fake_langfuse() -> types.ModuleType:
+    langfuse = types.ModuleType("langfuse")
+    langfuse.__version__ = "3.0.0"  # type: ignore[attr-defined]
+    langfuse.__path__ = []  # type: ignore[attr-defined]
+    langfuse.Langfuse = FakeLangfuse  # type: ignore[attr-defined]
+    callback = types.ModuleType("langfuse.callback")
+    callback.CallbackHandler = FakeV2CallbackHandler  # type: ignore[attr-defined]
+    langchain = types.ModuleType("langfuse.langchain")
+    langchain.CallbackHandler = FakeV3CallbackHandler  # type: ignore[attr-defined]
+    langfuse.callback = callback  # type: ignore[attr-defined]
+    langfuse.langchain = langchain  # type: ignore[attr-defined]
+    return langfuse
+
+
+_FAKE_LANGFUSE = _make_fake_langfuse()
+
+
+@pytest.fixture
+def fake_langfuse(monkeypatch):
+    """Подменяет пакет langfuse заглушкой версии 3 (v2 — через LANGFUSE_MAJOR_VERSION)."""
+    monkeypatch.setitem(sys.modules, "langfuse", _FAKE_LANGFUSE)
+    monkeypatch.setitem(sys.modules, "langfuse.callback", _FAKE_LANGFUSE.callback)
+    monkeypatch.setitem(sys.modules, "langfuse.langchain", _FAKE_LANGFUSE.langchain)
+    # Классы обработчиков создаются один раз на процесс — строим их заново от заглушек
+    monkeypatch.setattr(v2, "_handler_class", None)
+    monkeypatch.setattr(v3, "_handler_class", None)
+    monkeypatch.delenv("LANGFUSE_MAJOR_VERSION", raising=False)
+    reset_langfuse_version_cache()
+    get_handler_cache().clear()
+    get_langfuse_client_registry().clear()
+    yield _FAKE_LANGFUSE
+    get_handler_cache().clear()
+    get_langfuse_client_registry().clear()
+    reset_langfuse_version_cache()
@@ -0,0 +1,124 @@
+"""Тесты для кэша обработчиков."""
+
+import gc
+import threading
+import time
+from typing import Callable
+
+from langfuse_runnable_config.internal.cache import HandlerCache, make_cache_key
+from langfuse_runnable_config.internal.handlers import create_truncating_handler
+from langfuse_runnable_config.internal.handlers.lifecycle import flush_handler
+from langfuse_runnable_config.settings import LangfuseSettings, LangfuseTruncatingSettings
+
+
+class _DummyHandler:
+    """Обработчик-заглушка, запоминающий вызовы flush()."""
+
+    def __init__(self) -> None:
+        self.flushed = False
+
+    def flush(self) -> None:
+        self.flushed = True
+
+
+def _wait_until(predicate: Callable[[], bool], timeout: float = 5.0) -> bool:
+    """Ждет выполнения условия, проверяемого в фоновом сбросе обработчиков."""
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.01)
+    return True
+
+
+def test_cache_hit_returns_same_handler():
+    """Тест повторного получения обработчика из кэша."""
+    cache = HandlerCache(maxsize=2)
+    first = cache.get_or_create("key", _DummyHandler)
+    second = cache.get_or_create("key", _DummyHandler)
+    assert first is second
+    info = cache.info()
+    assert info.hits == 1
+    assert info.misses == 1
+    assert info.currsize == 1
+
+
+def test_cache_evicts_least_recently_used():
+    """Тест вытеснения с остановкой наименее используемого обработчика."""
+    cache = HandlerCache(maxsize=2)
+    first = cache.get_or_create("a", _DummyHandler)
+    second = cache.get_or_create("b", _DummyHandler)
+    cache.get_or_create("a", _DummyHandler)
+    cache.get_or_create("c", _DummyHandler)
+    assert cache.info().currsize == 2
+    assert _wait_until(lambda: second.flushed)
+    assert not first.flushed
+    assert cache.get_or_create("a", _DummyHandler) is first
+
+
+def test_cache_evicted_handler_stays_usable(fake_langfuse):
+    """Тест работы вытесненного обработчика, который еще используется в конфигурации."""
+    cache = HandlerCache(maxsize=1)
+    handler = cache.get_or_create(
+        "a", lambda: create_truncating_handler(10, 5, langfuse_version=3, offload=True)
+    )
+    handler.on_chain_start({}, "x" * 100)
+    cache.get_or_create("b", _DummyHandler)
+    assert _wait_until(lambda: handler.flush_count == 1)
+    assert handler.events == [("chain_start", "x" * 10 + "...")]
+
+    handler.on_chain_end("y" * 100)
+    flush_handler(handler)
+    assert handler.events[-1] == ("chain_end", "y" * 10 + "...")
+
+    offloader = handler._offloader
+    assert _wait_until(
+        lambda: all(thread.name != "langfuse-release" for thread in threading.enumerate())
+    )
+    del handler
+    gc.collect()
+    assert offloader._closed
+
+
+def test_cache_eviction_does_not_wait_for_flush():
+    """Тест вытеснения без ожидания сброса обработчика в потоке запроса."""
+    release = threading.Event()
+
+    class _SlowHandler(_DummyHandler):
+        def flush(self) -> None:
+            release.wait(5)
+            super().flush()
+
+    cache = HandlerCache(maxsize=1)
+    slow = cache.get_or_create("a", _SlowHandler)
+    start = time.monotonic()
+    cache.get_or_create("b", _DummyHandler)
+    assert time.monotonic() - start < 1
+    assert not slow.flushed
+
+    release.set()
+    assert _wait_until(lambda: slow.flushed)
+
+
+def test_cache_disabled_with_zero_size():
+    """Тест отключения кэша нулевым размером."""
+    cache = HandlerCache(maxsize=0)
+    assert cache.get_or_create("key", _DummyHandler) is not cache.get_or_create(
+        "key", _DummyHandler
+    )
+    assert cache.info().currsize == 0
+
+
+def test_cache_key_depends_on_settings():
+    """Тест построения ключа по эффективным настройкам."""
+    settings = LangfuseSettings(url="https://test.com", public_key="pk", secret_key="sk")
+    same = LangfuseSettings(url="https://test.com", public_key="pk", secret_key="sk")
+    other = LangfuseSettings(url="https://other.com", public_key="pk", secret_key="sk")
+    truncating = LangfuseTruncatingSettings(
+        url="https://test.com", public_key="pk", secret_key="sk"
+    )
+    assert make_cache_key("simple", 3, settings) == make_cache_key("simple", 3, same)
+    assert make_cache_key("simple", 3, settings) != make_cache_key("simple", 3, other)
+    assert make_cache_key("simple", 3, settings) != make_cache_key(
+        "truncating", 3, truncating
+    )
@@ -1,5 +1,9 @@
 """Тесты для фабрик."""
 
+import asyncio
+import threading
+
+from langfuse_runnable_config import aflush, ashutdown
 from langfuse_runnable_config.factories import (
     LangfuseRunnableConfig,
     LangfuseTruncatingRunnableConfig,
@@ -70,3 +74,74 @@ def test_langfuse_truncating_config_with_settings():
     runnable_config = LangfuseTruncatingRunnableConfig.create_config(settings=settings)
     assert runnable_config is not None
 
+
+def test_langfuse_config_reuses_cached_handler(fake_langfuse):
+    """Тест переиспользования обработчика для одинаковых настроек."""
+    params = dict(url="https://test.com", public_key="pk-test", secret_key="sk-test")
+    first = LangfuseTruncatingRunnableConfig.create_config(**params)
+    second = LangfuseTruncatingRunnableConfig.create_config(**params)
+    assert first["callbacks"][0] is second["callbacks"][0]
+    assert first is not second
+    assert LangfuseRunnableConfig.create_callback(**params) is not first["callbacks"][0]
+
+
+def test_langfuse_truncating_config_document_options(fake_langfuse):
+    """Тест передачи настроек Document в обработчик."""
+    from langchain_core.documents import Document
+
+    settings = LangfuseTruncatingSettings(
+        url="https://test.com",
+        public_key="pk-test",
+        secret_key="sk-test",
+        truncate_document_metadata_keys=["source"],
+        truncate_document_dedup=True,
+    )
+    handler = LangfuseTruncatingRunnableConfig.create_callback(settings=settings)
+    document = Document(page_content="chunk", metadata={"source": "a.pdf", "score": 0.9})
+    handler.on_retriever_end([document, document])
+    assert handler.events == [
+        (
+            "retriever_end",
+            [
+                {"page_content": "chunk", "metadata": {"source": "a.pdf"}},
+                {"page_content": "<duplicate of document #0>", "metadata": {"source": "a.pdf"}},
+            ],
+        )
+    ]
+
+
+def test_acreate_config_builds_off_loop_then_reuses(fake_langfuse, monkeypatch):
+    """Тест создания обработчика вне event loop и готового обработчика из кэша."""
+    threads = []
+
+    class RecordingLangfuse(fake_langfuse.Langfuse):
+        def __init__(self, **kwargs):
+            threads.append(threading.current_thread())
+            super().__init__(**kwargs)
+
+    monkeypatch.setattr(fake_langfuse, "Langfuse", RecordingLangfuse)
+    settings = LangfuseTruncatingSettings(
+        url="https://test.com", public_key="pk-test", secret_key="sk-test"
+    )
+
+    async def main():
+        loop_thread = threading.current_thread()
+        first = await LangfuseTruncatingRunnableConfig.acreate_config(settings=settings)
+        assert threads and threads[0] is not loop_thread
+        second = await LangfuseTruncatingRunnableConfig.acreate_callback(settings=settings)
+        assert second is first["callbacks"][0]
+        simple = await LangfuseRunnableConfig.acreate_callback(settings=settings)
+        assert simple is not second
+        return first["callbacks"][0], simple
+
+    handler, simple = asyncio.run(main())
+    assert len(threads) == 1
+    assert asyncio.run(LangfuseRunnableConfig.acreate_config(url="")) == {"callbacks": []}
+
+    asyncio.run(aflush())
+    assert simple.flush_count == 1
+    asyncio.run(aflush({"callbacks": [simple]}))
+    assert simple.flush_count == 2
+    asyncio.run(ashutdown())
+    assert simple.flush_count >= 3
+    assert LangfuseRunnableConfig.create_callback(settings=settings) is not simple
@@ -0,0 +1,475 @@
+"""Тесты для обработчиков с обрезкой."""
+
+import asyncio
+import pickle
+import queue
+import subprocess
+import sys
+import threading
+import time
+import types
+import uuid
+
+import pytest
+from langchain_core.runnables import RunnableLambda
+
+from langfuse_runnable_config.internal.handlers import create_truncating_handler, v2, v3
+from langfuse_runnable_config.internal.handlers.adaptive import AdaptiveLimits
+from langfuse_runnable_config.internal.handlers.lifecycle import flush_handler
+from langfuse_runnable_config.internal.handlers.offload import SerializationOffloader, _close_all
+from langfuse_runnable_config.internal.strategies.truncating import get_truncating_strategy
+from langfuse_runnable_config.internal.transport import (
+    get_http_client_pool,
+    get_langfuse_client_registry,
+)
+from langfuse_runnable_config.settings import LangfuseTruncatingSettings
+
+# Восстанавливает обработчик из pickle в новом процессе и печатает его клиент SDK
+_UNPICKLE_SCRIPT = """
+import pickle, sys
+handler = pickle.loads(sys.stdin.buffer.read())
+print(handler.client._base_url, handler.client._tracing_enabled)
+"""
+
+
+def test_truncating_handler_class_is_reused(fake_langfuse):
+    """Тест однократного создания класса обработчика."""
+    first = create_truncating_handler(100, 5, langfuse_version=3)
+    second = create_truncating_handler(200, 10, langfuse_version=3)
+    assert type(first) is type(second)
+    assert isinstance(second, v3.TruncatingCallbackHandler)
+    assert type(first).__qualname__ == "TruncatingCallbackHandler"
+
+
+def test_truncating_handler_classes_per_version(fake_langfuse):
+    """Тест отдельных классов для v2 и v3+."""
+    handler = create_truncating_handler(100, 5, langfuse_version=2, host="https://test.com")
+    assert isinstance(handler, v2.TruncatingCallbackHandler)
+    assert not isinstance(handler, v3.TruncatingCallbackHandler)
+    assert handler.init_kwargs == {"host": "https://test.com"}
+
+
+def test_truncating_handler_is_picklable(fake_langfuse):
+    """Тест сериализации обработчика через pickle."""
+    handler = create_truncating_handler(100, 5, langfuse_version=3)
+    restored = pickle.loads(pickle.dumps(handler))
+    assert type(restored) is type(handler)
+    assert restored._max_length == 100
+
+    adaptive = create_truncating_handler(100, 5, langfuse_version=3, adaptive=True)
+    adaptive._adaptive.observe(serialize_ms=1_000.0, payload_length=10)
+    restored = pickle.loads(pickle.dumps(adaptive))
+    assert restored.adaptive_limits_info().max_length == 100
+    restored.on_chain_start({}, {"input": "x"})
+
+
+def test_truncating_handler_with_sdk_v3_is_picklable(monkeypatch):
+    """Тест pickle обработчика поверх настоящего CallbackHandler Langfuse v3+."""
+    pytest.importorskip("langfuse.langchain")
+    from langfuse import Langfuse
+
+    monkeypatch.setattr(v3, "_handler_class", None)
+    client = Langfuse(public_key="pk-pickle", secret_key="sk-pickle", host="http://localhost:1")
+    try:
+        handler = create_truncating_handler(
+            10, 5, langfuse_version=3, memo=True, offload=True, public_key="pk-pickle"
+        )
+        restored = pickle.loads(pickle.dumps(handler))
+        assert type(restored) is type(handler)
+        assert isinstance(restored.client, Langfuse)
+        assert restored._base_kwargs == {"public_key": "pk-pickle"}
+        assert restored._max_length == 10
+        assert restored._memo is not None and restored._offloader is not None
+        run_id = uuid.uuid4()
+        restored.on_chain_start({}, {"input": "x" * 100}, run_id=run_id)
+        restored.on_chain_end({"output": "y"}, run_id=run_id)
+        flush_handler(restored)
+        assert restored.runs == {}
+    finally:
+        client.shutdown()
+
+
+def test_truncating_handler_v2_restores_pooled_http_client(fake_langfuse):
+    """Тест восстановления общего httpx.Client v2 из пула после pickle."""
+    settings = LangfuseTruncatingSettings(
+        url="https://test.com", public_key="pk-test", secret_key="sk-test"
+    )
+    handler = get_truncating_strategy(2).create_callback(settings)
+    restored = pickle.loads(pickle.dumps(handler))
+    assert restored.init_kwargs["httpx_client"] is get_http_client_pool().get_client(settings)
+    assert restored.init_kwargs["host"] == "https://test.com"
+
+
+def test_truncating_handler_with_sdk_v3_unpickles_in_new_process(monkeypatch):
+    """Тест создания клиента проекта v3+ при восстановлении обработчика в другом процессе."""
+    pytest.importorskip("langfuse.langchain")
+    monkeypatch.setattr(v3, "_handler_class", None)
+    settings = LangfuseTruncatingSettings(
+        url="http://localhost:1", public_key="pk-spawn", secret_key="sk-spawn"
+    )
+    try:
+        handler = get_truncating_strategy(3).create_callback(settings)
+        result = subprocess.run(
+            [sys.executable, "-c", _UNPICKLE_SCRIPT],
+            input=pickle.dumps(handler),
+            capture_output=True,
+            timeout=60,
+        )
+    finally:
+        for client in get_langfuse_client_registry().clients():
+            client.shutdown()
+        get_langfuse_client_registry().clear()
+
+    assert result.returncode == 0, result.stderr.decode()
+    assert result.stdout.decode().split() == ["http://localhost:1", "True"]
+    assert b"No Langfuse client" not in result.stderr
+
+
+def test_truncating_handler_truncates_llm_events(fake_langfuse):
+    """Тест обрезки промптов, сообщений и генераций."""
+    from langchain_core.messages import AIMessage, HumanMessage
+    from langchain_core.outputs import ChatGeneration, Generation, LLMResult
+
+    handler = create_truncating_handler(10, 5, langfuse_version=3)
+    handler.on_llm_start({}, ["x" * 100])
+    handler.on_chat_model_start({}, [[HumanMessage(content="y" * 100)]])
+    handler.on_llm_end(
+        LLMResult(
+            generations=[
+                [Generation(text="z" * 100)],
+                [ChatGeneration(message=AIMessage(content="w" * 100))],
+            ],
+            llm_output={"token_usage": {"total_tokens": 42}},
+        )
+    )
+
+    (_, prompts), (_, messages), (_, result) = handler.events
+    assert prompts == ["x" * 10 + "..."]
+    assert isinstance(messages[0][0], HumanMessage)
+    assert messages[0][0].content == "y" * 10 + "..."
+    assert result.generations[0][0].text == "z" * 10 + "..."
+    assert result.generations[1][0].message.content == "w" * 10 + "..."
+    assert result.llm_output == {"token_usage": {"total_tokens": 42}}
+
+
+def test_truncating_handler_truncates_tool_and_agent_events(fake_langfuse):
+    """Тест обрезки входов и выходов инструментов и агентов."""
+    from langchain_core.agents import AgentAction, AgentFinish
+
+    handler = create_truncating_handler(10, 5, langfuse_version=3)
+    handler.on_tool_start({}, "a" * 100, inputs={"query": "b" * 100})
+    handler.on_tool_end("c" * 100)
+    handler.on_agent_action(AgentAction(tool="search", tool_input="d" * 100, log="e" * 100))
+    handler.on_agent_finish(AgentFinish(return_values={"output": "f" * 100}, log=""))
+
+    (_, tool_start), (_, tool_end), (_, action), (_, finish) = handler.events
+    assert tool_start == ("a" * 10 + "...", {"query": "b" * 10 + "..."})
+    assert tool_end == "c" * 10 + "..."
+    assert action.tool == "search"
+    assert (action.tool_input, action.log) == ("d" * 10 + "...", "e" * 10 + "...")
+    assert finish.return_values == {"output": "f" * 10 + "..."}
+
+
+def test_truncating_handler_event_limits(fake_langfuse):
+    """Тест отдельных лимитов для типов событий."""
+    handler = create_truncating_handler(
+        10, 5, langfuse_version=3, event_limits={"llm": {"max_length": 50}}
+    )
+    handler.on_llm_start({}, ["x" * 100])
+    handler.on_chain_start({}, {"input": "x" * 100})
+    assert handler.events[0][1] == ["x" * 50 + "..."]
+    assert handler.events[1][1] == {"input": "x" * 10 + "..."}
+
+
+def test_truncating_handler_rejects_unknown_event_limits(fake_langfuse):
+    """Тест ошибки для неизвестного типа события."""
+    with pytest.raises(ValueError):
+        create_truncating_handler(10, 5, langfuse_version=3, event_limits={"embedding": {}})
+    with pytest.raises(ValueError):
+        create_truncating_handler(10, 5, langfuse_version=3, event_limits={"llm": {"size": 1}})
+
+
+def test_truncating_handler_string_strategy(fake_langfuse):
+    """Тест стратегии обрезки строк в обработчике."""
+    handler = create_truncating_handler(7, 5, langfuse_version=3, string_strategy="head_tail")
+    handler.on_chain_start({}, {"input": "start-" + "x" * 100 + "-end"})
+    assert handler.events[0][1] == {"input": "st...nd"}
+    with pytest.raises(ValueError):
+        create_truncating_handler(10, 5, langfuse_version=3, string_strategy="middle")
+
+
+def test_flush_handler_uses_v3_client():
+    """Тест сброса клиента v3+, к которому привязан обработчик без flush()."""
+    client = types.SimpleNamespace(flush_count=0)
+    client.flush = lambda: setattr(client, "flush_count", client.flush_count + 1)
+    flush_handler(types.SimpleNamespace(client=client))
+    flush_handler(types.SimpleNamespace(_langfuse_client=client))
+    assert client.flush_count == 2
+
+
+def test_truncating_handler_offload_preserves_order(fake_langfuse):
+    """Тест отложенной сериализации с сохранением порядка событий."""
+    handler = create_truncating_handler(10, 5, langfuse_version=3, offload=True)
+    assert handler.on_chain_start({}, {"input": "x" * 100}) is None
+    handler.on_chain_end({"output": "y" * 100})
+    flush_handler(handler)
+
+    assert handler.events == [
+        ("chain_start", {"input": "x" * 10 + "..."}),
+        ("chain_end", {"output": "y" * 10 + "..."}),
+    ]
+    assert handler.flush_count == 1
+    assert handler._offloader.qsize() == 0
+
+
+@pytest.mark.parametrize("policy", ["block", "degrade", "drop"])
+def test_truncating_handler_offload_orders_error_events(fake_langfuse, policy):
+    """Тест отправки ошибок после событий, ожидающих в очереди."""
+    handler = create_truncating_handler(
+        10, 5, langfuse_version=3, offload=True, offload_policy=policy
+    )
+    handler._offloader.submit(lambda: time.sleep(0.05))
+    error = ValueError("boom")
+    handler.on_chain_start({}, {"input": "x"})
+    handler.on_chain_error(error)
+    flush_handler(handler)
+    assert handler.events == [("chain_start", {"input": "x"}), ("chain_error", error)]
+
+
+def test_truncating_handler_in_async_runnable(fake_langfuse):
+    """Тест обрезки событий асинхронного runnable синхронными хуками."""
+    handler = create_truncating_handler(10, 5, langfuse_version=3, offload=True)
+
+    async def echo(value):
+        return value
+
+    runnable = RunnableLambda(echo)
+    asyncio.run(runnable.ainvoke("x" * 100, config={"callbacks": [handler]}))
+    flush_handler(handler)
+    assert handler.events == [("chain_start", "x" * 10 + "..."), ("chain_end", "x" * 10 + "...")]
+
+
+def _fill_queue(handler):
+    """Занимает рабочий поток и заполняет очередь размером 1, следя за ее размером."""
+    offloader = handler._offloader
+    sizes = []
+    put = offloader._put
+
+    def tracked_put(*args, **kwargs):
+        result = put(*args, **kwargs)
+        sizes.append(offloader.qsize())
+        return result
+
+    offloader._put = tracked_put
+    release = threading.Event()
+    started = threading.Event()
+    offloader.submit(lambda: (started.set(), release.wait()))
+    started.wait()
+    offloader.submit(lambda: None)
+    assert offloader.is_full()
+    return release, sizes
+
+
+def test_truncating_handler_offload_full_queue_degrade(fake_langfuse):
+    """Тест политики degrade: обрезанные события отправляются по порядку через очередь."""
+    handler = create_truncating_handler(
+        1_000, 5, langfuse_version=3, offload=True, offload_queue_size=1, offload_policy="degrade"
+    )
+    release, sizes = _fill_queue(handler)
+
+    run_id = uuid.uuid4()
+    handler.on_chain_start({}, "x" * 1_000, run_id=run_id)
+    handler.on_chain_end("y" * 1_000, run_id=run_id)
+    # Вызывающий поток не ждет места в очереди, а события не обгоняют очередь
+    assert handler.events == []
+    release.set()
+    flush_handler(handler)
+    assert handler.events == [
+        ("chain_start", "x" * 200 + "..."),
+        ("chain_end", "y" * 200 + "..."),
+    ]
+    assert max(sizes) == 3
+
+
+def test_truncating_handler_offload_full_queue_drop(fake_langfuse):
+    """Тест политики drop: отбрасывается только начало запуска вместе с его завершением."""
+    handler = create_truncating_handler(
+        1_000, 5, langfuse_version=3, offload=True, offload_queue_size=1, offload_policy="drop"
+    )
+    kept, dropped = uuid.uuid4(), uuid.uuid4()
+    handler.on_chain_start({}, "kept", run_id=kept)
+    flush_handler(handler)
+    release, sizes = _fill_queue(handler)
+
+    handler.on_chain_start({}, "dropped", run_id=dropped)
+    handler.on_chain_end("x" * 1_000, run_id=kept)
+    release.set()
+    flush_handler(handler)
+    handler.on_chain_error(ValueError("boom"), run_id=dropped)
+    flush_handler(handler)
+
+    assert handler.events == [("chain_start", "kept"), ("chain_end", "x" * 200 + "...")]
+    assert handler._dropped_runs == set()
+    assert max(sizes) == 2
+
+
+def test_offloader_exit_hook_is_bounded():
+    """Тест ограниченного по времени завершения очереди с зависшей задачей."""
+    offloader = SerializationOffloader()
+    release = threading.Event()
+    offloader.submit(release.wait)
+    start = time.monotonic()
+    _close_all(timeout=0.1)
+    assert time.monotonic() - start < 1
+    release.set()
+
+
+def test_truncating_handler_rejects_unknown_offload_policy(fake_langfuse):
+    """Тест ошибки для неизвестной политики переполнения."""
+    with pytest.raises(ValueError):
+        create_truncating_handler(10, 5, langfuse_version=3, offload_policy="skip")
+
+
+def test_adaptive_limits_scale_down_and_recover():
+    """Тест уменьшения лимитов при перегрузке и их восстановления."""
+    limits = AdaptiveLimits(1_000, 10, min_length=100, min_vector_elements=2, target_ms=1.0)
+    for _ in range(5):
+        limits.observe(serialize_ms=50.0, payload_length=1_000)
+    # Масштаб уменьшается не чаще раза за окно скользящего среднего
+    assert limits.scale == 0.5
+    for _ in range(20):
+        limits.observe(serialize_ms=50.0, payload_length=1_000)
+    info = limits.info()
+    assert (info.max_length, info.max_vector_elements) == (100, 2)
+    assert limits.apply({"max_length": 1_000, "max_vector_elements": 10, "max_depth": 5}) == {
+        "max_length": 100,
+        "max_vector_elements": 2,
+        "max_depth": 5,
+    }
+
+    for _ in range(100):
+        limits.observe(serialize_ms=0.0, payload_length=10)
+    assert limits.info().max_length == 1_000
+    assert limits.scale == 1.0
+
+
+def test_adaptive_limits_queue_length_pressure():
+    """Тест уменьшения лимитов по объему событий в очереди."""
+    limits = AdaptiveLimits(1_000, 10, target_ms=1_000.0, target_queue_length=10_000)
+    limits.observe(serialize_ms=0.0, payload_length=1_000, queued_events=5)
+    assert limits.scale == 1.0
+    limits.observe(serialize_ms=0.0, payload_length=1_000, queued_events=100)
+    assert limits.scale == 0.5
+    assert limits.info().queue_length == pytest.approx(limits.info().payload_length * 100)
+
+
+def test_truncating_handler_adaptive_limits_sdk_queue(fake_langfuse):
+    """Тест учета очереди ингеста SDK v2 в адаптивном режиме без offload."""
+    handler = create_truncating_handler(
+        1_000, 5, langfuse_version=3, adaptive=True, adaptive_target_queue_length=1_000
+    )
+    ingestion_queue = queue.Queue()
+    for _ in range(100):
+        ingestion_queue.put({})
+    handler.langfuse = types.SimpleNamespace(
+        task_manager=types.SimpleNamespace(_ingestion_queue=ingestion_queue)
+    )
+    handler.on_chain_start({}, {"input": "x" * 1_000})
+    assert handler.adaptive_limits_info().scale == 0.5
+
+
+def test_truncating_handler_adaptive_limits(fake_langfuse):
+    """Тест адаптивной обрезки в обработчике."""
+    handler = create_truncating_handler(
+        1_000, 5, langfuse_version=3, adaptive=True, adaptive_min_length=10, adaptive_target_ms=0.0
+    )
+    for _ in range(40):
+        handler.on_chain_start({}, {"input": "x" * 1_000})
+    assert handler.events[-1][1] == {"input": "x" * 10 + "..."}
+    assert handler.adaptive_limits_info().max_length == 10
+    assert create_truncating_handler(10, 5, langfuse_version=3).adaptive_limits_info() is None
+
+
+@pytest.mark.parametrize("offload", [False, True])
+def test_truncating_handler_memo_reuses_state(fake_langfuse, offload):
+    """Тест однократной обрезки состояния, переданного между шагами трейса."""
+    handler = create_truncating_handler(10, 5, langfuse_version=3, memo=True, offload=offload)
+    state = {"messages": ["x" * 100], "step": 1}
+    root, node = uuid.uuid4(), uuid.uuid4()
+    handler.on_chain_start({}, state, run_id=root, parent_run_id=None)
+    handler.on_chain_start({}, state, run_id=node, parent_run_id=root)
+    handler.on_chain_end(state, run_id=uuid.uuid4(), parent_run_id=node)
+    flush_handler(handler)
+    assert handler.events[0][1] is handler.events[1][1] is handler.events[2][1]
+    assert len(handler._memo) == 1
+
+    handler.on_chain_end(state, run_id=root, parent_run_id=None)
+    flush_handler(handler)
+    assert len(handler._memo) == 0
+    assert handler._trace_roots == {}
+
+
+def test_truncating_handler_memo_released_on_root_error(fake_langfuse):
+    """Тест освобождения кэша трейса, корневая цепочка которого завершилась ошибкой."""
+    handler = create_truncating_handler(10, 5, langfuse_version=3, memo=True)
+    state = {"messages": ["x" * 100]}
+    for _ in range(100):
+        root = uuid.uuid4()
+        handler.on_chain_start({}, state, run_id=root, parent_run_id=None)
+        handler.on_tool_start({}, "query", run_id=uuid.uuid4(), parent_run_id=root)
+        handler.on_chain_error(ValueError("boom"), run_id=root, parent_run_id=None)
+    assert handler._trace_roots == {}
+    assert handler._trace_runs == {}
+    assert len(handler._memo) == 0
+
+
+def test_truncating_handler_memo_released_for_tool_root(fake_langfuse):
+    """Тест освобождения кэша трейса, корнем которого является инструмент."""
+    handler = create_truncating_handler(10, 5, langfuse_version=3, memo=True)
+    state = {"messages": ["x" * 100]}
+    for _ in range(100):
+        root = uuid.uuid4()
+        handler.on_tool_start({}, "query", run_id=root, parent_run_id=None)
+        handler.on_llm_start({}, ["prompt"], run_id=uuid.uuid4(), parent_run_id=root)
+        handler.on_tool_end(state, run_id=root, parent_run_id=None)
+    assert handler._trace_roots == {}
+    assert handler._trace_runs == {}
+    assert len(handler._memo) == 0
+
+
+def test_truncating_handler_memo_concurrent_traces(fake_langfuse):
+    """Тест освобождения кэшей трейсов, выполняемых параллельно в разных потоках."""
+    handler = create_truncating_handler(10, 5, langfuse_version=3, memo=True)
+    state = {"messages": ["x" * 100]}
+
+    def run_traces():
+        for _ in range(200):
+            root = uuid.uuid4()
+            handler.on_chain_start({}, state, run_id=root, parent_run_id=None)
+            handler.on_tool_start({}, "query", run_id=uuid.uuid4(), parent_run_id=root)
+            handler.on_chain_end(state, run_id=root, parent_run_id=None)
+
+    threads = [threading.Thread(target=run_traces) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert handler._trace_roots == {}
+    assert handler._trace_runs == {}
+    assert len(handler._memo) == 0
+
+
+def test_truncating_handler_memo_is_per_trace(fake_langfuse):
+    """Тест раздельных кэшей обрезки для параллельных трейсов."""
+    handler = create_truncating_handler(10, 5, langfuse_version=3, memo=True)
+    state = {"messages": ["x" * 100]}
+    first, second = uuid.uuid4(), uuid.uuid4()
+    handler.on_chain_start({}, state, run_id=first, parent_run_id=None)
+    handler.on_chain_start({}, state, run_id=second, parent_run_id=None)
+    assert handler.events[0][1] is not handler.events[1][1]
+    assert len(handler._memo) == 2
+
+    handler.on_chain_end({}, run_id=second, parent_run_id=None)
+    assert len(handler._memo) == 1
+    handler.on_chain_start({}, state, run_id=uuid.uuid4(), parent_run_id=first)
+    assert handler.events[-1][1] is handler.events[0][1]
@@ -0,0 +1,111 @@
+"""Тесты для метрик обрезки."""
+
+import threading
+from typing import Any, Dict, List, Tuple
+
+import pytest
+
+from langfuse_runnable_config import get_metrics_sink, set_metrics_sink
+from langfuse_runnable_config.internal.handlers import create_truncating_handler
+from langfuse_runnable_config.internal.handlers.lifecycle import flush_handler
+from langfuse_runnable_config.internal.metrics import (
+    InMemoryMetricsSink,
+    NoopMetricsSink,
+    OpenTelemetryMetricsSink,
+)
+
+
+@pytest.fixture
+def metrics_sink():
+    """Устанавливает InMemoryMetricsSink общим приемником на время теста."""
+    sink = InMemoryMetricsSink()
+    set_metrics_sink(sink)
+    yield sink
+    set_metrics_sink(None)
+
+
+def test_default_sink_is_noop():
+    """Тест приемника по умолчанию без замеров."""
+    assert isinstance(get_metrics_sink(), NoopMetricsSink)
+    assert not get_metrics_sink().enabled
+
+
+def test_handler_records_serialization(fake_langfuse, metrics_sink):
+    """Тест метрик событий обработчика в общем приемнике."""
+    handler = create_truncating_handler(10, 2, langfuse_version=3)
+    handler.on_chain_start({}, {"input": "x" * 100})
+    handler.on_retriever_end([[0.1, 0.2, 0.3], [0.4]])
+
+    events = metrics_sink.snapshot()["events"]
+    assert events["chain"]["events"] == 1
+    assert events["chain"]["input_length"] == 100
+    assert events["chain"]["output_length"] == 13
+    assert events["chain"]["truncated_strings"] == 1
+    assert events["retriever"]["truncated_vectors"] == 1
+    assert events["retriever"]["duration_ms"] >= events["retriever"]["max_duration_ms"] > 0
+
+
+def test_handler_sink_overrides_global(fake_langfuse, metrics_sink):
+    """Тест собственного приемника обработчика и адаптивных лимитов."""
+    own = InMemoryMetricsSink()
+    handler = create_truncating_handler(
+        100, 5, langfuse_version=3, metrics_sink=own, adaptive=True, adaptive_target_ms=0.0
+    )
+    handler.on_tool_end("x" * 1_000)
+
+    assert metrics_sink.snapshot()["events"] == {}
+    snapshot = own.snapshot()
+    assert snapshot["events"]["tool"]["events"] == 1
+    assert snapshot["adaptive"].scale == 0.5
+
+
+def test_handler_records_offload_fallback(fake_langfuse, metrics_sink):
+    """Тест учета событий, обработанных при переполненной очереди."""
+    handler = create_truncating_handler(
+        1_000, 5, langfuse_version=3, offload=True, offload_queue_size=1, offload_policy="drop"
+    )
+    release = threading.Event()
+    started = threading.Event()
+    handler._offloader.submit(lambda: (started.set(), release.wait()))
+    started.wait()
+    handler._offloader.submit(lambda: None)
+
+    handler.on_tool_end("x" * 1_000)
+    release.set()
+    flush_handler(handler)
+    assert metrics_sink.snapshot()["events"]["tool"]["offload_drop"] == 1
+
+
+class _FakeInstrument:
+    def __init__(self, name: str, records: List[Tuple[str, Any, Dict[str, str]]]) -> None:
+        self._name = name
+        self._records = records
+
+    def record(self, value: Any, attributes: Any = None) -> None:
+        self._records.append((self._name, value, attributes))
+
+    add = record
+
+
+class _FakeMeter:
+    def __init__(self) -> None:
+        self.records: List[Tuple[str, Any, Dict[str, str]]] = []
+
+    def create_histogram(self, name: str, **kwargs: Any) -> _FakeInstrument:
+        return _FakeInstrument(name, self.records)
+
+    create_counter = create_histogram
+
+
+def test_opentelemetry_sink(fake_langfuse):
+    """Тест публикации метрик через OpenTelemetry Meter."""
+    meter = _FakeMeter()
+    handler = create_truncating_handler(
+        10, 5, langfuse_version=3, metrics_sink=OpenTelemetryMetricsSink(meter)
+    )
+    handler.on_chain_end({"output": "y" * 50})
+
+    values = {name: (value, attributes) for name, value, attributes in meter.records}
+    assert values["langfuse.truncation.input_chars"] == (50, {"event": "chain"})
+    assert values["langfuse.truncation.truncated"] == (1, {"event": "chain", "kind": "string"})
+    assert "langfuse.truncation.budget_exhausted" not in values
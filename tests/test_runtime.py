@@ -0,0 +1,192 @@
+"""Тесты для реестра обработчиков, прогрева и сброса состояния после fork()."""
+
+import atexit
+import os
+import signal
+import threading
+
+import pytest
+
+from langfuse_runnable_config import (
+    LangfuseTruncatingRunnableConfig,
+    flush_all,
+    reload_settings,
+    warmup,
+)
+from langfuse_runnable_config.internal.cache import get_handler_cache
+from langfuse_runnable_config.internal.runtime import HandlerRegistry, get_handler_registry
+from langfuse_runnable_config.internal.version import detect_langfuse_version
+from langfuse_runnable_config.settings import LangfuseTruncatingSettings
+
+
+def _settings(**kwargs):
+    return LangfuseTruncatingSettings(
+        url="https://test.com", public_key="pk-test", secret_key="sk-test", **kwargs
+    )
+
+
+def test_flush_all_flushes_created_handlers(fake_langfuse):
+    """Тест отправки событий всех созданных обработчиков и подсчета событий очереди."""
+    handler = LangfuseTruncatingRunnableConfig.create_callback(settings=_settings())
+    offloaded = LangfuseTruncatingRunnableConfig.create_callback(
+        settings=_settings(truncate_offload=True)
+    )
+    release = threading.Event()
+    offloaded._offloader.submit(release.wait)
+    offloaded.on_tool_end("x" * 100)
+
+    threading.Timer(0.05, release.set).start()
+    report = flush_all(timeout=5)
+    assert report.handlers >= 2
+    assert report.flushed_events >= 2
+    assert (report.dropped_events, report.timed_out) == (0, 0)
+    assert handler.flush_count == 1
+    assert offloaded.events == [("tool_end", "x" * 100)]
+
+
+def test_flush_all_reports_timeout(fake_langfuse):
+    """Тест отчета о событиях, не отправленных до таймаута."""
+    handler = LangfuseTruncatingRunnableConfig.create_callback(
+        settings=_settings(truncate_offload=True)
+    )
+    release = threading.Event()
+    handler._offloader.submit(release.wait)
+    handler.on_tool_end("x")
+
+    report = flush_all(timeout=0.05)
+    release.set()
+    assert report.timed_out >= 1
+    assert report.dropped_events == 2
+    assert report.flushed_events == 0
+
+
+def test_shutdown_hooks_flush_on_signal_and_chain(fake_langfuse):
+    """Тест отправки событий по сигналу и вызова прежнего обработчика сигнала."""
+    registry = HandlerRegistry()
+    handler = LangfuseTruncatingRunnableConfig.create_callback(settings=_settings())
+    registry.track(handler)
+    received = []
+    previous = signal.signal(signal.SIGUSR1, lambda signum, frame: received.append(signum))
+    try:
+        registry.install_shutdown_hooks(timeout=1, signals=[signal.SIGUSR1])
+        os.kill(os.getpid(), signal.SIGUSR1)
+    finally:
+        signal.signal(signal.SIGUSR1, previous)
+    assert received == [signal.SIGUSR1]
+    assert handler.flush_count == 1
+
+
+def test_shutdown_hooks_reraise_signal_without_python_handler(fake_langfuse, monkeypatch):
+    """Тест повтора сигнала с действием по умолчанию, если прежний обработчик не из Python."""
+    registry = HandlerRegistry()
+    handler = LangfuseTruncatingRunnableConfig.create_callback(settings=_settings())
+    registry.track(handler)
+    registry._previous_handlers[signal.SIGTERM] = None
+    installed, killed = [], []
+    monkeypatch.setattr(signal, "signal", lambda signum, action: installed.append(action))
+    monkeypatch.setattr(os, "kill", lambda pid, signum: killed.append(signum))
+
+    registry._on_signal(signal.SIGTERM, None)
+    assert handler.flush_count == 1
+    assert installed == [signal.SIG_DFL]
+    assert killed == [signal.SIGTERM]
+
+
+def test_track_moves_exit_flush_after_new_clients(monkeypatch):
+    """Тест повторной регистрации flush_all() в atexit при каждом новом обработчике."""
+    registered = []
+    monkeypatch.setattr(atexit, "register", registered.append)
+    monkeypatch.setattr(
+        atexit, "unregister", lambda func: registered.remove(func) if func in registered else None
+    )
+    registry = HandlerRegistry()
+
+    class _Handler:
+        pass
+
+    registry.track(_Handler())
+    client_shutdown = object()
+    registered.append(client_shutdown)
+    registry.track(_Handler())
+    assert registered == [client_shutdown, registry._flush_at_exit]
+
+
+def test_warmup_prepares_cached_handler(fake_langfuse):
+    """Тест прогрева: следующий create_callback() возвращает готовый обработчик."""
+    settings = _settings(sample_rate=0.0)
+    report = warmup(settings)
+    assert report.version == 3
+    assert report.handler is not None
+    assert report.duration_ms >= 0
+    assert LangfuseTruncatingRunnableConfig.resolve_callback(settings) == (report.handler, 3)
+
+
+def test_warmup_reports_version_from_env_settings(fake_langfuse, monkeypatch, tmp_path):
+    """Тест версии прогрева из major_version настроек (.env), а не установленного пакета."""
+    monkeypatch.chdir(tmp_path)
+    for name in ("LANGFUSE_URL", "LANGFUSE_PUBLIC_KEY", "LANGFUSE_SECRET_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    (tmp_path / ".env").write_text(
+        "LANGFUSE_URL=https://test.com\n"
+        "LANGFUSE_PUBLIC_KEY=pk-test\n"
+        "LANGFUSE_SECRET_KEY=sk-test\n"
+        "LANGFUSE_MAJOR_VERSION=2\n"
+    )
+    reload_settings()
+    try:
+        report = warmup()
+    finally:
+        reload_settings()
+    assert detect_langfuse_version() == 3
+    assert report.version == 2
+    assert isinstance(report.handler, fake_langfuse.callback.CallbackHandler)
+
+
+def test_warmup_simple_and_unconfigured(fake_langfuse, monkeypatch, tmp_path):
+    """Тест прогрева простого обработчика и прогрева без настроек Langfuse."""
+    report = warmup(_settings(major_version=2), truncating=False)
+    assert report.version == 2
+    assert report.handler is not None
+
+    monkeypatch.chdir(tmp_path)
+    for name in ("LANGFUSE_URL", "LANGFUSE_PUBLIC_KEY", "LANGFUSE_SECRET_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    reload_settings()
+    report = warmup()
+    reload_settings()
+    assert report.version is None
+    assert report.handler is None
+
+
+@pytest.mark.skipif(not hasattr(os, "fork"), reason="требуется os.fork()")
+def test_fork_resets_inherited_state(fake_langfuse):
+    """Тест сброса обработчиков, реестров и очередей в дочернем процессе."""
+    parent = LangfuseTruncatingRunnableConfig.create_callback(
+        settings=_settings(truncate_offload=True)
+    )
+    parent.on_tool_end("parent")
+    flush_all(timeout=5)
+
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            child = LangfuseTruncatingRunnableConfig.create_callback(
+                settings=_settings(truncate_offload=True)
+            )
+            parent.on_tool_end("inherited")
+            child.on_tool_end("child")
+            if (
+                child is not parent
+                and get_handler_registry().handlers() == [child]
+                and parent._offloader.join(5)
+                and child._offloader.join(5)
+                and child.events == [("tool_end", "child")]
+                and parent.events[-1] == ("tool_end", "inherited")
+            ):
+                code = 0
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    assert os.WEXITSTATUS(status) == 0
+    assert get_handler_cache().info().currsize == 1
@@ -0,0 +1,83 @@
+"""Тесты для выборки запусков."""
+
+import uuid
+
+import pytest
+from pydantic import ValidationError
+
+from langfuse_runnable_config import (
+    LangfuseRunnableConfig,
+    LangfuseSettings,
+    LangfuseTruncatingSettings,
+)
+from langfuse_runnable_config.internal.sampling import (
+    NoopCallbackHandler,
+    get_sample_rate,
+    is_sampled,
+)
+
+
+def _settings(**kwargs) -> LangfuseSettings:
+    return LangfuseSettings(
+        url="https://test.com", public_key="pk-test", secret_key="sk-test", **kwargs
+    )
+
+
+def test_sample_rate_per_run_name():
+    """Тест выбора доли по имени запуска."""
+    settings = _settings(sample_rate=0.5, sample_rates={"rag": 0.1})
+    assert get_sample_rate(settings) == 0.5
+    assert get_sample_rate(settings, "rag") == 0.1
+    assert get_sample_rate(settings, "other") == 0.5
+
+
+@pytest.mark.parametrize("settings_cls", [LangfuseSettings, LangfuseTruncatingSettings])
+def test_sample_rates_must_be_fractions(settings_cls):
+    """Тест ошибки для доли выборки вне диапазона [0, 1]."""
+    with pytest.raises(ValidationError):
+        settings_cls(
+            url="https://test.com",
+            public_key="pk-test",
+            secret_key="sk-test",
+            sample_rates={"rag": 1.5},
+        )
+
+
+def test_sampling_by_key_is_deterministic():
+    """Тест детерминированной выборки по ключу трейса."""
+    settings = _settings(sample_rate=0.3)
+    keys = [f"trace-{i}" for i in range(1_000)]
+    decisions = [is_sampled(settings, sampling_key=key) for key in keys]
+    assert decisions == [is_sampled(settings, sampling_key=key) for key in keys]
+    assert 200 < sum(decisions) < 400
+    always, never = _settings(), _settings(sample_rate=0.0)
+    assert all(is_sampled(always, sampling_key=key) for key in keys)
+    assert not any(is_sampled(never, sampling_key=key) for key in keys)
+
+
+def test_sampling_by_uuid_key(fake_langfuse):
+    """Тест выборки по UUID трейса, совпадающей с выборкой по его строке."""
+    settings = _settings(sample_rate=0.5)
+    keys = [uuid.UUID(int=i) for i in range(100)]
+    decisions = [is_sampled(settings, sampling_key=key) for key in keys]
+    assert decisions == [is_sampled(settings, sampling_key=str(key)) for key in keys]
+    assert 0 < sum(decisions) < len(keys)
+
+    key = next(key for key, sampled in zip(keys, decisions) if sampled)
+    config = LangfuseRunnableConfig.create_config(settings=settings, sampling_key=key)
+    assert len(config["callbacks"]) == 1
+
+
+def test_unsampled_run_gets_no_handler(fake_langfuse):
+    """Тест пустой конфигурации и no-op обработчика для невыбранного запуска."""
+    settings = _settings(sample_rate=1.0, sample_rates={"batch": 0.0})
+    assert LangfuseRunnableConfig.create_config(settings=settings, run_name="batch") == {
+        "callbacks": []
+    }
+    handler = LangfuseRunnableConfig.create_callback(settings=settings, run_name="batch")
+    assert isinstance(handler, NoopCallbackHandler)
+    assert handler.ignore_chain and handler.ignore_llm
+
+    sampled = LangfuseRunnableConfig.create_config(settings=settings, run_name="chat")
+    other_rate = LangfuseRunnableConfig.create_callback(settings=_settings(sample_rate=1.0))
+    assert sampled["callbacks"][0] is other_rate
@@ -1,9 +1,34 @@
 """Тесты для сериализаторов."""
 
+import datetime
+import hashlib
+import uuid
+from collections import deque
+from enum import Enum
+from typing import List
+
 import pytest
 from langchain_core.documents import Document
+from pydantic import BaseModel, ConfigDict, Field
 
-from langfuse_runnable_config.internal.serializers.truncator import serialize_for_tracing
+from langfuse_runnable_config.internal.serializers import (
+    EncodingTokenizer,
+    SerializationMemo,
+    get_tokenizer,
+    register_tokenizer,
+    resolve_length_unit,
+)
+from langfuse_runnable_config.internal.serializers.truncator import (
+    BUDGET_PLACEHOLDER,
+    CYCLE_PLACEHOLDER,
+    DUPLICATE_DOCUMENT_FORMAT,
+    ELIDED_KEY,
+    FINGERPRINT_FORMAT,
+    MAX_DEPTH_PLACEHOLDER,
+    SerializerStats,
+    TracingSerializer,
+    serialize_for_tracing,
+)
 
 
 def test_serialize_none():
@@ -41,6 +66,25 @@ def test_serialize_list():
     assert result == ["item1", "item2", "item3"]
 
 
+def test_serialize_deque():
+    """Тест обрезки последовательности без поддержки срезов."""
+    assert serialize_for_tracing(deque(["a", "b"])) == ["a", "b"]
+    assert serialize_for_tracing(deque(["a", "b", "c", "d"]), max_vector_elements=3) == [
+        "a",
+        "b",
+        "c",
+    ]
+    assert serialize_for_tracing(deque([0.1, 0.2, 0.3, 0.4]), max_vector_elements=2) == [0.1, 0.2]
+
+
+def test_serialize_mixed_list_is_not_vector():
+    """Тест обрезки строк и объектов в списке, начинающемся с чисел."""
+    data = [1, 2, 3, "x" * 10**6, {"a": "y" * 10**6}]
+    result = serialize_for_tracing(data, max_length=10, max_total_length=100)
+    assert result == [1, 2, 3, "x" * 10 + "...", {"a": "y" * 10 + "..."}]
+    assert serialize_for_tracing([1, 2, 3, "x" * 20], max_vector_elements=3) == [1, 2, 3]
+
+
 def test_serialize_dict():
     """Тест сериализации словаря."""
     data = {"key1": "value1", "key2": "value2", "key3": "value3"}
@@ -52,7 +96,9 @@ def test_serialize_large_dict():
     """Тест обрезки большого словаря."""
     data = {f"key{i}": f"value{i}" for i in range(10)}
     result = serialize_for_tracing(data, max_vector_elements=5)
-    assert len(result) == 5
+    assert len(result) == 6
+    assert list(result)[:5] == [f"key{i}" for i in range(5)]
+    assert result[ELIDED_KEY] == "…(+5 keys)"
 
 
 def test_serialize_document():
@@ -71,3 +117,340 @@ def test_serialize_bytes():
     assert isinstance(result, str)
     assert "test bytes" in result
 
+
+def test_serialize_deep_nesting_without_recursion_error():
+    """Тест обхода глубоко вложенных данных без рекурсии."""
+    data: dict = {}
+    node = data
+    for _ in range(5000):
+        node["child"] = {}
+        node = node["child"]
+    result = serialize_for_tracing(data, max_depth=10_000)
+    assert "child" in result
+
+    limited = serialize_for_tracing(data, max_depth=2)
+    assert limited == {"child": {"child": MAX_DEPTH_PLACEHOLDER}}
+
+
+def test_serialize_cycle():
+    """Тест замены циклической ссылки заглушкой."""
+    data: dict = {"name": "root"}
+    data["self"] = data
+    result = serialize_for_tracing(data)
+    assert result == {"name": "root", "self": CYCLE_PLACEHOLDER}
+
+
+def test_serialize_shared_reference_is_not_cycle():
+    """Тест повторной ссылки на один объект без цикла."""
+    shared = {"key": "value"}
+    result = serialize_for_tracing({"a": shared, "b": shared})
+    assert result == {"a": {"key": "value"}, "b": {"key": "value"}}
+
+
+def test_serialize_total_length_budget():
+    """Тест обрезки по суммарной длине строк."""
+    data = ["a" * 10, "b" * 10, "c" * 10]
+    result = serialize_for_tracing(data, max_total_length=15)
+    assert result == ["a" * 10, "bbbbb...", BUDGET_PLACEHOLDER]
+
+
+def test_serialize_nodes_budget():
+    """Тест обрезки по количеству посещенных узлов."""
+    data = {"a": "1", "b": "2", "c": "3"}
+    result = serialize_for_tracing(data, max_nodes=3)
+    assert result == {"a": "1", "b": "2", "c": BUDGET_PLACEHOLDER}
+
+
+def test_serializer_stats():
+    """Тест статистики обрезанных значений и бюджета."""
+    serializer = TracingSerializer(max_length=5, max_vector_elements=3, max_total_length=12)
+    result = serializer.serialize(
+        {"text": "x" * 10, "vector": [0.1, 0.2, 0.3, 0.4], "items": ["a", "b", "c", "d"]}
+    )
+    assert result == {"text": "xxxxx...", "vector": [0.1, 0.2, 0.3], "items": ["a", "b", "c"]}
+    assert serializer.serialize(["tail", "more"]) == ["t...", BUDGET_PLACEHOLDER]
+    assert serializer.stats() == SerializerStats(
+        nodes=10,
+        input_length=21,
+        output_length=15,
+        truncated_strings=2,
+        truncated_vectors=1,
+        truncated_containers=1,
+        budget_exhausted=1,
+    )
+
+
+def test_serialize_small_payload_without_copy():
+    """Тест возврата данных без копирования, если обрезать нечего."""
+    data = {"question": "What is Langfuse?", "history": [{"role": "user", "turn": 1}]}
+    assert serialize_for_tracing(data) is data
+
+    serializer = TracingSerializer(max_total_length=24)
+    assert serializer.serialize(data) is data
+    assert serializer.total_length == 21
+    assert serializer.serialize(["abc", "def"]) == ["abc", BUDGET_PLACEHOLDER]
+
+
+def test_serialize_fast_path_falls_back():
+    """Тест обрезки данных, которые не укладываются в лимиты."""
+    data = {"items": [{"text": "x" * 20}]}
+    result = serialize_for_tracing(data, max_length=5)
+    assert result == {"items": [{"text": "xxxxx..."}]}
+    assert data == {"items": [{"text": "x" * 20}]}
+    assert serialize_for_tracing((1, 2), max_vector_elements=5) == [1, 2]
+    data = [1, 2, 3, "x" * 20]
+    serializer = TracingSerializer(max_length=5)
+    assert serializer.serialize(data) == [1, 2, 3, "xxxxx..."]
+    assert serializer.total_length == 8
+
+
+def test_serialize_memo_reuses_result():
+    """Тест повторного использования результата для неизмененного объекта."""
+    memo = SerializationMemo()
+    state = {"messages": ["x" * 20, "y" * 20], "step": 1}
+    first_serializer = TracingSerializer(max_length=5, memo=memo)
+    first = first_serializer.serialize(state)
+    second_serializer = TracingSerializer(max_length=5, memo=memo)
+    assert second_serializer.serialize(state) is first
+    assert second_serializer.stats() == first_serializer.stats()
+    assert TracingSerializer(max_length=6, memo=memo).serialize(state) is not first
+
+    state["messages"].append("z")
+    changed = TracingSerializer(max_length=5, memo=memo).serialize(state)
+    assert changed is not first
+    assert changed["messages"][-1] == "z"
+
+
+def test_serialize_memo_is_bounded_and_weak():
+    """Тест вытеснения и слабых ссылок на модели."""
+    memo = SerializationMemo(maxsize=2)
+    states = [{"text": "x" * 20, "i": i} for i in range(3)]
+    for state in states:
+        TracingSerializer(max_length=5, memo=memo).serialize(state)
+    assert len(memo) == 2
+
+    document = Document(page_content="x" * 20)
+    memo = SerializationMemo()
+    TracingSerializer(max_length=5, memo=memo).serialize(document)
+    ref = next(iter(memo._entries.values()))[0]
+    del document
+    assert ref() is None
+
+
+def test_serialize_documents_dedup_and_metadata_keys():
+    """Тест дедупликации содержимого документов и отбора метаданных."""
+    first = Document(page_content="x" * 20, metadata={"source": "a.pdf", "vector": [0.1]})
+    other = Document(page_content="y" * 20, metadata={"source": "b.pdf"})
+    repeated = Document(page_content="x" * 20, metadata={"source": "c.pdf"})
+    serializer = TracingSerializer(
+        max_length=5, document_metadata_keys=["source"], dedupe_documents=True
+    )
+    assert serializer.serialize([first, other, repeated]) == [
+        {"page_content": "xxxxx...", "metadata": {"source": "a.pdf"}},
+        {"page_content": "yyyyy...", "metadata": {"source": "b.pdf"}},
+        {"page_content": DUPLICATE_DOCUMENT_FORMAT.format(0), "metadata": {"source": "c.pdf"}},
+    ]
+    assert serializer.stats().deduplicated_documents == 1
+    assert serialize_for_tracing([first, repeated], max_length=5)[1]["page_content"] == "xxxxx..."
+
+
+def test_serialize_byte_limits():
+    """Тест лимитов в байтах UTF-8 с обрезкой по границе символа."""
+    assert serialize_for_tracing("中" * 10, max_length=10, length_unit="bytes") == "中" * 2 + "..."
+    assert serialize_for_tracing("abc" * 10, max_length=10, length_unit="bytes") == "abcabca..."
+    serializer = TracingSerializer(max_total_length=8, length_unit=resolve_length_unit("bytes"))
+    assert serializer.serialize(["ж" * 3, "ж" * 3]) == ["ж" * 3, "ж"]
+    assert serializer.total_length == 8
+
+
+def test_serialize_approx_token_limits():
+    """Тест приблизительного подсчета токенов."""
+    tokenizer = get_tokenizer("approx")
+    assert tokenizer.measure("abcdefgh") == 2
+    assert tokenizer.measure("привет ok") == 7
+    assert serialize_for_tracing("a" * 100, max_length=5, length_unit="tokens") == "a" * 16 + "..."
+    assert serialize_for_tracing("中" * 100, max_length=5, length_unit="tokens") == "中" * 4 + "..."
+
+
+class _WordEncoding:
+    """Кодировка-заглушка: токен — слово с последующим пробелом."""
+
+    def __init__(self) -> None:
+        self.encoded: List[int] = []
+
+    def encode(self, text: str) -> List[str]:
+        self.encoded.append(len(text))
+        return [word + " " for word in text.split(" ")]
+
+    def decode(self, tokens: List[str]) -> str:
+        return "".join(tokens)
+
+
+def test_serialize_pluggable_tokenizer():
+    """Тест подключаемого токенизатора без кодирования всей строки."""
+    encoding = _WordEncoding()
+    register_tokenizer("words", EncodingTokenizer(encoding))
+    text = "word " * 10_000
+    result = serialize_for_tracing(text, max_length=4, length_unit="tokens", tokenizer="words")
+    assert result == "word word word ..."
+    assert max(encoding.encoded) < 100
+    data = ("word " * 20_000).encode()
+    result = serialize_for_tracing(data, max_length=4, length_unit="tokens", tokenizer="words")
+    assert result == "word word word ..."
+    result = serialize_for_tracing(b"a" * 1_000, max_length=5, length_unit="tokens")
+    assert result == "a" * 16 + "..."
+    with pytest.raises(ValueError):
+        resolve_length_unit("tokens", "unknown")
+    with pytest.raises(ValueError):
+        resolve_length_unit("lines")
+
+
+def test_serialize_string_strategies():
+    """Тест сохранения конца и начала с концом длинной строки."""
+    text = "0123456789" * 3
+    assert serialize_for_tracing(text, max_length=8, string_strategy="tail") == "...56789"
+    assert serialize_for_tracing(text, max_length=8, string_strategy="head_tail") == "012...89"
+    assert serialize_for_tracing("abc", max_length=5, string_strategy="head_tail") == "abc"
+    result = serialize_for_tracing(
+        "ж" * 10, max_length=7, length_unit="bytes", string_strategy="head_tail"
+    )
+    assert result == "ж...ж"
+    for strategy in ("tail", "head_tail"):
+        for max_length in (0, 2, 3, 4, 7):
+            result = serialize_for_tracing(text, max_length=max_length, string_strategy=strategy)
+            assert len(result) <= max_length
+    register_tokenizer("words", EncodingTokenizer(_WordEncoding()))
+    words = "one two three four five "
+    result = serialize_for_tracing(
+        words, max_length=3, length_unit="tokens", tokenizer="words", string_strategy="tail"
+    )
+    assert result == "...five  "
+    data = b"a" * 100 + b"end"
+    assert serialize_for_tracing(data, max_length=6, string_strategy="tail") == "...end"
+    with pytest.raises(ValueError):
+        TracingSerializer(string_strategy="middle")
+
+
+def test_serialize_fingerprint():
+    """Тест исходной длины и хеша содержимого обрезанной строки."""
+    text = "x" * 100_000 + "y"
+    result = serialize_for_tracing(text, max_length=50, fingerprint=True)
+    digest = hashlib.blake2b(text.encode(), digest_size=8).hexdigest()
+    assert result == "xxxxxx..." + FINGERPRINT_FORMAT.format(100_001, digest)
+    assert len(result) == 50
+    other = serialize_for_tracing("x" * 100_001, max_length=50, fingerprint=True)
+    assert other != result
+    assert serialize_for_tracing("short", max_length=10, fingerprint=True) == "short"
+    assert serialize_for_tracing("\ud800" * 100, max_length=50, fingerprint=True).startswith(
+        "\ud800" * 9 + "... [100 chars, blake2b:"
+    )
+    # Отпечаток, который не помещается в лимит, опускается
+    assert serialize_for_tracing(text, max_length=5, fingerprint=True) == "xx..."
+    result = serialize_for_tracing(text, max_length=60, string_strategy="tail", fingerprint=True)
+    assert len(result) <= 60 and result.endswith(FINGERPRINT_FORMAT.format(100_001, digest))
+
+
+class _Chunk(BaseModel):
+    text: str
+    embedding: List[float]
+
+
+class _State(BaseModel):
+    model_config = ConfigDict(extra="allow")
+
+    query: str
+    secret: str = Field(default="hidden", exclude=True)
+    chunks: List[_Chunk]
+
+    def model_dump(self, *args, **kwargs):
+        raise AssertionError("model_dump() не должен вызываться")
+
+
+def test_serialize_pydantic_model_lazily():
+    """Тест обхода полей Pydantic модели без model_dump()."""
+    state = _State(
+        query="q" * 20,
+        chunks=[_Chunk(text="t" * 20, embedding=[0.1] * 100) for _ in range(100)],
+        note="extra",
+    )
+    result = serialize_for_tracing(state, max_length=5, max_vector_elements=3)
+    assert result == {
+        "query": "qqqqq...",
+        "chunks": [{"text": "ttttt...", "embedding": [0.1, 0.1, 0.1]}] * 3,
+        "note": "extra",
+    }
+
+
+class _Color(Enum):
+    RED = "red"
+
+
+def test_serialize_leaf_objects_as_str():
+    """Тест строкового представления datetime, UUID и Enum."""
+    moment = datetime.datetime(2024, 1, 2, 3, 4, 5)
+    run_id = uuid.UUID("12345678-1234-5678-1234-567812345678")
+    result = serialize_for_tracing([moment, run_id, _Color.RED])
+    assert result == [str(moment), str(run_id), str(_Color.RED)]
+    assert serialize_for_tracing(run_id, max_length=7, string_strategy="tail") == "...5678"
+
+
+def test_serialize_long_bytes():
+    """Тест декодирования только начала длинного буфера."""
+    data = "я".encode() * 1_000_000
+    result = serialize_for_tracing(data, max_length=10)
+    assert result == "я" * 10 + "..."
+
+
+def test_serialize_large_set():
+    """Тест ограниченного представления большого множества."""
+    result = serialize_for_tracing(set(range(1000)), max_vector_elements=3)
+    assert result.startswith("{")
+    assert result.endswith(", …(+997 items)}")
+
+
+def test_serialize_memoryview():
+    """Тест обрезки memoryview с сохранением формы и типа."""
+    result = serialize_for_tracing(memoryview(b"abcdef"), max_vector_elements=3)
+    assert result == {"shape": [6], "dtype": "B", "values": [97, 98, 99]}
+
+
+def test_serialize_numpy_embedding_batch():
+    """Тест обрезки пакета эмбеддингов NumPy по строкам и столбцам."""
+    numpy = pytest.importorskip("numpy")
+    batch = numpy.zeros((100, 1536), dtype=numpy.float32)
+    result = serialize_for_tracing({"embeddings": batch}, max_vector_elements=2)
+    assert result == {
+        "embeddings": {
+            "shape": [100, 1536],
+            "dtype": "float32",
+            "values": [[0.0, 0.0], [0.0, 0.0]],
+        }
+    }
+    assert serialize_for_tracing(numpy.float64(1.5)) == 1.5
+
+
+def test_serialize_numpy_string_array():
+    """Тест обрезки строк в массиве NumPy и учета их в общем бюджете."""
+    numpy = pytest.importorskip("numpy")
+    array = numpy.array(["x" * 10, "y" * 10, "z" * 10])
+    result = serialize_for_tracing(array, max_length=4, max_total_length=9)
+    assert result == {
+        "shape": [3],
+        "dtype": "<U10",
+        "values": ["xxxx...", "yy...", BUDGET_PLACEHOLDER],
+    }
+    assert serialize_for_tracing(numpy.array("x" * 10), max_length=4) == "xxxx..."
+
+
+def test_serialize_numpy_object_array():
+    """Тест обхода вложенных объектов в массиве NumPy с dtype=object."""
+    numpy = pytest.importorskip("numpy")
+    array = numpy.empty(2, dtype=object)
+    array[0] = {"text": "x" * 10}
+    array[1] = ["a", "b", "c"]
+    result = serialize_for_tracing(array, max_length=4, max_vector_elements=2)
+    assert result == {
+        "shape": [2],
+        "dtype": "object",
+        "values": [{"text": "xxxx..."}, ["a", "b"]],
+    }
@@ -5,6 +5,7 @@ from unittest.mock import patch
 
 import pytest
 
+from langfuse_runnable_config.internal.cache import SettingsCache
 from langfuse_runnable_config.settings import LangfuseSettings, LangfuseTruncatingSettings
 
 
@@ -53,3 +54,32 @@ def test_langfuse_truncating_settings():
     assert settings.truncate_max_length == 5000
     assert settings.truncate_max_vector_elements == 10
 
+
+def test_settings_cache_reuses_settings_until_reload(monkeypatch):
+    """Тест однократного чтения настроек и их перечитывания после reload()."""
+    monkeypatch.setenv("LANGFUSE_URL", "https://env.com")
+    monkeypatch.setenv("LANGFUSE_PUBLIC_KEY", "pk-env")
+    monkeypatch.setenv("LANGFUSE_SECRET_KEY", "sk-env")
+    cache = SettingsCache()
+    first = cache.get(LangfuseSettings)
+    monkeypatch.setenv("LANGFUSE_PUBLIC_KEY", "pk-new")
+    assert cache.get(LangfuseSettings) is first
+
+    cache.reload(LangfuseSettings)
+    assert cache.get(LangfuseSettings).public_key == "pk-new"
+
+
+def test_settings_cache_watches_env_file(tmp_path, monkeypatch):
+    """Тест перечитывания .env при изменении времени модификации."""
+    for name in ("LANGFUSE_URL", "LANGFUSE_PUBLIC_KEY", "LANGFUSE_SECRET_KEY"):
+        monkeypatch.delenv(name, raising=False)
+    monkeypatch.chdir(tmp_path)
+    env_file = tmp_path / ".env"
+    keys = "LANGFUSE_PUBLIC_KEY=pk\nLANGFUSE_SECRET_KEY=sk\n"
+    env_file.write_text(f"LANGFUSE_URL=https://a.com\n{keys}")
+    cache = SettingsCache(watch_env_file=True)
+    assert cache.get(LangfuseSettings).url == "https://a.com"
+
+    env_file.write_text(f"LANGFUSE_URL=https://b.com\n{keys}")
+    os.utime(env_file, ns=(0, 1))
+    assert cache.get(LangfuseSettings).url == "https://b.com"
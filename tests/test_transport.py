@@ -0,0 +1,89 @@
+"""Тесты для пула HTTP-клиентов и реестра клиентов Langfuse."""
+
+import os
+
+import pytest
+
+from langfuse_runnable_config.internal.strategies.simple import get_strategy
+from langfuse_runnable_config.internal.transport import (
+    HttpClientPool,
+    LangfuseClientRegistry,
+    get_langfuse_client_registry,
+)
+from langfuse_runnable_config.settings import LangfuseSettings, LangfuseTruncatingSettings
+
+
+def _settings(url: str, **kwargs) -> LangfuseSettings:
+    return LangfuseSettings(url=url, public_key="pk-test", secret_key="sk-test", **kwargs)
+
+
+def test_pool_reuses_client_for_same_host():
+    """Тест переиспользования клиента обработчиками одного хоста."""
+    pool = HttpClientPool()
+    try:
+        first = pool.get_client(_settings("https://test.com"))
+        second = pool.get_client(
+            LangfuseTruncatingSettings(
+                url="https://test.com/", public_key="pk-other", secret_key="sk-other"
+            )
+        )
+        assert first is second
+        assert pool.get_client(_settings("https://other.com")) is not first
+    finally:
+        pool.close()
+
+
+def test_pool_separates_clients_by_limits():
+    """Тест раздельных клиентов для разных параметров пула."""
+    pool = HttpClientPool()
+    try:
+        default = pool.get_client(_settings("https://test.com"))
+        limited = pool.get_client(_settings("https://test.com", http_max_connections=5))
+        assert default is not limited
+    finally:
+        pool.close()
+
+
+def test_pool_close_closes_clients():
+    """Тест закрытия клиентов пула."""
+    pool = HttpClientPool()
+    client = pool.get_client(_settings("https://test.com", http2=True))
+    pool.close()
+    assert client.is_closed
+    assert pool.get_client(_settings("https://test.com", http2=True)) is not client
+    pool.close()
+
+
+def test_v3_strategy_binds_handler_to_project_client(fake_langfuse, monkeypatch):
+    """Тест создания клиента проекта v3+ без изменения os.environ."""
+    monkeypatch.delenv("LANGFUSE_PUBLIC_KEY", raising=False)
+    registry = get_langfuse_client_registry()
+    first = get_strategy(3).create_callback(_settings("https://one.com"))
+    other = LangfuseSettings(url="https://two.com", public_key="pk-two", secret_key="sk-two")
+    second = get_strategy(3).create_callback(other)
+
+    assert first.init_kwargs == {"public_key": "pk-test"}
+    assert second.init_kwargs == {"public_key": "pk-two"}
+    assert registry.get_client(_settings("https://one.com")).init_kwargs == {
+        "public_key": "pk-test",
+        "secret_key": "sk-test",
+        "host": "https://one.com",
+        "debug": False,
+    }
+    assert registry.get_client(other) is not registry.get_client(_settings("https://one.com"))
+    assert "LANGFUSE_PUBLIC_KEY" not in os.environ
+
+
+def test_registry_client_url_overrides_base_url_env(monkeypatch):
+    """Тест клиентов проектов со своим url при заданном LANGFUSE_BASE_URL."""
+    pytest.importorskip("langfuse")
+    monkeypatch.setenv("LANGFUSE_BASE_URL", "http://env-host:1")
+    registry = LangfuseClientRegistry()
+    first = LangfuseSettings(url="http://tenant-a:3000", public_key="pk-a", secret_key="sk-a")
+    second = LangfuseSettings(url="http://tenant-b:3000", public_key="pk-b", secret_key="sk-b")
+    try:
+        assert registry.get_client(first)._base_url == "http://tenant-a:3000"
+        assert registry.get_client(second)._base_url == "http://tenant-b:3000"
+    finally:
+        for client in registry.clients():
+            client.shutdown()
@@ -0,0 +1,68 @@
+"""Тесты для определения версии Langfuse."""
+
+import logging
+
+import pytest
+
+from langfuse_runnable_config.internal.strategies import get_strategy, get_truncating_strategy
+from langfuse_runnable_config.internal.version import (
+    detect_langfuse_version,
+    detector,
+    reset_langfuse_version_cache,
+)
+
+
+@pytest.fixture(autouse=True)
+def _reset_version_cache(monkeypatch):
+    monkeypatch.delenv(detector.MAJOR_VERSION_ENV, raising=False)
+    reset_langfuse_version_cache()
+    yield
+    reset_langfuse_version_cache()
+
+
+def test_version_detected_once(monkeypatch):
+    """Тест однократного определения версии за процесс."""
+    calls = []
+
+    def fake_detect():
+        calls.append(1)
+        return 3
+
+    monkeypatch.setattr(detector, "_detect_from_metadata", fake_detect)
+    assert detect_langfuse_version() == 3
+    assert detect_langfuse_version() == 3
+    assert len(calls) == 1
+
+    reset_langfuse_version_cache()
+    detect_langfuse_version()
+    assert len(calls) == 2
+
+
+def test_version_env_override(monkeypatch):
+    """Тест явного указания версии через LANGFUSE_MAJOR_VERSION."""
+    monkeypatch.setattr(detector, "_detect_from_metadata", lambda: 3)
+    monkeypatch.setenv(detector.MAJOR_VERSION_ENV, "2")
+    assert detect_langfuse_version() == 2
+
+
+def test_version_env_override_checked_once(monkeypatch, caplog):
+    """Тест однократной проверки некорректного LANGFUSE_MAJOR_VERSION."""
+    monkeypatch.setattr(detector, "_detect_from_metadata", lambda: 3)
+    monkeypatch.setenv(detector.MAJOR_VERSION_ENV, "v2")
+    with caplog.at_level(logging.WARNING, logger=detector.__name__):
+        assert detect_langfuse_version() == 3
+        assert detect_langfuse_version() == 3
+    assert len(caplog.records) == 1
+
+    monkeypatch.setenv(detector.MAJOR_VERSION_ENV, "2")
+    assert detect_langfuse_version() == 3
+    reset_langfuse_version_cache()
+    assert detect_langfuse_version() == 2
+
+
+def test_strategies_are_singletons():
+    """Тест переиспользования объектов стратегий."""
+    assert get_strategy(2) is get_strategy(2)
+    assert get_strategy(3) is get_strategy(4)
+    assert get_truncating_strategy(3) is get_truncating_strategy(3)
+    assert get_truncating_strategy(2) is not get_truncating_strategy(3)